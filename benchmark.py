@@ -0,0 +1,707 @@
+"""
+Synthetic workload and throughput benchmark for the parsers and the scorer of the counter bot.
+
+Generates loot messages, roll embeds and member role lists that look like a real battle
+(skewed item popularity, emoji-prefixed role names, FactionWars24 roles, Weird Flower carriers,
+Noon members still wearing STALKER gear, some cheaters) and times every stage on its own.
+
+    python benchmark.py --scale 100000 --output bench.json
+    python benchmark.py --scale 1000000 --stages roll_embed_parse,calculate_equipment_bonus --compare bench.json
+    python benchmark.py --scale 100000 --check-parsers --corpus exported_channel.json
+    python benchmark.py --scale 100000 --stages score_rolls --repeat 5 --compare bench.json --max-slowdown 0.1
+    python benchmark.py --scale 100000 --compare-revision HEAD~1
+
+Throughput is measured over the whole scale, generated and run in batches so memory stays flat.
+Memory is the tracemalloc peak of one batch of the stage (inputs excluded), measured in a separate pass.
+A --compare or --compare-revision run exits 1 if a stage got slower by more than --max-slowdown, widened by the gap
+between the two fastest timings of either side. Every pass of a stage times the same inputs with the garbage collector
+off and the fastest pass counts. --compare takes results of earlier runs on the same machine (the fastest of each stage
+counts); on a machine whose speed drifts between runs, --compare-revision times a git revision and this tree in
+alternating rounds of separate processes instead, so both sides see the same machine.
+"""
+
+from __future__ import annotations
+import os
+import sys
+import json
+import time
+import gc
+import random
+import re
+import argparse
+import itertools
+import platform
+import tracemalloc
+import shutil
+import contextlib
+import subprocess
+import tempfile
+from types import SimpleNamespace
+from typing import Optional, Dict, List, Set, Tuple, Callable, Iterable, Iterator, Any
+
+import monolith_uprising_counter_bot as bot
+
+# --------------------------------------------------------------------------------------------------------------------
+# Config
+# --------------------------------------------------------------------------------------------------------------------
+
+# Inputs generated and timed per batch
+BATCH_SIZE = 100_000
+# One member per this many rolls (a 10k-roll battle has 200 rollers)
+ROLLS_PER_MEMBER = 50
+# Default throughput loss of a --compare run that fails it
+DEFAULT_MAX_SLOWDOWN = 0.1
+# Rounds of a --compare-revision run; every round times both sides once
+COMPARE_ROUNDS = 5
+
+EMOJIS = ["🔫", "🛡️", "☢️", "🌼", "🔩", "🎯", "🪖", "⚡", "💀", "🧪"]
+ROLE_SEPARATORS = [" ", " | ", "・", ""]
+NOISE_ROLES = ["@everyone", "🎉 Event Winner", "Member", "🔔 Notifications", "Server Booster", "🎮 Gamer"]
+STALKER_FACTION_ROLES = ["Loner", "Duty", "Freedom", "Clear Sky", "Ecologist"]
+
+# message naming of items whose role is named differently
+LOOT_MESSAGE_NAMES = {role: message for message, role in bot.WRONG_LOOTED_EQUIPMENT_NAMES.items()}
+
+# --------------------------------------------------------------------------------------------------------------------
+# Synthetic workload
+# --------------------------------------------------------------------------------------------------------------------
+
+def _zipf_weights(items: Iterable[str]) -> Tuple[List[str], List[float]]:
+    # skewed popularity: the k-th item is picked 1/k as often as the first
+    ordered = sorted(items)
+    return ordered, [1 / (k + 1) for k in range(len(ordered))]
+
+class Member:
+    __slots__ = ("user_id", "faction", "items", "role_names", "faction_wars_24")
+
+    def __init__(self, user_id: int, faction: str, items: List[str], role_names: List[str], faction_wars_24: bool):
+        self.user_id = user_id
+        self.faction = faction
+        self.items = items
+        self.role_names = role_names
+        self.faction_wars_24 = faction_wars_24
+
+class Workload:
+    """
+    Members with loadouts and loot, and generators of the messages a battle of `scale` rolls produces.
+    """
+
+    def __init__(self, scale: int, seed: int = 0):
+        self.scale = scale
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.members: List[Member] = []
+        self.monolith_looted = bot.LootIndex()
+        self.stalkers_looted = bot.LootIndex()
+
+        pools = {
+            "monolith": {
+                "weapon": _zipf_weights(bot.MONOLITH_WEAPONS),
+                "armor": _zipf_weights(bot.MONOLITH_ARMOR),
+            },
+            "stalkers": {
+                "weapon": _zipf_weights(bot.STALKER_WEAPONS),
+                "armor": _zipf_weights(bot.STALKER_ARMOR),
+            },
+        }
+        artifacts = ["Jellyfish", "Weird Bolt", "Weird Flower"]
+        attachments = _zipf_weights(bot.ATTACHMENTS)
+
+        rng = self.rng
+        for n in range(max(20, scale // ROLLS_PER_MEMBER)):
+            user_id = 300_000_000_000_000_000 + n
+            r = rng.random()
+            faction = "Monolith" if r < 0.35 else "Noon" if r < 0.45 else rng.choice(STALKER_FACTION_ROLES)
+            side = "monolith" if faction in bot.MONOLITH_FACTIONS else "stalkers"
+
+            items = [rng.choices(*pools[side]["weapon"])[0]]
+            if rng.random() < 0.8:
+                items.append(rng.choices(*pools[side]["armor"])[0])
+            for artifact, chance in zip(artifacts, (0.3, 0.1, 0.05)):
+                if rng.random() < chance:
+                    items.append(artifact)
+            if rng.random() < 0.4:
+                items.append(rng.choices(*attachments)[0])
+            if faction == "Noon" and rng.random() < 0.5:
+                # transitioned from STALKERS without deselecting the old gear
+                items.append(rng.choices(*pools["stalkers"]["weapon"])[0])
+                items.append(rng.choices(*pools["stalkers"]["armor"])[0])
+
+            faction_wars_24 = rng.random() < 0.1
+            roles = [rng.choice(NOISE_ROLES) for _ in range(rng.randint(1, 3))]
+            roles += [self._role_name(name) for name in [faction] + items]
+            if faction_wars_24:
+                roles.append(self._role_name("FactionWars24"))
+                if rng.random() < 0.5:
+                    armor = rng.choice(sorted(bot.FACTION_WARS_24_STALKER_ARMOR | bot.FACTION_WARS_24_MONOLITH_ARMOR))
+                    roles.append(self._role_name(armor))
+                    items.append(armor)
+            rng.shuffle(roles)
+
+            # loot: everything equipped was looted, plus a few other drops; about 5% are cheaters missing an item
+            looted = set(items)
+            if rng.random() < 0.05 and len(looted) > 1:
+                looted.discard(rng.choice(items))
+            looted.update(rng.choices(*pools[side]["weapon"], k=rng.randint(0, 3)))
+            loot_index = self.monolith_looted if side == "monolith" else self.stalkers_looted
+            for item in sorted(looted):
+                loot_index.add(user_id, item)
+
+            self.members.append(Member(user_id, faction, items, roles, faction_wars_24))
+
+        self.monolith_members = [m for m in self.members if m.faction in bot.MONOLITH_FACTIONS]
+        self.stalker_members = [m for m in self.members if m.faction not in bot.MONOLITH_FACTIONS]
+
+    def _role_name(self, name: str) -> str:
+        return f"{self.rng.choice(EMOJIS)}{self.rng.choice(ROLE_SEPARATORS)}{name}"
+
+    def _looted_item(self, member: Member, rng: random.Random) -> str:
+        item = rng.choice(member.items)
+        return LOOT_MESSAGE_NAMES.get(item, item)
+
+    def stalker_loot_message(self, rng: random.Random) -> str:
+        member = rng.choice(self.stalker_members or self.members)
+        r = rng.random()
+        if r < 0.6:
+            return f"<@{member.user_id}>, Foray Successful\nYou found a stash in the anomaly field.\nYou Got {self._looted_item(member, rng)}"
+        if r < 0.9:
+            return f"<@{member.user_id}>, Foray Failed\nA bloodsucker chased you away.\nYou Got nothing"
+        return f"<@{member.user_id}> is out of forays for today, come back tomorrow."
+
+    def monolith_loot_message(self, rng: random.Random) -> str:
+        member = rng.choice(self.monolith_members or self.members)
+        r = rng.random()
+        if r < 0.6:
+            return f"<@{member.user_id}>, COME TO ME!\n\nYou hear the voice of Monolith! You got {self._looted_item(member, rng)}."
+        if r < 0.9:
+            return f"<@{member.user_id}>, the Monolith is silent.\n\nYou got nothing"
+        return f"<@{member.user_id}> prays at the Monolith."
+
+    def stalker_loot_messages(self, n: int) -> List[str]:
+        return [self.stalker_loot_message(self.rng) for _ in range(n)]
+
+    def monolith_loot_messages(self, n: int) -> List[str]:
+        return [self.monolith_loot_message(self.rng) for _ in range(n)]
+
+    def roll_embeds(self, n: int) -> List[SimpleNamespace]:
+        out = []
+        for _ in range(n):
+            member = self.rng.choice(self.members)
+            embed = SimpleNamespace(title=str(self.rng.randint(1, 100)), description=f"<@{member.user_id}> rolled the dice")
+            out.append(SimpleNamespace(embeds=[embed]))
+        return out
+
+    def rolls(self, n: int) -> List[Tuple[int, Member]]:
+        return [(self.rng.randint(1, 100), self.rng.choice(self.members)) for _ in range(n)]
+
+# --------------------------------------------------------------------------------------------------------------------
+# Stages
+# --------------------------------------------------------------------------------------------------------------------
+
+class Stage:
+    """
+    A benchmarked function: make(workload, n) builds a batch of inputs, run(workload, batch) processes it.
+    """
+
+    def __init__(self, name: str, make: Callable, run: Callable):
+        self.name = name
+        self.make = make
+        self.run = run
+
+def _run_stalker_loot(w: Workload, batch: List[str]) -> None:
+    parse = bot._parse_stalker_loot_message
+    for content in batch:
+        parse(content)
+
+def _run_monolith_loot(w: Workload, batch: List[str]) -> None:
+    parse = bot._parse_monolith_loot_message
+    for content in batch:
+        parse(content)
+
+def _run_roll_embed(w: Workload, batch: List[SimpleNamespace]) -> None:
+    parse = bot.match_roll_embed_message
+    for message in batch:
+        parse(message)
+
+def _run_get_equipped(w: Workload, batch: List[Tuple[int, Member]]) -> None:
+    get_equipped = bot.get_equipped_equipment
+    for _, member in batch:
+        equipment = bot.MONOLITH_ALL_EQUIPMENT if member.faction in bot.MONOLITH_FACTIONS else bot.STALKERS_ALL_EQUIPMENT
+        get_equipped(member.role_names, equipment)
+
+def _make_equipped(w: Workload, n: int) -> List[Tuple[int, Member, Set[str]]]:
+    out = []
+    for roll, member in w.rolls(n):
+        equipment = bot.MONOLITH_ALL_EQUIPMENT if member.faction in bot.MONOLITH_FACTIONS else bot.STALKERS_ALL_EQUIPMENT
+        out.append((roll, member, bot.get_equipped_equipment(member.role_names, equipment)))
+    return out
+
+def _run_filter_armor(w: Workload, batch: List[Tuple[int, Member, Set[str]]]) -> None:
+    filter_armor = bot.filter_redundant_armor
+    checks: List[str] = []
+    for roll, member, equipped in batch:
+        looted = w.monolith_looted if member.faction in bot.MONOLITH_FACTIONS else w.stalkers_looted
+        filter_armor(set(equipped), member.faction_wars_24, member.user_id, roll, member.faction, looted, checks)
+
+def _make_equipped_masks(w: Workload, n: int) -> List[Tuple[Member, int]]:
+    return [(member, bot.items_mask(equipped)) for _, member, equipped in _make_equipped(w, n)]
+
+def _run_cheater_check(w: Workload, batch: List[Tuple[Member, int]]) -> None:
+    # the batch API: one find_cheating call per faction
+    monolith = [(m.user_id, mask) for m, mask in batch if m.faction in bot.MONOLITH_FACTIONS]
+    stalkers = [(m.user_id, mask) for m, mask in batch if m.faction not in bot.MONOLITH_FACTIONS]
+    bot.find_cheating(monolith, w.monolith_looted)
+    bot.find_cheating(stalkers, w.stalkers_looted)
+
+def _run_bonus(w: Workload, batch: List[Tuple[int, Member, Set[str]]]) -> None:
+    bonus = bot.calculate_equipment_bonus
+    for roll, _, equipped in batch:
+        bonus(equipped, roll)
+
+def _make_loadouts(w: Workload, n: int) -> List[Tuple[int, int, bot.RoleLoadout]]:
+    # role names as a tuple, like RollEvent.role_names: a member keeps getting the same RoleLoadout
+    return [(roll, member.user_id, bot.resolve_role_names(tuple(member.role_names))) for roll, member in w.rolls(n)]
+
+def _run_scorer(w: Workload, batch: List[Tuple[int, int, bot.RoleLoadout]]) -> None:
+    # one scorer per batch: a battle of BATCH_SIZE rolls
+    scorer = bot.RollScorer(w.monolith_looted, w.stalkers_looted)
+    for roll, user_id, loadout in batch:
+        scorer.add_roll(roll, user_id, loadout)
+
+def _run_scorer_numpy(w: Workload, batch: List[Tuple[int, int, bot.RoleLoadout]]) -> None:
+    scorer = bot.ColumnarRollScorer(w.monolith_looted, w.stalkers_looted)
+    for roll, user_id, loadout in batch:
+        scorer.add_roll(roll, user_id, loadout)
+    scorer.flush()
+
+STAGES: List[Stage] = [
+    Stage("stalker_loot_parse", Workload.stalker_loot_messages, _run_stalker_loot),
+    Stage("monolith_loot_parse", Workload.monolith_loot_messages, _run_monolith_loot),
+    Stage("roll_embed_parse", Workload.roll_embeds, _run_roll_embed),
+    Stage("get_equipped_equipment", Workload.rolls, _run_get_equipped),
+    Stage("filter_redundant_armor", _make_equipped, _run_filter_armor),
+    Stage("cheater_check_batch", _make_equipped_masks, _run_cheater_check),
+    Stage("calculate_equipment_bonus", _make_equipped, _run_bonus),
+    Stage("score_rolls", _make_loadouts, _run_scorer),
+]
+if bot.np is not None:
+    STAGES.append(Stage("score_rolls_numpy", _make_loadouts, _run_scorer_numpy))
+
+def reset_caches() -> None:
+    # every timed run starts as cold as a fresh process, whatever ran before it
+    bot.classify_role_name.cache_clear()
+    bot._loadout_bonus.cache_clear()
+    bot._resolve_role_name_tuple.cache_clear()
+
+def run_stage(stage: Stage, workload: Workload, scale: int, measure_memory: bool = True, repeat: int = 1) -> Dict[str, float]:
+    peak_bytes = None
+    if measure_memory:
+        reset_caches()
+        batch = stage.make(workload, min(BATCH_SIZE, scale))
+        tracemalloc.start()
+        stage.run(workload, batch)
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        del batch
+
+    passes: List[float] = []
+    for _ in range(max(repeat, 1)):
+        # the same inputs in every pass and every run, whichever stages run before
+        workload.rng.seed(f"{workload.seed}/{stage.name}")
+        reset_caches()
+        elapsed = 0.0
+        done = 0
+        while done < scale:
+            n = min(BATCH_SIZE, scale - done)
+            batch = stage.make(workload, n)
+            # a collection inside a timed batch depends on whatever was allocated before (as in timeit)
+            gc.collect()
+            gc.disable()
+            try:
+                started = time.perf_counter()
+                stage.run(workload, batch)
+                elapsed += time.perf_counter() - started
+            finally:
+                gc.enable()
+            done += n
+        passes.append(elapsed)
+    seconds = min(passes)
+    return {
+        "ops": done,
+        "seconds": round(seconds, 6),
+        "ops_per_sec": round(done / seconds, 1) if seconds else None,
+        "ns_per_op": round(seconds * 1e9 / done, 1) if done else None,
+        # second fastest pass / fastest pass - 1: how far the fastest pass is from reproducible
+        "noise": round(sorted(passes)[1] / seconds - 1, 4) if seconds and len(passes) > 1 else None,
+        "peak_batch_bytes": peak_bytes,
+    }
+
+# --------------------------------------------------------------------------------------------------------------------
+# Parser differential check
+# --------------------------------------------------------------------------------------------------------------------
+
+# The parsers as they were before the single-pass matchers, kept as the reference the fast ones must agree with
+
+def legacy_parse_stalker_loot_message(content: str) -> Optional[Tuple[int, str]]:
+    if not content:
+        return None
+
+    lines = [ln.strip() for ln in content.splitlines() if ln.strip()]
+    if not lines:
+        return None
+
+    first = lines[0]
+    uid = bot._extract_first_mention_user_id(first)
+    if uid is None:
+        return None
+
+    first_lower = first.lower()
+    if "foray failed" in first_lower:
+        return None
+    if "foray successful" not in first_lower:
+        return None
+
+    item: Optional[str] = None
+    for ln in lines[1:]:
+        ln_stripped = ln.strip()
+        if ln_stripped.lower().startswith("you got "):
+            item = ln_stripped[len("you got "):].strip()
+            break
+
+    if not item:
+        return None
+    return uid, item
+
+def legacy_parse_monolith_loot_message(content: str) -> Optional[Tuple[int, str]]:
+    if not content:
+        return None
+
+    lines = [ln.rstrip() for ln in content.splitlines() if ln.strip()]
+    if not lines:
+        return None
+
+    first = lines[0].strip()
+    uid = bot._extract_first_mention_user_id(first)
+    if uid is None:
+        return None
+
+    remainder = bot.USER_MENTION_RE.sub("", first, count=1).strip()
+    if remainder != ", COME TO ME!":
+        return None
+
+    text = "\n".join(lines).replace('.', '')
+    m = re.search(r"\byou got\s+(.+?)\s*$", text, flags=re.IGNORECASE)
+    if not m:
+        return None
+
+    item = m.group(1).strip()
+    if not item:
+        return None
+    return uid, item
+
+def legacy_match_roll_embed(title: Optional[str], description: Optional[str]) -> Optional[Tuple[int, int]]:
+    title = (title or "").strip()
+    if not title:
+        return None
+    try:
+        roll = int(title)
+    except ValueError:
+        return None
+    m = bot.USER_MENTION_RE.search(description or "")
+    if not m:
+        return None
+    return roll, int(m.group(1))
+
+# (kind, fast parser, reference parser); inputs are argument tuples
+PARSER_PAIRS = {
+    "stalker_loot": (bot._parse_stalker_loot_message, legacy_parse_stalker_loot_message),
+    "monolith_loot": (bot._parse_monolith_loot_message, legacy_parse_monolith_loot_message),
+    "roll_embed": (bot.match_roll_embed, legacy_match_roll_embed),
+}
+
+_MENTION = "<@123456789012345678>"
+PARSER_EDGE_CASES: List[Tuple[str, Tuple[Any, ...]]] = [
+    *(("stalker_loot", (content,)) for content in [
+        "", " ", "\n\n", f"{_MENTION}", f"{_MENTION}, Foray Successful", f"{_MENTION}, foray SUCCESSFUL\nYou Got X",
+        f"  \n {_MENTION}, Foray Successful \r\n\r\n  you got   Gauss Rifle  \n", f"{_MENTION}, Foray Successful\nYou Got \nYou Got Y",
+        f"{_MENTION}, Foray Successful, Foray Failed\nYou Got X", f"Hey {_MENTION}, Foray Successful\nflavor\nYOU GOT Kora",
+        f"{_MENTION}, Foray Successful\u2028You Got X\u2029more", f"{_MENTION}, Foray Successful\nYou GotX\nYou Got\tZ",
+        f"{_MENTION}, Foray Successful\nYou Got\u00a0 Z \u00a0", f"{_MENTION}, Foray\nSuccessful\nYou Got X",
+        f"<@!12345678901234567890123456>{_MENTION}, Foray Successful\nYou Got X", f"flavor\n{_MENTION}, Foray Successful\nYou Got X",
+        f"{_MENTION}, Foray Successful\x1cYou Got X", f"{_MENTION}, Foray Successful\n\x85 you got X\x0b",
+    ]),
+    *(("monolith_loot", (content,)) for content in [
+        "", " ", f"{_MENTION}", f"{_MENTION}, COME TO ME!", f"{_MENTION}, COME TO ME!\nYou got X.",
+        f"  {_MENTION} , COME TO ME!  \n\n You hear the voice of Monolith! You got Gauss Rifle.  ",
+        f"{_MENTION}, come to me!\nYou got X", f",{_MENTION} COME TO ME!\nYou got X", f"{_MENTION}, COME TO ME!\nYou got\nX",
+        f"{_MENTION}, COME TO ME!\nYou got\n...\nX", f"{_MENTION}, COME TO ME!\nY.ou got X", f"{_MENTION}, COME TO ME!\nYou got X\n.",
+        f"{_MENTION}, COME TO ME!\nYou got . X . ", f"{_MENTION}, COME TO ME!\nyou GOT you got X\r\nYou got Y",
+        f"{_MENTION}, COME TO ME!\nYou got X\u2028Y", f"{_MENTION}, COME TO ME!\nayou got X", f"{_MENTION}, COME TO ME!\nYou got",
+        f"{_MENTION}, COME TO ME!\n\u00a0You got\u00a0X\u00a0", f"{_MENTION} x, COME TO ME!\nYou got X",
+    ]),
+    *(("roll_embed", (title, description)) for title in [
+        None, "", " ", "42", " 7 ", "+5", "-3", "007", "1_0", "1__0", "_1", "1_", "\u0663", "\u00b2", "abc", "4 2", "0x10",
+        "\u200b5", " 12\u00a0", "\t100\n", "+-1", "99999999999999999999",
+    ] for description in [None, "", f"{_MENTION} rolled", "<@12> rolled", f"rolled by <@!{_MENTION[2:]}"]),
+]
+
+_MUTATION_CHARS = [" ", "  ", "\t", "\n", "\r\n", "\n\n", ".", "..", "\u00a0", "\u2028", "\x0b", "\x85", "!", ",", "x", "\u0130"]
+
+def _mutate(text: str, rng: random.Random) -> str:
+    chars = list(text)
+    for _ in range(rng.randint(1, 4)):
+        r = rng.random()
+        i = rng.randrange(len(chars) + 1)
+        if r < 0.4:
+            chars.insert(i, rng.choice(_MUTATION_CHARS))
+        elif r < 0.6 and chars:
+            del chars[min(i, len(chars) - 1)]
+        elif r < 0.8 and chars:
+            j = min(i, len(chars) - 1)
+            chars[j] = chars[j].swapcase()
+        else:
+            chars.insert(i, rng.choice(["You got ", "you GOT ", "Foray Failed", "Foray Successful", ", COME TO ME!", _MENTION]))
+    return "".join(chars)
+
+def generated_parser_corpus(workload: Workload, n: int) -> Iterator[Tuple[str, Tuple[Any, ...]]]:
+    """
+    Edge cases, then n messages of each format from the workload, every other one mutated
+    (whitespace, line breaks, dots, case, stray phrases).
+    """
+    yield from PARSER_EDGE_CASES
+    rng = random.Random(workload.scale)
+    for i in range(n):
+        stalker = workload.stalker_loot_message(rng)
+        monolith = workload.monolith_loot_message(rng)
+        [embed] = workload.roll_embeds(1)[0].embeds
+        title, description = embed.title, embed.description
+        if i % 2:
+            stalker, monolith = _mutate(stalker, rng), _mutate(monolith, rng)
+            title, description = _mutate(title, rng), _mutate(description, rng)
+        for kind, content in (("stalker_loot", stalker), ("monolith_loot", monolith)):
+            yield kind, (content,)
+        yield "roll_embed", (title, description)
+
+def recorded_parser_corpus(paths: Iterable[str]) -> Iterator[Tuple[str, Tuple[Any, ...]]]:
+    """
+    Every message of exported channels (bot.iter_export_messages) through every parser.
+    """
+    for path in paths:
+        for msg in bot.iter_export_messages(path):
+            content = msg.get("content") or ""
+            yield "stalker_loot", (content,)
+            yield "monolith_loot", (content,)
+            for embed in (msg.get("embeds") or [])[:1]:
+                yield "roll_embed", (embed.get("title"), embed.get("description"))
+
+def check_parsers(corpus: Iterable[Tuple[str, Tuple[Any, ...]]]) -> Tuple[int, List[str]]:
+    """
+    Runs every input through the fast and the reference parser.
+    Returns: (inputs checked, descriptions of the mismatches)
+    """
+    checked = 0
+    mismatches: List[str] = []
+    for kind, args in corpus:
+        fast, reference = PARSER_PAIRS[kind]
+        expected = reference(*args)
+        got = fast(*args)
+        checked += 1
+        if got != expected:
+            mismatches.append(f"{kind}{args!r}: expected {expected!r}, got {got!r}")
+    return checked, mismatches
+
+# --------------------------------------------------------------------------------------------------------------------
+# Reporting
+# --------------------------------------------------------------------------------------------------------------------
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def best_results(runs: List[Dict]) -> Dict:
+    """
+    Results of several runs (of one revision) merged into one: the fastest of each stage. With more than one run,
+    its noise is the gap to the second fastest run: how well the fastest timing reproduces.
+    """
+    best = dict(runs[0], stages={})
+    for name in dict.fromkeys(name for run in runs for name in run.get("stages", {})):
+        timed = sorted(
+            (run["stages"][name] for run in runs if (run["stages"].get(name) or {}).get("ops_per_sec")),
+            key=lambda stats: -stats["ops_per_sec"],
+        )
+        if not timed:
+            continue
+        noise = timed[0].get("noise")
+        if len(timed) > 1:
+            noise = round(timed[0]["ops_per_sec"] / timed[1]["ops_per_sec"] - 1, 4)
+        best["stages"][name] = dict(timed[0], noise=noise)
+    return best
+
+def _run_benchmark(directory: str, argv: List[str]) -> Dict:
+    # one run in a fresh process; its results JSON
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+        output = f.name
+    try:
+        subprocess.run(
+            [sys.executable, os.path.join(directory, "benchmark.py"), *argv, "--output", output],
+            cwd=directory, check=True, stdout=subprocess.DEVNULL,
+        )
+        with open(output, "r", encoding="utf-8") as f:
+            return json.load(f)
+    finally:
+        os.unlink(output)
+
+def compare_revision(revision: str, argv: List[str], rounds: int) -> Tuple[Dict, Dict]:
+    """
+    Runs this benchmark (argv) on the bot of a git revision and on the bot of this tree, in alternating rounds
+    of separate processes, so both time the same inputs on the same machine.
+    Returns: (results of the revision, results of this tree), each the fastest of its rounds (best_results)
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as checkout:
+        source = subprocess.run(
+            ["git", "show", f"{revision}:{os.path.basename(bot.__file__)}"], cwd=here, capture_output=True, check=True,
+        ).stdout
+        with open(os.path.join(checkout, os.path.basename(bot.__file__)), "wb") as f:
+            f.write(source)
+        shutil.copy(os.path.abspath(__file__), checkout)
+        previous: List[Dict] = []
+        current: List[Dict] = []
+        for n in range(rounds):
+            print(f"Round {n + 1}/{rounds}: {revision} and this tree")
+            previous.append(_run_benchmark(checkout, argv))
+            current.append(_run_benchmark(here, argv))
+    return dict(best_results(previous), revision=revision), best_results(current)
+
+def compare_results(current: Dict, previous: Dict) -> Dict[str, float]:
+    """
+    Throughput ratio current / previous per stage present in both (> 1 is faster).
+    """
+    ratios = {}
+    for name, stats in current["stages"].items():
+        old = previous.get("stages", {}).get(name)
+        if old and old.get("ops_per_sec") and stats.get("ops_per_sec"):
+            ratios[name] = stats["ops_per_sec"] / old["ops_per_sec"]
+    return ratios
+
+def allowed_ratios(current: Dict, previous: Dict, max_slowdown: float) -> Dict[str, float]:
+    """
+    Lowest throughput ratio (compare_results) per stage that is not a regression: 1 - max_slowdown,
+    lowered by the timing noise of the noisier of the two runs.
+    """
+    allowed = {}
+    for name, stats in current["stages"].items():
+        noise = max(stats.get("noise") or 0.0, previous.get("stages", {}).get(name, {}).get("noise") or 0.0)
+        allowed[name] = (1.0 - max_slowdown) / (1.0 + noise)
+    return allowed
+
+def find_regressions(ratios: Dict[str, float], allowed: Dict[str, float]) -> List[str]:
+    """
+    Stages whose throughput ratio (compare_results) dropped below the allowed one (allowed_ratios).
+    """
+    return [name for name, ratio in ratios.items() if ratio < allowed[name]]
+
+def run_stages(stages: List[Stage], args: argparse.Namespace) -> Dict:
+    started = time.perf_counter()
+    workload = Workload(args.scale, args.seed)
+    print(f"Workload: {args.scale} inputs per stage, {len(workload.members)} members ({time.perf_counter() - started:.2f}s to build)")
+
+    results = {
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "scale": args.scale,
+        "seed": args.seed,
+        "members": len(workload.members),
+        "stages": {},
+    }
+    for stage in stages:
+        # the bot logs with print; keep the report readable
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            stats = run_stage(stage, workload, args.scale, measure_memory=not args.no_memory, repeat=args.repeat)
+        results["stages"][stage.name] = stats
+        peak = stats["peak_batch_bytes"]
+        print(
+            f"{stage.name:<28} {stats['ops_per_sec']:>14,.0f} ops/s {stats['ns_per_op']:>10,.0f} ns/op {stats['noise'] or 0:>6.1%} noise"
+            + (f" {peak / 1024:>10,.0f} KiB peak/batch" if peak is not None else "")
+        )
+    return results
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Throughput benchmark of the counter bot parsers and scorer.")
+    parser.add_argument("--scale", type=int, default=10_000, help="Inputs per stage, e.g. 10000 to 10000000")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stages", help="Comma-separated stage names (default: all)")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", nargs="+", help="Results JSON of earlier run(s) to compare throughput against")
+    parser.add_argument("--compare-revision",
+                        help="Git revision to compare throughput against, timed in rounds alternating with this tree")
+    parser.add_argument("--rounds", type=int, default=COMPARE_ROUNDS, help="Rounds of --compare-revision")
+    parser.add_argument("--max-slowdown", type=float, default=DEFAULT_MAX_SLOWDOWN,
+                        help="With --compare(-revision): exit 1 if a stage is slower by more than this fraction beyond the noise")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed passes per stage (per round), the fastest one counts")
+    parser.add_argument("--check-parsers", action="store_true",
+                        help="Only compare the parsers with their reference implementations on --scale generated messages")
+    parser.add_argument("--corpus", nargs="+", default=[], help="Channel exports (JSON/JSONL) to add to --check-parsers")
+    args = parser.parse_args(argv)
+
+    if args.check_parsers:
+        corpus = itertools.chain(generated_parser_corpus(Workload(args.scale, args.seed), args.scale), recorded_parser_corpus(args.corpus))
+        checked, mismatches = check_parsers(corpus)
+        for mismatch in mismatches[:20]:
+            print(mismatch)
+        print(f"Parsers: {checked} inputs checked, {len(mismatches)} mismatches")
+        return 1 if mismatches else 0
+
+    stages = STAGES
+    if args.stages:
+        wanted = set(args.stages.split(","))
+        unknown = wanted - {s.name for s in STAGES}
+        if unknown:
+            parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+        stages = [s for s in STAGES if s.name in wanted]
+
+    if args.compare_revision:
+        run_argv = ["--scale", str(args.scale), "--seed", str(args.seed), "--repeat", str(args.repeat), "--no-memory"]
+        if args.stages:
+            run_argv += ["--stages", args.stages]
+        previous, results = compare_revision(args.compare_revision, run_argv, args.rounds)
+        compared_to = args.compare_revision
+    else:
+        results = run_stages(stages, args)
+        previous = None
+        if args.compare:
+            runs = []
+            for path in args.compare:
+                with open(path, "r", encoding="utf-8") as f:
+                    runs.append(json.load(f))
+            previous = best_results(runs)
+            compared_to = ", ".join(args.compare)
+
+    regressions: List[str] = []
+    if previous is not None:
+        print(f"Compared to {compared_to} (revision {previous.get('revision')}):")
+        ratios = compare_results(results, previous)
+        allowed = allowed_ratios(results, previous, args.max_slowdown)
+        for name, ratio in ratios.items():
+            print(f"{name:<28} {ratio:>6.2f}x (allowed down to {allowed[name]:.2f}x)")
+        regressions = find_regressions(ratios, allowed)
+        for name in regressions:
+            print(f"REGRESSION: {name} is {1 / ratios[name]:.2f}x slower (allowed: {1 / allowed[name]:.2f}x)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,599 @@
+"""
+Local Discord stand-in for end-to-end latency and load tests of /count_rolls and /is_cheater.
+
+An aiohttp server plays the Discord REST API for one synthetic guild: paginated channel history
+(generated on the fly from the message index, so millions of messages cost no memory), the member list,
+and the interaction callback / original response webhooks. Every route has a Discord-style rate limit
+bucket (X-RateLimit-* headers, 429 with retry_after once it is empty), plus optional shared-scope 429s
+and configurable latency. The real bot code and discord.py client run against it with Route.BASE pointed
+at the server; the command callbacks are invoked with interactions built from gateway payloads.
+
+    python load_test.py --messages 1000000 --commands 50 --concurrency 10 --latency-ms 80 --output load.json
+
+Reports p50/p95/p99 command latency, API calls per command, 429s and total throttled time.
+Loot and roll stores are written to a temporary directory.
+"""
+
+from __future__ import annotations
+import os
+import sys
+import json
+import time
+import bisect
+import random
+import asyncio
+import argparse
+import tempfile
+import contextlib
+import contextvars
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, List, Tuple
+
+from aiohttp import web
+import discord
+
+import monolith_uprising_counter_bot as bot
+from benchmark import Workload
+
+# --------------------------------------------------------------------------------------------------------------------
+# Config
+# --------------------------------------------------------------------------------------------------------------------
+
+GUILD_ID = 900_000_000_000_000_001
+APPLICATION_ID = 900_000_000_000_000_002   # the bot user
+ROLL_BOT_ID = 900_000_000_000_000_003      # posts the roll embeds and the loot messages
+INVOKER_ID = 900_000_000_000_000_004       # runs the slash commands; guild owner, so every permission check passes
+ROLL_CHANNEL_ID = 900_000_000_000_000_010
+
+# Snowflake millisecond of the first roll message and spacing of the roll channel timeline
+ROLL_TIMELINE_START = datetime(2026, 1, 10, tzinfo=timezone.utc)
+ROLL_INTERVAL_MS = 50
+# Loot channel messages are spread over the day before the battle
+LOOT_TIMELINE_START = ROLL_TIMELINE_START - timedelta(days=1)
+
+ALL_PERMISSIONS = str(discord.Permissions.all().value)
+
+# --------------------------------------------------------------------------------------------------------------------
+# Fake Discord server
+# --------------------------------------------------------------------------------------------------------------------
+
+def _user_payload(user_id: int, name: str, is_bot: bool = False) -> dict:
+    return {"id": str(user_id), "username": name, "discriminator": "0", "global_name": None, "avatar": None, "bot": is_bot}
+
+@dataclass
+class Timeline:
+    """
+    Message IDs of one channel: message i was posted start_ms + i * interval_ms after the Discord epoch.
+    """
+    count: int
+    start_ms: int
+    interval_ms: int
+
+    def message_id(self, i: int) -> int:
+        return ((self.start_ms + i * self.interval_ms) << 22) + (i & 0xFFF)
+
+    def first_after(self, after_id: int) -> int:
+        i = min(max(0, ((after_id >> 22) - self.start_ms) // self.interval_ms), self.count)
+        while i < self.count and self.message_id(i) <= after_id:
+            i += 1
+        return i
+
+    def last_before(self, before_id: int) -> int:
+        j = min(((before_id >> 22) - self.start_ms) // self.interval_ms, self.count - 1)
+        while j >= 0 and self.message_id(j) >= before_id:
+            j -= 1
+        return j
+
+class FakeDiscord:
+    """
+    The REST side of one synthetic guild. Rate limits are fixed windows per (method, route, major parameter).
+    """
+
+    def __init__(
+        self,
+        workload: Workload,
+        *,
+        roll_messages: int,
+        loot_messages: int,
+        latency_ms: float,
+        jitter_ms: float,
+        rate_limit: int,
+        rate_window: float,
+        shared_429_rate: float,
+        seed: int,
+    ):
+        self.workload = workload
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.shared_429_rate = shared_429_rate
+        self.seed = seed
+        self.rng = random.Random(seed)
+
+        epoch_ms = lambda dt: int(dt.timestamp() * 1000) - discord.utils.DISCORD_EPOCH
+        self.loot_channels: Dict[int, str] = {
+            **{ch: "monolith" for ch in bot.MONOLITH_LOOT_CHANNELS},
+            **{ch: "stalkers" for ch in bot.STALKER_LOOT_CHANNELS},
+        }
+        per_loot_channel = max(1, loot_messages // len(self.loot_channels))
+        self.timelines: Dict[int, Timeline] = {
+            ROLL_CHANNEL_ID: Timeline(roll_messages, epoch_ms(ROLL_TIMELINE_START), ROLL_INTERVAL_MS),
+            **{
+                ch: Timeline(per_loot_channel, epoch_ms(LOOT_TIMELINE_START), max(1, 86_400_000 // per_loot_channel))
+                for ch in self.loot_channels
+            },
+        }
+
+        # one role per distinct role name; @everyone (ID = guild ID) grants everything
+        self.role_ids: Dict[str, int] = {}
+        for member in workload.members:
+            for name in member.role_names:
+                self.role_ids.setdefault(name, 910_000_000_000_000_000 + len(self.role_ids))
+        self.members: Dict[int, dict] = {}
+        for member in workload.members:
+            self.members[member.user_id] = self._member_payload(
+                member.user_id, f"member{member.user_id % 100000}", [self.role_ids[n] for n in member.role_names]
+            )
+        self.members[ROLL_BOT_ID] = self._member_payload(ROLL_BOT_ID, "Wolf", [], is_bot=True)
+        self.members[INVOKER_ID] = self._member_payload(INVOKER_ID, "organizer", [])
+        self.member_ids = sorted(self.members)
+
+        self.buckets: Dict[Tuple[str, str, str], List[float]] = {}  # key -> [window start, used]
+        self.requests = 0
+        self.requests_by_route: Dict[str, int] = {}
+        self.rate_limited = 0
+        self.retry_after_total = 0.0
+        self._next_message_id = 10_000
+
+        self.app = web.Application()
+        self.app.router.add_get("/api/v10/users/@me", self.get_me)
+        self.app.router.add_get("/api/v10/oauth2/applications/@me", self.get_application)
+        self.app.router.add_get("/api/v10/channels/{channel_id}/messages", self.get_messages)
+        self.app.router.add_get("/api/v10/guilds/{guild_id}/members", self.get_members)
+        self.app.router.add_get("/api/v10/guilds/{guild_id}/members/{user_id}", self.get_member)
+        self.app.router.add_post("/api/v10/interactions/{interaction_id}/{token}/callback", self.interaction_callback)
+        self.app.router.add_patch("/api/v10/webhooks/{application_id}/{token}/messages/@original", self.edit_original)
+
+    # ---- payloads ----
+
+    @staticmethod
+    def _member_payload(user_id: int, name: str, role_ids: List[int], is_bot: bool = False) -> dict:
+        return {
+            "user": _user_payload(user_id, name, is_bot),
+            "roles": [str(r) for r in role_ids],
+            "joined_at": "2025-01-01T00:00:00+00:00",
+            "nick": None,
+            "deaf": False,
+            "mute": False,
+            "flags": 0,
+        }
+
+    def guild_payload(self) -> dict:
+        roles = [{"id": str(GUILD_ID), "name": "@everyone", "position": 0, "permissions": ALL_PERMISSIONS,
+                  "color": 0, "hoist": False, "managed": False, "mentionable": False}]
+        roles += [
+            {"id": str(role_id), "name": name, "position": i + 1, "permissions": "0",
+             "color": 0, "hoist": False, "managed": False, "mentionable": False}
+            for i, (name, role_id) in enumerate(self.role_ids.items())
+        ]
+        channels = [self._channel_payload(ch, name) for ch, name in
+                    [(ROLL_CHANNEL_ID, "rolls")] + [(ch, f"loot-{ch % 1000}") for ch in self.loot_channels]]
+        return {
+            "id": str(GUILD_ID),
+            "name": "Load Test Zone",
+            "owner_id": str(INVOKER_ID),
+            "roles": roles,
+            "channels": channels,
+            "emojis": [],
+            "stickers": [],
+            "features": [],
+            "member_count": len(self.members),
+        }
+
+    @staticmethod
+    def _channel_payload(channel_id: int, name: str) -> dict:
+        return {"id": str(channel_id), "type": 0, "name": name, "guild_id": str(GUILD_ID), "position": 0,
+                "permission_overwrites": [], "nsfw": False, "parent_id": None, "topic": None, "rate_limit_per_user": 0}
+
+    def interaction_payload(self, name: str) -> dict:
+        self._next_message_id += 1
+        interaction_id = self._next_message_id
+        return {
+            "id": str(interaction_id),
+            "application_id": str(APPLICATION_ID),
+            "type": 2,
+            "token": f"token-{interaction_id}",
+            "version": 1,
+            "guild_id": str(GUILD_ID),
+            "channel": self._channel_payload(ROLL_CHANNEL_ID, "rolls"),
+            "channel_id": str(ROLL_CHANNEL_ID),
+            "member": {**self.members[INVOKER_ID], "permissions": ALL_PERMISSIONS},
+            "data": {"id": "1", "name": name, "type": 1, "options": []},
+            "app_permissions": ALL_PERMISSIONS,
+            "attachment_size_limit": 8 * 1024 * 1024,
+            "locale": "en-US",
+            "entitlements": [],
+        }
+
+    def _message_payload(self, channel_id: int, message_id: int, author: dict, content: str = "", embeds=None) -> dict:
+        return {
+            "id": str(message_id),
+            "channel_id": str(channel_id),
+            "guild_id": str(GUILD_ID),
+            "type": 0,
+            "author": author,
+            "content": content,
+            "embeds": embeds or [],
+            "attachments": [],
+            "mentions": [],
+            "mention_roles": [],
+            "mention_everyone": False,
+            "pinned": False,
+            "tts": False,
+            "flags": 0,
+            "components": [],
+            "timestamp": discord.utils.snowflake_time(message_id).isoformat(),
+            "edited_timestamp": None,
+        }
+
+    def _history_message(self, channel_id: int, timeline: Timeline, i: int) -> dict:
+        message_id = timeline.message_id(i)
+        rng = random.Random((self.seed << 40) ^ (channel_id << 24) ^ i)
+        roll_bot = _user_payload(ROLL_BOT_ID, "Wolf", True)
+        kind = self.loot_channels.get(channel_id)
+        if kind == "monolith":
+            return self._message_payload(channel_id, message_id, roll_bot, self.workload.monolith_loot_message(rng))
+        if kind == "stalkers":
+            return self._message_payload(channel_id, message_id, roll_bot, self.workload.stalker_loot_message(rng))
+
+        member = rng.choice(self.workload.members)
+        if rng.random() < 0.05:
+            # chatter between the rolls
+            return self._message_payload(channel_id, message_id, self.members[member.user_id]["user"], "gl everyone")
+        embed = {"type": "rich", "title": str(rng.randint(1, 100)), "description": f"<@{member.user_id}> rolled the dice"}
+        return self._message_payload(channel_id, message_id, roll_bot, embeds=[embed])
+
+    # ---- rate limits and latency ----
+
+    async def _enter(self, request: web.Request, major: str) -> Optional[web.Response]:
+        """
+        Simulated latency and rate limit accounting; returns a 429 response if the request is limited.
+        """
+        await asyncio.sleep(max(0.0, self.rng.uniform(self.latency - self.jitter, self.latency + self.jitter)))
+        self.requests += 1
+        route = request.match_info.route.resource.canonical if request.match_info.route.resource else request.path
+        self.requests_by_route[route] = self.requests_by_route.get(route, 0) + 1
+
+        if self.shared_429_rate and self.rng.random() < self.shared_429_rate:
+            retry_after = round(self.rng.uniform(0.1, 1.0), 3)
+            return self._too_many_requests(retry_after, {"X-RateLimit-Scope": "shared"})
+
+        key = (request.method, route, major)
+        now = time.monotonic()
+        bucket = self.buckets.get(key)
+        if bucket is None or now - bucket[0] >= self.rate_window:
+            bucket = self.buckets[key] = [now, 0]
+        reset_after = bucket[0] + self.rate_window - now
+        if bucket[1] >= self.rate_limit:
+            return self._too_many_requests(round(reset_after, 3), {"X-RateLimit-Scope": "user", **self._rate_headers(0, reset_after, key)})
+        bucket[1] += 1
+        request["rate_headers"] = self._rate_headers(self.rate_limit - bucket[1], reset_after, key)
+        return None
+
+    def _rate_headers(self, remaining: int, reset_after: float, key: Tuple[str, str, str]) -> Dict[str, str]:
+        return {
+            "X-RateLimit-Limit": str(self.rate_limit),
+            "X-RateLimit-Remaining": str(remaining),
+            "X-RateLimit-Reset": f"{time.time() + reset_after:.3f}",
+            "X-RateLimit-Reset-After": f"{reset_after:.3f}",
+            "X-RateLimit-Bucket": f"{key[0]}:{key[1]}".encode().hex()[:32],
+        }
+
+    def _too_many_requests(self, retry_after: float, headers: Dict[str, str]) -> web.Response:
+        self.rate_limited += 1
+        self.retry_after_total += retry_after
+        return self._json_response(
+            {"message": "You are being rate limited.", "retry_after": retry_after, "global": False},
+            429,
+            # discord.py treats a 429 without a Via header as a Cloudflare ban and gives up
+            {"Retry-After": str(retry_after), "Via": "1.1 google", **headers},
+        )
+
+    @staticmethod
+    def _json_response(data, status: int, headers: Dict[str, str]) -> web.Response:
+        # discord.py only decodes bodies whose content type is exactly application/json (no charset)
+        return web.Response(body=json.dumps(data).encode(), status=status,
+                            headers={"Content-Type": "application/json", **headers})
+
+    def _json(self, request: web.Request, data, status: int = 200) -> web.Response:
+        return self._json_response(data, status, request.get("rate_headers", {}))
+
+    # ---- routes ----
+
+    async def get_me(self, request: web.Request) -> web.Response:
+        return (await self._enter(request, "@me")) or self._json(request, _user_payload(APPLICATION_ID, "counter-bot", True))
+
+    async def get_application(self, request: web.Request) -> web.Response:
+        return (await self._enter(request, "@me")) or self._json(request, {
+            "id": str(APPLICATION_ID),
+            "name": "counter-bot",
+            "description": "",
+            "icon": None,
+            "bot_public": False,
+            "bot_require_code_grant": False,
+            "owner": _user_payload(INVOKER_ID, "organizer"),
+            "verify_key": "",
+            "flags": 0,
+        })
+
+    async def get_messages(self, request: web.Request) -> web.Response:
+        channel_id = int(request.match_info["channel_id"])
+        limited = await self._enter(request, str(channel_id))
+        if limited:
+            return limited
+        timeline = self.timelines.get(channel_id)
+        if timeline is None:
+            return self._json(request, {"message": "Unknown Channel", "code": 10003}, 404)
+
+        limit = min(int(request.query.get("limit", 50)), 100)
+        if "after" in request.query:
+            first = timeline.first_after(int(request.query["after"]))
+            indexes = range(min(first + limit, timeline.count) - 1, first - 1, -1)
+        else:
+            last = timeline.last_before(int(request.query["before"])) if "before" in request.query else timeline.count - 1
+            indexes = range(last, max(last - limit, -1), -1)
+        # newest first, as Discord returns them
+        return self._json(request, [self._history_message(channel_id, timeline, i) for i in indexes])
+
+    async def get_members(self, request: web.Request) -> web.Response:
+        limited = await self._enter(request, request.match_info["guild_id"])
+        if limited:
+            return limited
+        limit = min(int(request.query.get("limit", 1)), 1000)
+        after = int(request.query.get("after", 0))
+        start = bisect.bisect_right(self.member_ids, after)
+        return self._json(request, [self.members[uid] for uid in self.member_ids[start:start + limit]])
+
+    async def get_member(self, request: web.Request) -> web.Response:
+        limited = await self._enter(request, request.match_info["guild_id"])
+        if limited:
+            return limited
+        member = self.members.get(int(request.match_info["user_id"]))
+        if member is None:
+            return self._json(request, {"message": "Unknown Member", "code": 10007}, 404)
+        return self._json(request, member)
+
+    async def _read_body(self, request: web.Request) -> dict:
+        if request.content_type == "application/json":
+            return await request.json()
+        if request.content_type.startswith("multipart/"):
+            reader = await request.multipart()
+            async for part in reader:
+                if part.name == "payload_json":
+                    return json.loads(await part.text())
+        return {}
+
+    async def interaction_callback(self, request: web.Request) -> web.Response:
+        limited = await self._enter(request, request.match_info["interaction_id"])
+        if limited:
+            return limited
+        body = await self._read_body(request)
+        response_type = body.get("type", 5)
+        interaction = {"id": request.match_info["interaction_id"], "type": 2,
+                       "response_message_loading": response_type == 5, "response_message_ephemeral": True}
+        resource: dict = {"type": response_type}
+        if response_type == 4:
+            self._next_message_id += 1
+            resource["message"] = self._message_payload(
+                ROLL_CHANNEL_ID, self._next_message_id, _user_payload(APPLICATION_ID, "counter-bot", True),
+                (body.get("data") or {}).get("content") or "",
+            )
+            interaction["response_message_id"] = str(self._next_message_id)
+        return self._json(request, {"interaction": interaction, "resource": resource})
+
+    async def edit_original(self, request: web.Request) -> web.Response:
+        limited = await self._enter(request, request.match_info["token"])
+        if limited:
+            return limited
+        body = await self._read_body(request)
+        self._next_message_id += 1
+        return self._json(request, self._message_payload(
+            ROLL_CHANNEL_ID, self._next_message_id, _user_payload(APPLICATION_ID, "counter-bot", True),
+            body.get("content") or "",
+        ))
+
+# --------------------------------------------------------------------------------------------------------------------
+# Harness
+# --------------------------------------------------------------------------------------------------------------------
+
+@dataclass
+class CommandStats:
+    name: str
+    latency: float = 0.0
+    api_calls: int = 0
+    rate_limited: int = 0
+    error: Optional[str] = None
+
+_current_command: contextvars.ContextVar[Optional[CommandStats]] = contextvars.ContextVar("_current_command", default=None)
+
+async def _on_request_start(session, ctx, params) -> None:
+    stats = _current_command.get()
+    if stats is not None:
+        stats.api_calls += 1
+
+async def _on_request_end(session, ctx, params) -> None:
+    stats = _current_command.get()
+    if stats is not None and params.response.status == 429:
+        stats.rate_limited += 1
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    # nearest rank
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, min(len(ordered), round(pct / 100 * len(ordered) + 0.5)))
+    return ordered[rank - 1]
+
+async def _connect(fake: FakeDiscord, port: int) -> discord.Guild:
+    discord.http.Route.BASE = f"http://127.0.0.1:{port}/api/v10"
+    client = bot.bot
+    # attribute API calls to the command whose task made them (before login creates the session and freezes the trace)
+    client.http.http_trace.on_request_start.append(_on_request_start)
+    client.http.http_trace.on_request_end.append(_on_request_end)
+    await client.login("load-test-token")
+
+    state = client._connection
+    guild = discord.Guild(data=fake.guild_payload(), state=state)
+    state._add_guild(guild)
+    # what on_ready does with the chunked member list, through the REST member list instead of the gateway
+    async for member in guild.fetch_members(limit=None):
+        guild._add_member(member)
+    bot.role_index.rebuild(guild)
+    bot.member_roles.load_guild(guild)
+    return guild
+
+async def _run_command(fake: FakeDiscord, guild: discord.Guild, name: str, stats: CommandStats, rng: random.Random, window: timedelta) -> None:
+    _current_command.set(stats)
+    interaction = discord.Interaction(data=fake.interaction_payload(name), state=guild._state)
+    author = guild.get_member(ROLL_BOT_ID)
+    started = time.perf_counter()
+    try:
+        if name == "count_rolls":
+            timeline = fake.timelines[ROLL_CHANNEL_ID]
+            span = timedelta(milliseconds=timeline.count * timeline.interval_ms)
+            offset = timedelta(seconds=rng.uniform(0, max(0.0, (span - window).total_seconds())))
+            start = ROLL_TIMELINE_START + offset
+            await bot.count_rolls.callback(
+                interaction,
+                guild.get_channel(ROLL_CHANNEL_ID),
+                author,
+                start.strftime("%Y-%m-%d %H:%M:%S"),
+                (start + window).strftime("%Y-%m-%d %H:%M:%S"),
+                "UTC",
+            )
+        else:
+            user = guild.get_member(rng.choice(fake.workload.members).user_id)
+            await bot.is_cheater_cmd.callback(interaction, author, user)
+    except Exception as e:  # a failed command is reported, not fatal for the run
+        stats.error = f"{type(e).__name__}: {e}"
+    stats.latency = time.perf_counter() - started
+
+async def run_load_test(args: argparse.Namespace) -> dict:
+    workload = Workload(max(args.messages, 1), args.seed)
+    fake = FakeDiscord(
+        workload,
+        roll_messages=args.messages,
+        loot_messages=args.loot_messages,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        rate_limit=args.rate_limit,
+        rate_window=args.rate_window,
+        shared_429_rate=args.shared_429_rate,
+        seed=args.seed,
+    )
+    runner = web.AppRunner(fake.app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    try:
+        guild = await _connect(fake, port)
+        rng = random.Random(args.seed)
+        names = ["count_rolls"] * args.commands + ["is_cheater"] * args.is_cheater
+        rng.shuffle(names)
+        semaphore = asyncio.Semaphore(args.concurrency)
+        window = timedelta(minutes=args.window_minutes)
+        throttled_before = bot.history_pacer.throttled_seconds
+        all_stats = [CommandStats(name) for name in names]
+
+        async def limited(stats: CommandStats, command_rng: random.Random):
+            async with semaphore:
+                await _run_command(fake, guild, stats.name, stats, command_rng, window)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(limited(s, random.Random(rng.random())) for s in all_stats))
+        wall = time.perf_counter() - started
+    finally:
+        await bot.bot.close()
+        await runner.cleanup()
+
+    report = {
+        "messages": args.messages,
+        "loot_messages": args.loot_messages,
+        "members": len(workload.members),
+        "latency_ms": args.latency_ms,
+        "rate_limit": f"{args.rate_limit}/{args.rate_window}s",
+        "concurrency": args.concurrency,
+        "wall_seconds": round(wall, 3),
+        "server_requests": fake.requests,
+        "server_requests_by_route": fake.requests_by_route,
+        "server_429s": fake.rate_limited,
+        "server_retry_after_seconds": round(fake.retry_after_total, 3),
+        "pacer_throttled_seconds": round(bot.history_pacer.throttled_seconds - throttled_before, 3),
+        "commands": {},
+    }
+    for name in sorted(set(names)):
+        stats = [s for s in all_stats if s.name == name]
+        latencies = [s.latency for s in stats if s.error is None]
+        calls = [s.api_calls for s in stats]
+        report["commands"][name] = {
+            "count": len(stats),
+            "errors": [s.error for s in stats if s.error is not None],
+            "latency_p50": percentile(latencies, 50),
+            "latency_p95": percentile(latencies, 95),
+            "latency_p99": percentile(latencies, 99),
+            "api_calls_mean": sum(calls) / len(calls),
+            "api_calls_max": max(calls),
+            "rate_limited_responses": sum(s.rate_limited for s in stats),
+        }
+    return report
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load test the counter bot commands against a local Discord stand-in.")
+    parser.add_argument("--messages", type=int, default=100_000, help="Messages in the roll channel")
+    parser.add_argument("--loot-messages", type=int, default=20_000, help="Messages over all loot channels")
+    parser.add_argument("--commands", type=int, default=10, help="/count_rolls invocations")
+    parser.add_argument("--is-cheater", type=int, default=10, help="/is_cheater invocations")
+    parser.add_argument("--concurrency", type=int, default=4, help="Commands running at the same time")
+    parser.add_argument("--window-minutes", type=float, default=30, help="/count_rolls window length")
+    parser.add_argument("--latency-ms", type=float, default=50, help="Mean API latency")
+    parser.add_argument("--jitter-ms", type=float, default=20, help="API latency spread (uniform)")
+    parser.add_argument("--rate-limit", type=int, default=50, help="Requests per bucket per window")
+    parser.add_argument("--rate-window", type=float, default=1.0, help="Rate limit window in seconds")
+    parser.add_argument("--shared-429-rate", type=float, default=0.0, help="Share of requests answered with a shared-scope 429")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    parser.add_argument("--verbose", action="store_true", help="Show the bot's debug output")
+    args = parser.parse_args(argv)
+
+    output = os.path.abspath(args.output) if args.output else None
+    with tempfile.TemporaryDirectory(prefix="counter-bot-load-") as workdir:
+        os.chdir(workdir)
+        with contextlib.ExitStack() as stack:
+            if not args.verbose:
+                devnull = stack.enter_context(open(os.devnull, "w"))
+                stack.enter_context(contextlib.redirect_stdout(devnull))
+            report = asyncio.run(run_load_test(args))
+
+    print(f"Wall time: {report['wall_seconds']:.2f}s, {report['server_requests']} API requests, "
+          f"{report['server_429s']} rate limited ({report['server_retry_after_seconds']:.1f}s retry_after), "
+          f"pacer throttled {report['pacer_throttled_seconds']:.1f}s")
+    for name, stats in report["commands"].items():
+        fmt = lambda v: f"{v:.3f}s" if v is not None else "-"
+        print(f"/{name:<12} n={stats['count']:<4} p50={fmt(stats['latency_p50'])} p95={fmt(stats['latency_p95'])} "
+              f"p99={fmt(stats['latency_p99'])} api calls/cmd={stats['api_calls_mean']:.1f} (max {stats['api_calls_max']}) "
+              f"429s={stats['rate_limited_responses']} errors={len(stats['errors'])}")
+        for error in stats["errors"][:5]:
+            print(f"    {error}")
+
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,22 +1,39 @@
 from __future__ import annotations
 import re
 import os
+import sys
 import csv
 import json
+import mmap
 import random
+import sqlite3
 import asyncio
 import time
+import functools
+import itertools
+import operator
+import bisect
+import argparse
+import contextlib
+from array import array
 from datetime import datetime
 from datetime import timedelta
 from zoneinfo import ZoneInfo
-from io import StringIO, BytesIO
+from io import StringIO, BytesIO, TextIOWrapper
 from dataclasses import dataclass
 from collections import defaultdict
-from typing import Optional, Dict, List, Iterable, Set, DefaultDict, Tuple, Union, Sequence
+from concurrent.futures import ProcessPoolExecutor, Future
+from typing import Optional, Dict, List, Iterable, Set, FrozenSet, DefaultDict, Tuple, Union, Sequence, AsyncIterator
 
+import aiohttp
 import discord
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
+
+try:
+    import numpy as np  # optional: only the "numpy" scoring backend needs it
+except ImportError:
+    np = None
 
 # --------------------------------------------------------------------------------------------------------------------
 # Bot Config
@@ -28,6 +45,56 @@ GUILD_ID = "504587323577729024"
 DEFAULT_TZ = "Europe/Kiev"  # requires tzdata on some systems (esp. Windows)
 DATETIME_FORMAT_HINT = "YYYY-MM-DD HH:MM (e.g., 2026-01-02 13:45)"
 
+# How many loot channels may have their history fetched at the same time (shared by both factions)
+LOOT_SCAN_CONCURRENCY = 3
+# How often loot journals are folded into their snapshots, and how many journal records make that worthwhile
+LOOT_COMPACTION_INTERVAL_SECONDS = 600
+LOOT_COMPACTION_MIN_RECORDS = 1
+# Into how many time slices one roll channel window is split; slices are fetched concurrently
+ROLL_SCAN_SLICES = 4
+# Messages per history page; the rate limit pacer is consulted once per page
+HISTORY_PAGE_SIZE = 100
+# Pages a later slice fetches ahead of the slice being read before it waits
+HISTORY_SLICE_PREFETCH_PAGES = 20
+# Below this many remaining requests in a bucket, scans spread the rest evenly until the bucket resets
+RATE_LIMIT_HEADROOM = 3
+
+# Local store of roll channel messages, so overlapping /count_rolls windows are not fetched twice
+ROLL_STORE_PATH = "roll_messages.sqlite3"
+# Messages newer than this may still be arriving, so that part of a window is never marked as stored
+ROLL_STORE_SETTLE_SECONDS = 120
+# On every new gateway session the stored ranges are uncovered from this long before the gateway was last seen,
+# so messages edited or deleted while the bot was offline (never seen by the edit/delete events) are fetched again
+ROLL_STORE_REVALIDATE_MARGIN_SECONDS = 600
+# Without a recorded last-seen time (first start with the store), the last this many seconds are fetched again
+ROLL_STORE_REVALIDATE_SECONDS = 6 * 3600
+# How often the connected gateway is recorded as seen
+GATEWAY_SEEN_INTERVAL_SECONDS = 60
+# Local record of the roles members held over time, so rolls are scored with the roles held when rolling
+ROLE_HISTORY_PATH = "role_history.sqlite3"
+# Score rolls with the roles from the role history where it covers the roll (False: always the current roles)
+SCORE_WITH_ROLE_HISTORY = True
+
+# Live scoreboard (/score): roll channel and roll bot to follow, loot bot whose loot judges cheating,
+# and when the battle started (DEFAULT_TZ, DATETIME_FORMAT_HINT; None = from bot start). Disabled while any ID is None.
+LIVE_ROLL_CHANNEL_ID: Optional[int] = None
+LIVE_ROLL_AUTHOR_ID: Optional[int] = None
+LIVE_LOOT_AUTHOR_ID: Optional[int] = None
+LIVE_BATTLE_START: Optional[str] = None
+# Size of the time buckets the live scoreboard aggregates per faction, for /score range queries
+SCORE_BUCKET_SECONDS = 60
+
+# Scoring backend of full recounts (/count_rolls, replay): "python", or "numpy" for large windows (needs numpy).
+# Can be chosen per run as well; both give identical results.
+SCORING_BACKEND = "python"
+# Rolls the numpy backend buffers before scoring them as one batch
+COLUMNAR_BATCH_ROLLS = 1 << 16
+# Bytes of a roll export per shard of a sharded replay (replay --workers); each shard is parsed and scored
+# by one worker process, so only the shard results travel between processes
+RECOUNT_SHARD_BYTES = 8 << 20
+# Judge every roll against the loot posted before the roll message (True), or against all loot collected so far
+CHEATER_CHECK_AS_OF_ROLL = True
+
 # --------------------------------------------------------------------------------------------------------------------
 # Game Config
 # --------------------------------------------------------------------------------------------------------------------
@@ -38,6 +105,9 @@ TRANSITIONED_FACTIONS = {"Noon"}
 # Channel IDs
 MONOLITH_LOOT_CHANNELS = {1452622206675976242} # "monolith-prayer-site"
 STALKER_LOOT_CHANNELS = {1452623240471122053, 1452623201665548361, 1452623566855082055, 1452623345928372275} # "lesser-zone", "cordon", "yantar", "garbage"
+# Loot bots whose loot index is caught up on startup and then kept live from new messages
+# (loot bots used in /count_rolls or /is_cheater are kept live as well once they were used)
+LOOT_BOT_AUTHOR_IDS: Set[int] = set()
 
 MONOLITH_WEAPONS = {"UDP", "Fora230", "M860Monolith", "G37", "M701", "SPSA", "GP3a", "RPG", "Gauss Rifle"}
 MONOLITH_ARMOR = {"Monolith Battle Armor", "Exoskeleton", "Improved Exoskeleton"}
@@ -68,7 +138,53 @@ ALL_ARMOR |= set(MONOLITH_ARMOR)
 
 MONOLITH_MULTIPLIER = 1.75
 
-FLAT_EQUIPMENT_BONUSES: Dict[str, int] = {
+class BonusTable(dict):
+    """
+    dict that bumps BonusTable.version on every change, so the compiled bonus lookup
+    (see calculate_equipment_bonus) is rebuilt whenever any bonus table is edited.
+    """
+    version = 0
+
+    def _changed(self) -> None:
+        BonusTable.version += 1
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._changed()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._changed()
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._changed()
+
+    def setdefault(self, key, default=None):
+        value = super().setdefault(key, default)
+        self._changed()
+        return value
+
+    def pop(self, *args):
+        value = super().pop(*args)
+        self._changed()
+        return value
+
+    def popitem(self):
+        item = super().popitem()
+        self._changed()
+        return item
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+
+FLAT_EQUIPMENT_BONUSES: Dict[str, int] = BonusTable({
     "UDP": 3,
     "Fora230": 3,
     "M860Monolith": 3,
@@ -96,78 +212,78 @@ FLAT_EQUIPMENT_BONUSES: Dict[str, int] = {
     "Berill-5M Armored Suit": 4,
     "Silencer": 2,
     "Jellyfish": 3,
-}
+})
 
-ODD_ROLL_EQUIPMENT_BONUSES: Dict[str, int] = {
+ODD_ROLL_EQUIPMENT_BONUSES: Dict[str, int] = BonusTable({
     "TOZ-34": 4,
     "PSZ-7 Military Armor": 3,
     "Tactical Scope": 3,
-}
+})
 
-EVEN_ROLL_EQUIPMENT_BONUSES: Dict[str, int] = {
+EVEN_ROLL_EQUIPMENT_BONUSES: Dict[str, int] = BonusTable({
     "M860Monolith": 3,
     "Dnipro": 5,
     "Marauder Suit": 3,
-}
+})
 
-MORETHAN_90_EQUIPMENT_BONUSES: Dict[str, int] = {
+MORETHAN_90_EQUIPMENT_BONUSES: Dict[str, int] = BonusTable({
     "Gauss Rifle": 10,
     "Fora": 2,
     "PSZ-5V Guardian of Freedom": 5,
     "SVU": 3,
-}
+})
 
-MORETHAN_85_EQUIPMENT_BONUSES: Dict[str, int] = {
+MORETHAN_85_EQUIPMENT_BONUSES: Dict[str, int] = BonusTable({
     "RPG": 7,
     "M701": 6,
-}
+})
 
-MORETHAN_80_EQUIPMENT_BONUSES: Dict[str, int] = {
+MORETHAN_80_EQUIPMENT_BONUSES: Dict[str, int] = BonusTable({
     "G37": 3,
     "GP3a": 6,
     "Improved Exoskeleton": 6,
     "Monolith Battle Armor": 3,
     "AKM-74U": 1,
     "Berill-5M Armored Suit": 4,
-}
+})
 
-MORETHAN_75_EQUIPMENT_BONUSES: Dict[str, int] = {
+MORETHAN_75_EQUIPMENT_BONUSES: Dict[str, int] = BonusTable({
     "Exoskeleton": 4,
-}
+})
 
-MORETHAN_70_EQUIPMENT_BONUSES: Dict[str, int] = {
+MORETHAN_70_EQUIPMENT_BONUSES: Dict[str, int] = BonusTable({
     "PSZ-20W Convoy": 5,
     "SVU": 5,
-}
+})
 
-ENDSIN_0_EQUIPMENT_BONUSES: Dict[str, int] = {
+ENDSIN_0_EQUIPMENT_BONUSES: Dict[str, int] = BonusTable({
     "Fora230": 5,
     "Kora": 4,
-}
+})
 
-ENDSIN_5_EQUIPMENT_BONUSES: Dict[str, int] = {
+ENDSIN_5_EQUIPMENT_BONUSES: Dict[str, int] = BonusTable({
     "PTM": 2,
     "Sunrise Suit": 3,
-}
+})
 
-ENDSIN_7_EQUIPMENT_BONUSES: Dict[str, int] = {
+ENDSIN_7_EQUIPMENT_BONUSES: Dict[str, int] = BonusTable({
     "UDP": 3,
-}
+})
 
-ENDSIN_9_EQUIPMENT_BONUSES: Dict[str, int] = {
+ENDSIN_9_EQUIPMENT_BONUSES: Dict[str, int] = BonusTable({
     "SPSA": 4,
     "Rhino": 4,
     "SEVA suit": 2,
-}
+})
 
-CONTAINS_9_EQUIPMENT_BONUSES: Dict[str, int] = {
+CONTAINS_9_EQUIPMENT_BONUSES: Dict[str, int] = BonusTable({
     "OZK Explorer suit": 4,
-}
+})
 
-UNLUCKY_100_EQUIPMENT_MINUSES: Dict[str, int] = {
+UNLUCKY_100_EQUIPMENT_MINUSES: Dict[str, int] = BonusTable({
     "Berill-5M Armored Suit": 4,
     "PSZ-20W Convoy": 5,
-}
+})
 
 WEIRD_FLOWER_PAIR_ROLL = 96
 WEIRD_BOLT_1_2_ROLL = 100
@@ -195,18 +311,88 @@ WRONG_LOOTED_EQUIPMENT_NAMES: Dict[str, str] = {
 FACTION_WARS_24_STALKER_ARMOR = {"Sunrise Suit", "Leather Jacket"}
 FACTION_WARS_24_MONOLITH_ARMOR = {"Exoskeleton"}
 FACTION_WARS_24_ROLES = {"FactionWars24", "Your Inventory", "AKM", "Sawn-off", "VS Vintar"}
-global_faction_wars_24_checks: List[str] = []
+# Armor role selection message(s) of this event, (channel ID, message ID): a reaction with an armor's emoji
+# means that armor role is from this event, no reaction means a FactionWars24 armor role is the 2024 one
+ARMOR_SELECTION_MESSAGES: List[Tuple[int, int]] = []
+# Reaction emoji (unicode emoji, or the name of a custom emoji) -> armor role it selects
+ARMOR_SELECTION_EMOJIS: Dict[str, str] = {
+    # "🌅": "Sunrise Suit",
+    # "🧥": "Leather Jacket",
+    # "🦾": "Exoskeleton",
+}
 
 # --------------------------------------------------------------------------------------------------------------------
 # Bot setup
 # --------------------------------------------------------------------------------------------------------------------
 
+# Matches the channel ID of /channels/<id>/messages requests
+_MESSAGES_ROUTE_RE = re.compile(r"/channels/(\d+)/messages")
+
+@dataclass
+class _BucketState:
+    remaining: int
+    reset_at: float  # time.monotonic()
+
+class RateLimitPacer:
+    """
+    Paces history scans by the rate limit state Discord reports back.
+    It is fed from aiohttp trace hooks on discord.py's HTTP session, so it also sees the 429s
+    discord.py retries internally. Scans run at full speed while the bucket has headroom.
+    """
+
+    def __init__(self, headroom: int = RATE_LIMIT_HEADROOM):
+        self.headroom = headroom
+        self.buckets: Dict[int, _BucketState] = {}  # key: channel ID of the messages route
+        self.blocked_until = 0.0                    # set by 429 retry-after, applies to every scan
+        self.throttled_seconds = 0.0                # total time scans spent waiting on the pacer
+
+    def observe(self, url: str, status: int, headers) -> None:
+        m = _MESSAGES_ROUTE_RE.search(url)
+        if m is None:
+            return
+        now = time.monotonic()
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset_after = headers.get("X-RateLimit-Reset-After")
+        if remaining is not None and reset_after is not None:
+            self.buckets[int(m.group(1))] = _BucketState(int(remaining), now + float(reset_after))
+        if status == 429:
+            retry_after = headers.get("Retry-After") or reset_after or 1
+            self.blocked_until = max(self.blocked_until, now + float(retry_after))
+            print(f"[DEBUG] 429 on {url}, backing off for {float(retry_after):.2f}s")
+
+    def delay_for(self, channel_id: int) -> float:
+        now = time.monotonic()
+        if self.blocked_until > now:
+            return self.blocked_until - now
+        bucket = self.buckets.get(channel_id)
+        if bucket is None or bucket.reset_at <= now or bucket.remaining > self.headroom:
+            return 0.0
+        # spread the requests that are left evenly over the rest of the bucket window
+        return (bucket.reset_at - now) / (bucket.remaining + 1)
+
+    async def pace(self, channel_id: int) -> None:
+        delay = self.delay_for(channel_id)
+        if delay > 0:
+            self.throttled_seconds += delay
+            await asyncio.sleep(delay)
+
+def _rate_limit_trace_config(pacer: RateLimitPacer) -> aiohttp.TraceConfig:
+    trace_config = aiohttp.TraceConfig()
+
+    async def on_request_end(session, ctx, params) -> None:
+        pacer.observe(str(params.url), params.response.status, params.response.headers)
+
+    trace_config.on_request_end.append(on_request_end)
+    return trace_config
+
+history_pacer = RateLimitPacer()
+
 intents = discord.Intents.default()
 intents.members = True          # recommended for role lookups/fetch_member
 intents.message_content = True # not required for mentions[]; enable only if you need msg.content
 
 OWNER_USER_ID = 874038967610265630
-bot = commands.Bot(command_prefix="!", intents=intents)
+bot = commands.Bot(command_prefix="!", intents=intents, http_trace=_rate_limit_trace_config(history_pacer))
 
 # --------------------------------------------------------------------------------------------------------------------
 # Utility functions
@@ -243,25 +429,6 @@ def extract_user_ids_from_embeds(embeds: Iterable[discord.Embed]) -> Set[int]:
             ids |= extract_user_ids_from_text(e.url)
     return ids
 
-def _merge_dicts(
-    dict_1: Dict[int, Set[str]],
-    dict_2: Dict[int, Set[str]],
-) -> Dict[int, Set[str]]:
-    merged_dict = {k: set(v) for k, v in dict_1.items()} # copy sets
-    for k, v in dict_2.items():
-        merged_dict.setdefault(k, set()).update(v)
-    return merged_dict
-
-def _safe_remove(path: Optional[str]) -> None:
-    if not path:
-        return
-    try:
-        os.remove(path)
-    except FileNotFoundError:
-        pass
-    except OSError as e:
-        print(f"Could not delete old cache file {path}: {e}")
-
 def parse_datetime(dt_str: str, tz_name: str) -> datetime:
     """
     Parse "YYYY-MM-DD HH:MM" (or ISO-like "YYYY-MM-DDTHH:MM") in the given timezone.
@@ -301,6 +468,51 @@ async def on_ready():
         await bot.tree.sync()
         print(f"[DEBUG] ✅ Logged in as {bot.user} | synced globally (can take time to appear)")
 
+    if not compact_loot_journals.is_running():
+        compact_loot_journals.start()
+
+    for g in bot.guilds:
+        role_index.rebuild(g)
+        if not g.chunked:
+            await g.chunk()
+        member_roles.load_guild(g)
+        role_history.record_roles(g.id, ((r.id, r.name, r.position) for r in g.roles if not r.is_default()))
+        changed = role_history.record(g.id, ((m.id, member_role_ids(m)) for m in g.members))
+        print(f"[DEBUG] Role history: {changed} role changes recorded in {g.name}")
+    print(f"[DEBUG] Role index built: {len(role_index.roles)} equipment/faction roles")
+    await armor_selection.refresh(bot)
+
+    # a new gateway session may have missed loot messages: catch every known loot index up from history
+    global gateway_session
+    gateway_session += 1
+    for store in loot_stores.values():
+        store.live = False
+    for g in bot.guilds:
+        author_ids = set(LOOT_BOT_AUTHOR_IDS) | {a for (gid, a, _) in loot_stores if gid == g.id}
+        for author_id in author_ids:
+            loot_author = g.get_member(author_id)
+            if loot_author is not None:
+                task = asyncio.create_task(collect_all_loot(loot_author))
+                _background_tasks.add(task)
+                task.add_done_callback(_background_tasks.discard)
+
+    # rolls may have been edited or deleted while disconnected: the stored messages since then are fetched again
+    revalidated = roll_store.revalidate(ROLL_STORE_REVALIDATE_MARGIN_SECONDS)
+    print(f"[DEBUG] Roll store: {revalidated} stored ranges to revalidate")
+    global gateway_seen_live
+    gateway_seen_live = True
+    roll_store.mark_seen()
+    if not record_gateway_seen.is_running():
+        record_gateway_seen.start()
+
+    # rolls may have been missed while disconnected: rebuild the live scoreboard from the roll store
+    if live_scoreboard.enabled:
+        for g in bot.guilds:
+            if g.get_channel(LIVE_ROLL_CHANNEL_ID) is not None:
+                task = asyncio.create_task(live_scoreboard.start(g))
+                _background_tasks.add(task)
+                task.add_done_callback(_background_tasks.discard)
+
 
 def has_scan_permission(interaction: discord.Interaction) -> bool:
     perms = interaction.user.guild_permissions
@@ -318,54 +530,399 @@ def _short(s: str, n: int = 900) -> str:
 # Parsing equipment from the loot channels
 # --------------------------------------------------------------------------------------------------------------------
 
-_LOOT_CACHE_RE = re.compile(r"^(?P<guild>\d+)_(?P<kind>stalkers|monolith)_(?P<ts>\d+)\.json$")
-
-def _loot_cache_path(guild_id: int, faction: str, ts_epoch: int) -> str:
-    # faction: "stalkers" or "monolith"
-    return f"{guild_id}_{faction}_{ts_epoch}.json"
-
-def _find_latest_loot_cache(guild_id: int, kind: str) -> tuple[Optional[str], Optional[datetime]]:
+LootRecord = Tuple[int, int, str]  # (message_id, user_id, item)
+
+# Item name -> bit, assigned on first sight and shared by every loot index and equipment mask
+ITEM_BITS: Dict[str, int] = {}
+ITEM_NAMES: List[str] = []  # bit position -> item name
+
+def item_bit(item: str) -> int:
+    bit = ITEM_BITS.get(item)
+    if bit is None:
+        bit = ITEM_BITS[item] = 1 << len(ITEM_NAMES)
+        ITEM_NAMES.append(item)
+    return bit
+
+def items_mask(items: Iterable[str]) -> int:
+    bits = ITEM_BITS
+    mask = 0
+    for item in items:
+        mask |= bits.get(item) or item_bit(item)
+    return mask
+
+def mask_items(mask: int) -> Set[str]:
+    items = set()
+    while mask:
+        low = mask & -mask
+        items.add(ITEM_NAMES[low.bit_length() - 1])
+        mask ^= low
+    return items
+
+# Message ID later than any real one (snowflakes are below 2**63): "as of now" in loot lookups,
+# and the end of a range that never ends
+LOOT_NOW = 1 << 63
+_LOOT_FOREVER = 1 << 64
+
+class LootIndex:
     """
-    Finds the newest cache file for this guild/kind by timestamp embedded in filename.
-    Returns (path, timestamp_utc) or (None, None) if not found.
+    user ID -> bitmask of the items the user looted (bits from item_bit).
+    Also keeps the earliest loot message ID of every (user, item), so ownership can be looked up as of
+    any message (owned_at) with a binary search over a per-user timeline.
+    version is bumped whenever a user gains an item or an item turns out to be looted earlier.
     """
-    best_ts: Optional[int] = None
-    best_path: Optional[str] = None
+    __slots__ = ("masks", "version", "first_loot", "_timelines")
+
+    def __init__(self):
+        self.masks: Dict[int, int] = {}
+        self.version = 0
+        self.first_loot: Dict[int, Dict[int, int]] = {}  # user ID -> item bit -> earliest loot message ID
+        # user ID -> (distinct first-loot message IDs ascending, items looted up to each), built on demand
+        self._timelines: Dict[int, Tuple[List[int], List[int]]] = {}
+
+    def add(self, user_id: int, item: str, message_id: int = 0) -> None:
+        """
+        message_id: the loot message; 0 (unknown) counts as looted before everything.
+        """
+        bit = item_bit(item)
+        firsts = self.first_loot.get(user_id)
+        if firsts is None:
+            firsts = self.first_loot[user_id] = {}
+        first = firsts.get(bit)
+        if first is not None and first <= message_id:
+            return
+        firsts[bit] = message_id
+        self.masks[user_id] = self.masks.get(user_id, 0) | bit
+        self._timelines.pop(user_id, None)
+        self.version += 1
+
+    def first(self, user_id: int, item: str) -> Optional[int]:
+        return self.first_loot.get(user_id, {}).get(item_bit(item))
+
+    def replace_first(self, user_id: int, item: str, message_id: Optional[int]) -> None:
+        """
+        Sets the earliest loot message of (user, item) again, after the old one turned out not to be loot
+        of it (an edited message); None: the user never looted the item.
+        """
+        bit = item_bit(item)
+        firsts = self.first_loot.get(user_id)
+        if firsts is None or bit not in firsts:
+            if message_id is not None:
+                self.add(user_id, item, message_id)
+            return
+        if message_id is None:
+            del firsts[bit]
+            self.masks[user_id] &= ~bit
+            if not firsts:
+                del self.first_loot[user_id]
+                del self.masks[user_id]
+        else:
+            firsts[bit] = message_id
+        self._timelines.pop(user_id, None)
+        self.version += 1
+
+    def mask(self, user_id: int) -> int:
+        return self.masks.get(user_id, 0)
+
+    def items(self, user_id: int) -> Set[str]:
+        return mask_items(self.masks.get(user_id, 0))
+
+    def _timeline(self, user_id: int) -> Tuple[List[int], List[int]]:
+        ids: List[int] = []
+        masks: List[int] = []
+        mask = 0
+        for bit, first in sorted(self.first_loot.get(user_id, {}).items(), key=lambda kv: kv[1]):
+            mask |= bit
+            if ids and ids[-1] == first:
+                masks[-1] = mask
+            else:
+                ids.append(first)
+                masks.append(mask)
+        timeline = self._timelines[user_id] = (ids, masks)
+        return timeline
+
+    def owned_at(self, user_id: int, message_id: int) -> Tuple[int, int, int]:
+        """
+        Items the user looted before message `message_id` (message IDs order by time), by binary search.
+        Returns: (mask, since, until) where the same mask holds for every message ID in [since, until)
+        """
+        timeline = self._timelines.get(user_id)
+        if timeline is None:
+            timeline = self._timeline(user_id)
+        ids, masks = timeline
+        i = bisect.bisect_left(ids, message_id)
+        return (
+            masks[i - 1] if i else 0,
+            ids[i - 1] + 1 if i else 0,
+            ids[i] + 1 if i < len(ids) else _LOOT_FOREVER,
+        )
 
-    for name in os.listdir("."):
-        m = _LOOT_CACHE_RE.match(name)
-        if not m:
-            continue
-        if m.group("guild") != str(guild_id) or m.group("kind") != kind:
-            continue
+    def records(self) -> Iterable[LootRecord]:
+        """
+        (earliest loot message ID, user ID, item) of every item of every user.
+        """
+        for user_id, firsts in self.first_loot.items():
+            for bit, message_id in firsts.items():
+                yield message_id, user_id, ITEM_NAMES[bit.bit_length() - 1]
 
-        ts = int(m.group("ts"))
-        if best_ts is None or ts > best_ts:
-            best_ts = ts
-            best_path = name
+    def __len__(self) -> int:
+        return len(self.masks)
 
-    if best_ts is None or best_path is None:
-        return None, None
+class MergedLoot:
+    """
+    Union of several loot indexes as a view: masks are OR'ed per lookup, nothing is copied,
+    so it always reflects the current state of its parts.
+    """
+    __slots__ = ("parts",)
+
+    def __init__(self, *parts: Union[LootIndex, "MergedLoot"]):
+        self.parts = parts
+
+    @property
+    def version(self) -> int:
+        version = 0
+        for part in self.parts:
+            version += part.version
+        return version
+
+    def mask(self, user_id: int) -> int:
+        mask = 0
+        for part in self.parts:
+            mask |= part.mask(user_id)
+        return mask
+
+    def items(self, user_id: int) -> Set[str]:
+        return mask_items(self.mask(user_id))
+
+    def owned_at(self, user_id: int, message_id: int) -> Tuple[int, int, int]:
+        mask, since, until = 0, 0, _LOOT_FOREVER
+        for part in self.parts:
+            part_mask, part_since, part_until = part.owned_at(user_id, message_id)
+            mask |= part_mask
+            since = max(since, part_since)
+            until = min(until, part_until)
+        return mask, since, until
+
+LootView = Union[LootIndex, MergedLoot]
+
+_FACTION_WARS_24_ARMOR_MASK = items_mask(FACTION_WARS_24_MONOLITH_ARMOR | FACTION_WARS_24_STALKER_ARMOR)
+
+_LOOT_SNAPSHOT_HEADER = b"monolith-loot-snapshot 1\n"
+# loot caches of earlier versions: <guild>_<faction>_<UNIX time of the scan>.json
+_LEGACY_LOOT_CACHE_RE = re.compile(r"^(?P<guild>\d+)_(?P<kind>stalkers|monolith)_(?P<ts>\d+)\.json$")
+
+def _fsync_dir(path: str) -> None:
+    # makes a rename durable; directories cannot be opened like this on Windows
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
 
-    # to make sure there is no new messages from the moment parsing is stopped and timestamp is created, 60 seconds are subtracted
-    return best_path, datetime.fromtimestamp(best_ts, tz=ZoneInfo("UTC")) - timedelta(seconds=60)
+class LootStore:
+    """
+    Loot of one guild/loot-bot author/faction as a LootIndex plus, per loot channel,
+    the last message ID parsed.
+
+    On disk it is a compact snapshot plus an append-only journal of lines
+      L<TAB>message_id<TAB>user_id<TAB>item    (loot record)
+      D<TAB>message_id                         (the message is not loot anymore: an edited message)
+      C<TAB>channel_id<TAB>message_id          (channel cursor)
+    Appends are fsync'ed; compaction writes the whole state as a new snapshot (atomic rename)
+    and then empties the journal. Replaying is idempotent, so a crash between the two steps is harmless.
+    """
 
-def _read_loot_cache(path: str) -> Dict[int, Set[str]]:
-    with open(path, "r", encoding="utf-8") as f:
-        raw = json.load(f)
-    out: Dict[int, Set[str]] = {}
-    for k, v in raw.items():
+    def __init__(self, guild_id: int, author_id: int, faction: str):
+        # faction: "stalkers" or "monolith"
+        base = f"{guild_id}_{author_id}_{faction}_loot"
+        self.snapshot_path = base + ".snapshot"
+        self.journal_path = base + ".journal"
+        self.loot = LootIndex()  # with the earliest loot message ID per (user, item)
+        # message ID -> (user ID, item) of every loot message, so an edited one can be replaced
+        self.messages: Dict[int, Tuple[int, str]] = {}
+        self.cursors: Dict[int, int] = {}
+        self.journal_records = 0
+        self.lock = asyncio.Lock()
+        # True once history was caught up during the current gateway session; from then on
+        # on_message keeps the store current and commands use it without touching history
+        self.live = False
+        self._load()
+        if not self.cursors:
+            self._import_legacy_cache(guild_id, faction)
+
+    def _apply_loot(self, message_id: int, user_id: int, item: str) -> None:
+        self.loot.add(user_id, item, message_id)
+        if message_id:
+            self.messages[message_id] = (user_id, item)
+
+    def _apply_drop(self, message_id: int) -> None:
+        record = self.messages.pop(message_id, None)
+        if record is None:
+            return
+        user_id, item = record
+        if self.loot.first(user_id, item) == message_id:
+            # the next loot message of the item takes its place (a scan, but edits of loot are rare)
+            later = [other_id for other_id, other in self.messages.items() if other == record]
+            self.loot.replace_first(user_id, item, min(later) if later else None)
+
+    def _apply_cursor(self, channel_id: int, message_id: int) -> None:
+        if message_id > self.cursors.get(channel_id, 0):
+            self.cursors[channel_id] = message_id
+
+    def _apply_line(self, line: bytes) -> bool:
+        # corrupt lines (bad UTF-8 included, UnicodeDecodeError is a ValueError) are skipped
         try:
-            uid = int(k)
+            parts = line.rstrip(b"\n").decode("utf-8").split("\t")
+            if parts[0] == "L" and len(parts) == 4:
+                self._apply_loot(int(parts[1]), int(parts[2]), parts[3])
+                return True
+            if parts[0] == "C" and len(parts) == 3:
+                self._apply_cursor(int(parts[1]), int(parts[2]))
+                return True
+            if parts[0] == "D" and len(parts) == 2:
+                self._apply_drop(int(parts[1]))
+                return True
         except ValueError:
-            continue
-        out[uid] = set(v or [])
-    return out
+            pass
+        return False
+
+    def _load(self) -> None:
+        try:
+            with open(self.snapshot_path, "rb") as f:
+                if os.fstat(f.fileno()).st_size > len(_LOOT_SNAPSHOT_HEADER):
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        if mm.readline() == _LOOT_SNAPSHOT_HEADER:
+                            for line in iter(mm.readline, b""):
+                                self._apply_line(line)
+        except FileNotFoundError:
+            pass
 
-def _write_loot_cache(path: str, loot: Dict[int, Set[str]]) -> None:
-    serializable = {str(uid): sorted(list(items)) for uid, items in loot.items()}
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(serializable, f, ensure_ascii=False, indent=2)
+        try:
+            with open(self.journal_path, "rb+") as f:
+                good_size = 0
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # torn append from a crash
+                    self._apply_line(line)
+                    self.journal_records += 1
+                    good_size += len(line)
+                f.truncate(good_size)
+        except FileNotFoundError:
+            pass
+
+    def _import_legacy_cache(self, guild_id: int, faction: str) -> None:
+        """
+        Imports the newest loot cache of earlier versions ({user_id: [items]} in <guild>_<faction>_<ts>.json),
+        so the first start does not read whole loot channels again. The cache has no message IDs: its loot counts
+        as looted before any roll, and each loot channel of the faction is read again from a minute before
+        the cache was written. The cache file is renamed to *.imported afterwards.
+        """
+        best_ts, best_path = None, None
+        for name in os.listdir("."):
+            m = _LEGACY_LOOT_CACHE_RE.match(name)
+            if m and m.group("guild") == str(guild_id) and m.group("kind") == faction:
+                if best_ts is None or int(m.group("ts")) > best_ts:
+                    best_ts, best_path = int(m.group("ts")), name
+        if best_path is None:
+            return
+        try:
+            with open(best_path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            records = [(0, int(uid), item) for uid, items in raw.items() for item in items or []]
+            cutoff_id = discord.utils.time_snowflake(datetime.fromtimestamp(best_ts - 60, tz=ZoneInfo("UTC")))
+            channels = MONOLITH_LOOT_CHANNELS if faction == "monolith" else STALKER_LOOT_CHANNELS
+            self.append(records, {channel_id: cutoff_id for channel_id in channels})
+            self.compact()
+            os.replace(best_path, best_path + ".imported")
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"Could not import loot cache {best_path}, the loot channels are read in full: {e}")
+            return
+        print(f"[DEBUG] Imported {len(records)} loot records from {best_path}")
+
+    def append(self, records: Iterable[LootRecord], cursors: Dict[int, int]) -> None:
+        lines: List[str] = []
+        for message_id, user_id, item in records:
+            self._apply_loot(message_id, user_id, item)
+            lines.append(f"L\t{message_id}\t{user_id}\t{item}\n")
+        for channel_id, message_id in cursors.items():
+            if message_id != self.cursors.get(channel_id):
+                self._apply_cursor(channel_id, message_id)
+                lines.append(f"C\t{channel_id}\t{message_id}\n")
+        self._write_journal(lines)
+
+    def replace(self, message_id: int, records: Sequence[LootRecord]) -> None:
+        """
+        Replaces the loot of an edited message by `records` (none: it is not loot anymore).
+        """
+        old = self.messages.get(message_id)
+        if [(user_id, item) for _, user_id, item in records] == ([old] if old is not None else []):
+            return
+        lines: List[str] = []
+        if old is not None:
+            self._apply_drop(message_id)
+            lines.append(f"D\t{message_id}\n")
+        for _, user_id, item in records:
+            self._apply_loot(message_id, user_id, item)
+            lines.append(f"L\t{message_id}\t{user_id}\t{item}\n")
+        self._write_journal(lines)
+
+    def _write_journal(self, lines: List[str]) -> None:
+        if not lines:
+            return
+        with open(self.journal_path, "ab") as f:
+            f.write("".join(lines).encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+        self.journal_records += len(lines)
+
+    def compact(self) -> None:
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_LOOT_SNAPSHOT_HEADER)
+            f.write("".join(
+                f"C\t{channel_id}\t{message_id}\n" for channel_id, message_id in self.cursors.items()
+            ).encode("utf-8"))
+            # every loot message, and the earliest loot without a message (imported)
+            records = {(message_id, user_id, item) for message_id, (user_id, item) in self.messages.items()}
+            records.update(record for record in self.loot.records() if not record[0])
+            f.write("".join(
+                f"L\t{message_id}\t{user_id}\t{item}\n"
+                for message_id, user_id, item in sorted(records)
+            ).encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+        _fsync_dir(self.snapshot_path)
+        # everything in the journal is in the snapshot now
+        with open(self.journal_path, "wb") as f:
+            os.fsync(f.fileno())
+        print(f"[DEBUG] Compacted {self.journal_records} journal records into {self.snapshot_path}")
+        self.journal_records = 0
+
+loot_stores: Dict[Tuple[int, int, str], LootStore] = {}
+# bumped on every new gateway session (on_ready); a catch-up only makes a store live if no new session started meanwhile
+gateway_session = 0
+_background_tasks: Set[asyncio.Task] = set()
+
+def get_loot_store(guild_id: int, author_id: int, faction: str) -> LootStore:
+    key = (guild_id, author_id, faction)
+    store = loot_stores.get(key)
+    if store is None:
+        store = loot_stores[key] = LootStore(guild_id, author_id, faction)
+    return store
+
+@tasks.loop(seconds=LOOT_COMPACTION_INTERVAL_SECONDS)
+async def compact_loot_journals():
+    for store in list(loot_stores.values()):
+        if store.journal_records < LOOT_COMPACTION_MIN_RECORDS:
+            continue
+        # off the event loop; the lock keeps appends out while the snapshot is written
+        async with store.lock:
+            try:
+                await asyncio.to_thread(store.compact)
+            except OSError as e:
+                print(f"Could not compact loot journal {store.journal_path}: {e}")
 
 def _extract_first_mention_user_id(line: str) -> Optional[int]:
     """
@@ -388,6 +945,21 @@ def _resolve_channels(
                 out.append(resolved)
     return out
 
+_MONOLITH_ITEM_RE = re.compile(r"\byou got\s+(.+?)\s*$", flags=re.IGNORECASE)
+
+def _first_line(content: str) -> Tuple[int, str]:
+    """
+    First non-blank line of the message without its leading whitespace, found without splitting the message.
+    Returns: (offset where the line ends, line)
+    """
+    head = content.lstrip()
+    end = head.find("\n")
+    first = head if end < 0 else head[:end]
+    if not first.isprintable():
+        # \r, \v, \x1c, \u2028 and the other str.splitlines() boundaries end a line as well
+        first = first.splitlines()[0]
+    return len(content) - len(head) + len(first), first
+
 def _parse_stalker_loot_message(content: str) -> Optional[Tuple[int, str]]:
     """
     STALKERS format:
@@ -396,36 +968,28 @@ def _parse_stalker_loot_message(content: str) -> Optional[Tuple[int, str]]:
       You Got <item name>
 
     Return (userid, item) if successful; otherwise None.
+    Only the first line is looked at until it proved to be a successful foray.
     """
-    if not content:
-        return None
-
-    lines = [ln.strip() for ln in content.splitlines() if ln.strip()]
-    if not lines:
-        return None
-
-    first = lines[0]
-    uid = _extract_first_mention_user_id(first)
-    if uid is None:
-        return None
+    if not content or "<@" not in content:
+        return None  # no mention anywhere: plain chatter
+    end, first = _first_line(content)
 
     first_lower = first.lower()
     if "foray failed" in first_lower:
         return None
     if "foray successful" not in first_lower:
         return None
+    uid = _extract_first_mention_user_id(first)
+    if uid is None:
+        return None
 
     # Find the "You Got ..." line anywhere (more robust than assuming exact line index)
-    item: Optional[str] = None
-    for ln in lines[1:]:
-        ln_stripped = ln.strip()
-        if ln_stripped.lower().startswith("you got "):
-            item = ln_stripped[len("you got "):].strip()
-            break
-
-    if not item:
-        return None
-    return uid, item
+    for ln in content[end:].splitlines():
+        ln = ln.strip()
+        if ln[:8].lower() == "you got ":
+            item = ln[8:].strip()
+            return (uid, item) if item else None
+    return None
 
 def _parse_monolith_loot_message(content: str) -> Optional[Tuple[int, str]]:
     """
@@ -436,73 +1000,61 @@ def _parse_monolith_loot_message(content: str) -> Optional[Tuple[int, str]]:
 
     Rule:
       - If first line is anything other than "<@userid>, COME TO ME!" -> skip.
-      - Otherwise parse last sentence "You got <item name>" (case-insensitive).
+      - Otherwise parse last sentence "You got <item name>" (case-insensitive, dots ignored).
+    Only the first line is looked at until it proved to be a "COME TO ME!".
     """
-    if not content:
+    if not content or "<@" not in content:
+        return None  # no mention anywhere: plain chatter
+    end, first = _first_line(content)
+    if "COME TO ME!" not in first:
         return None
-
-    lines = [ln.rstrip() for ln in content.splitlines() if ln.strip()]
-    if not lines:
-        return None
-
-    first = lines[0].strip()
-    uid = _extract_first_mention_user_id(first)
-    if uid is None:
-        return None
-
-    # Must be exactly "<@userid>, COME TO ME!" (allow extra whitespace around comma / end)
-    # We validate by removing the mention portion and checking the remainder.
-    # Example first line: "<@123>, COME TO ME!"
-    remainder = USER_MENTION_RE.sub("", first, count=1).strip()
-    # remainder should start with "," then "COME TO ME!"
-    if remainder != ", COME TO ME!":
+    m = USER_MENTION_RE.search(first)
+    if m is None:
         return None
-
-    # Parse item from the full text (bots often keep it in one line/sentence)
-    text = "\n".join(lines).replace('.', '')
-    m = re.search(r"\byou got\s+(.+?)\s*$", text, flags=re.IGNORECASE)
-    if not m:
+    # Must be exactly "<@userid>, COME TO ME!" once the mention is taken out (allow extra whitespace)
+    if (first[:m.start()] + first[m.end():]).strip() != ", COME TO ME!":
         return None
 
-    item = m.group(1).strip()
-    if not item:
+    # The item sentence runs to the end of the text, so it is in the lines after the first one
+    rest = content[end:].strip()
+    if rest.isprintable():
+        text = rest.replace(".", "")  # a single line
+    else:
+        text = "\n".join(ln.rstrip() for ln in rest.splitlines() if ln.strip()).replace(".", "")
+    item = _MONOLITH_ITEM_RE.search(text)
+    if item is None:
         return None
-    return uid, item
+    item = item.group(1).strip()
+    return (int(m.group(1)), item) if item else None
 
-async def _collect_loot_from_channels(
+async def _collect_loot_from_channel(
+    ch: discord.TextChannel,
     *,
     author: discord.Member,
-    channels: Iterable[Union[int, discord.TextChannel]],
     parser,
-    after_dt: Optional[datetime] = None,
-    before_dt: Optional[datetime] = None,
-) -> Dict[int, Set[str]]:
+    semaphore: asyncio.Semaphore,
+    after_id: Optional[int] = None,
+) -> Tuple[List[LootRecord], Optional[int]]:
     """
-    Generic collector:
-      - scans ALL messages in given channels
-      - only considers messages where msg.author.id == author.id
-      - uses 'parser(content) -> (uid, item) | None'
-      - accumulates {uid: set(items)}
+    Scans one loot channel after message `after_id` (whole history if None);
+    runs as its own task, at most LOOT_SCAN_CONCURRENCY at once.
+    Returns (loot records, last message ID seen or after_id if there were no new messages).
     """
-    if author.guild is None:
-        return {}
-
-    loot: DefaultDict[int, Set[str]] = defaultdict(set)
-    resolved_channels = _resolve_channels(author.guild, channels)
-    for ch in resolved_channels:
-        # History scan
+    records: List[LootRecord] = []
+    last_id = after_id
+    async with semaphore:
+        print(f"[DEBUG] Loot scan started: #{ch.name} ({ch.id}), after message {after_id}")
         scanned = 0
         async for msg in ch.history(
             limit=None,
             oldest_first=True,
-            after=after_dt,
-            before=before_dt,
+            after=discord.Object(id=after_id) if after_id is not None else None,
         ):
             scanned += 1
-            # gentle throttling on huge channels
-            if scanned % 50 == 0:
-                print(f"[DEBUG] Scanned in channel: {scanned}")
-                await asyncio.sleep(0.3)
+            last_id = msg.id
+            if scanned % HISTORY_PAGE_SIZE == 0:
+                print(f"[DEBUG] Scanned in #{ch.name}: {scanned}")
+                await history_pacer.pace(ch.id)
             if msg.author.id != author.id:
                 continue
 
@@ -511,98 +1063,626 @@ async def _collect_loot_from_channels(
                 continue
 
             uid, item = parsed
-            if item in WRONG_LOOTED_EQUIPMENT_NAMES:
-                loot[uid].add(WRONG_LOOTED_EQUIPMENT_NAMES[item])
-            else:
-                loot[uid].add(item)
+            records.append((msg.id, uid, WRONG_LOOTED_EQUIPMENT_NAMES.get(item, item)))
+        print(f"[DEBUG] Loot scan finished: #{ch.name} ({ch.id}), {scanned} messages, {len(records)} loot messages")
 
-    return dict(loot)
+    return records, last_id
 
-async def collect_stalkers_loot(author: discord.Member) -> Dict[int, Set[str]]:
+async def _collect_loot_from_channels(
+    *,
+    author: discord.Member,
+    channels: Iterable[Union[int, discord.TextChannel]],
+    parser,
+    cursors: Optional[Dict[int, int]] = None,
+    semaphore: Optional[asyncio.Semaphore] = None,
+) -> Tuple[List[LootRecord], Dict[int, int]]:
     """
-    Parse whole STALKER_LOOT_CHANNELS.
-    Returns: { user_id: {item1, item2, ...}, ... }
-    Cached flow:
-      - cache file holds loot parsed UP TO cache_cutoff_datetime (inclusive by 'before' bound)
-      - we parse AFTER cache_cutoff_datetime for fresh data and merge at runtime
+    Generic collector:
+      - scans messages in given channels after each channel's cursor (whole history for channels without one),
+        each channel as a separate task
+      - only considers messages where msg.author.id == author.id
+      - uses 'parser(content) -> (uid, item) | None'
+      - returns loot records in channel ID order, then message order
+    Returns (records, cursors) where cursors hold the last message ID seen per channel.
     """
     if author.guild is None:
-        return {}
+        return [], {}
 
-    guild_id = author.guild.id
-    faction = "stalkers"
-    cache_path, cache_dt_utc = _find_latest_loot_cache(guild_id, faction)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(LOOT_SCAN_CONCURRENCY)
+    cursors = cursors or {}
 
-    if cache_path is None:
-        # No cache yet: parse whole history, write cache with "finished" timestamp
-        loot = await _collect_loot_from_channels(
+    resolved_channels = sorted(_resolve_channels(author.guild, channels), key=lambda ch: ch.id)
+    per_channel = await asyncio.gather(*(
+        _collect_loot_from_channel(
+            ch,
             author=author,
-            channels=STALKER_LOOT_CHANNELS,
-            parser=_parse_stalker_loot_message,
+            parser=parser,
+            semaphore=semaphore,
+            after_id=cursors.get(ch.id),
         )
-        ts_now = int(time.time())
-        _write_loot_cache(_loot_cache_path(guild_id, faction, ts_now), loot)
-        return loot
-
-    # Cache exists: load it, parse only new messages after timestamp in filename, merge, write new cache
-    cached_part = _read_loot_cache(cache_path)
-    fresh_part = await _collect_loot_from_channels(
-        author=author,
-        channels=STALKER_LOOT_CHANNELS,
-        parser=_parse_stalker_loot_message,
-        after_dt=cache_dt_utc,  # only after the cached timestamp
-    )
-    merged = _merge_dicts(cached_part, fresh_part)
+        for ch in resolved_channels
+    ))
+
+    records: List[LootRecord] = []
+    new_cursors: Dict[int, int] = {}
+    for ch, (channel_records, last_id) in zip(resolved_channels, per_channel):
+        records.extend(channel_records)
+        if last_id is not None:
+            new_cursors[ch.id] = last_id
+    return records, new_cursors
+
+async def _collect_faction_loot(
+    author: discord.Member,
+    faction: str,
+    channels: Iterable[int],
+    parser,
+    semaphore: Optional[asyncio.Semaphore],
+) -> LootIndex:
+    """
+    Cached flow:
+      - a LootStore per guild/author/faction holds the loot and, per channel, the last message ID parsed
+      - each channel is parsed only after its cursor, so a newly added channel is backfilled on its own
+      - new records are appended to the store's journal
+      - once caught up, the store is kept live by on_message and no history is read at all
+    """
+    if author.guild is None:
+        return LootIndex()
+
+    store = get_loot_store(author.guild.id, author.id, faction)
+    if store.live:
+        return store.loot
+    async with store.lock:
+        session = gateway_session
+        records, new_cursors = await _collect_loot_from_channels(
+            author=author,
+            channels=channels,
+            parser=parser,
+            cursors=store.cursors,
+            semaphore=semaphore,
+        )
+        store.append(records, new_cursors)
+        store.live = session == gateway_session
+    return store.loot
 
-    ts_now = int(time.time())
-    _write_loot_cache(_loot_cache_path(guild_id, faction, ts_now), merged)
-    _safe_remove(cache_path)
-    return merged
+async def collect_stalkers_loot(
+    author: discord.Member,
+    semaphore: Optional[asyncio.Semaphore] = None,
+) -> LootIndex:
+    """
+    Parse whole STALKER_LOOT_CHANNELS.
+    Returns: { user_id: {item1, item2, ...}, ... }
+    """
+    return await _collect_faction_loot(author, "stalkers", STALKER_LOOT_CHANNELS, _parse_stalker_loot_message, semaphore)
 
-async def collect_monolith_loot(author: discord.Member) -> Dict[int, Set[str]]:
+async def collect_monolith_loot(
+    author: discord.Member,
+    semaphore: Optional[asyncio.Semaphore] = None,
+) -> LootIndex:
     """
     Parse whole MONOLITH_LOOT_CHANNELS.
     Returns: { user_id: {item1, item2, ...}, ... }
-    Cached flow:
-      - cache file holds loot parsed UP TO cache_cutoff_datetime
-      - we parse AFTER cache_cutoff_datetime for fresh data and merge at runtime
     """
-    if author.guild is None:
-        return {}
+    return await _collect_faction_loot(author, "monolith", MONOLITH_LOOT_CHANNELS, _parse_monolith_loot_message, semaphore)
+
+async def collect_all_loot(author: discord.Member) -> Tuple[LootIndex, LootIndex]:
+    """
+    Runs both faction collectors at the same time, sharing one LOOT_SCAN_CONCURRENCY cap.
+    Returns: (monolith_looted, stalkers_looted)
+    """
+    semaphore = asyncio.Semaphore(LOOT_SCAN_CONCURRENCY)
+    monolith_looted, stalkers_looted = await asyncio.gather(
+        collect_monolith_loot(author, semaphore),
+        collect_stalkers_loot(author, semaphore),
+    )
+    return monolith_looted, stalkers_looted
 
-    guild_id = author.guild.id
-    faction = "monolith"
-    cache_path, cache_dt_utc = _find_latest_loot_cache(guild_id, faction)
+LOOT_CHANNEL_KINDS: Dict[int, Tuple[str, object]] = {
+    **{ch: ("monolith", _parse_monolith_loot_message) for ch in MONOLITH_LOOT_CHANNELS},
+    **{ch: ("stalkers", _parse_stalker_loot_message) for ch in STALKER_LOOT_CHANNELS},
+}
 
-    if cache_path is None:
-        loot = await _collect_loot_from_channels(
-            author=author,
-            channels=MONOLITH_LOOT_CHANNELS,
-            parser=_parse_monolith_loot_message,
-        )
-        ts_now = int(time.time())
-        _write_loot_cache(_loot_cache_path(guild_id, faction, ts_now), loot)
-        return loot
-
-    cached_part = _read_loot_cache(cache_path)
-    fresh_part = await _collect_loot_from_channels(
-        author=author,
-        channels=MONOLITH_LOOT_CHANNELS,
-        parser=_parse_monolith_loot_message,
-        after_dt=cache_dt_utc,  # only after the cached timestamp
+async def apply_live_loot_message(message: discord.Message, *, edited: bool = False) -> None:
+    """
+    Feeds a new (or edited) loot channel message into the loot index of its author, if one is kept.
+    An edit replaces the loot of the message (another item, or none for a failed foray).
+    The channel cursor only moves while the store is live, so a catch-up after downtime still reads the gap.
+    Appends wait for the store's lock, held by a catch-up or a compaction.
+    """
+    kind = LOOT_CHANNEL_KINDS.get(message.channel.id)
+    if kind is None or message.guild is None:
+        return
+    faction, parser = kind
+    key = (message.guild.id, message.author.id, faction)
+    store = loot_stores.get(key)
+    if store is None:
+        if message.author.id not in LOOT_BOT_AUTHOR_IDS:
+            return
+        store = get_loot_store(*key)
+
+    records: List[LootRecord] = []
+    parsed = parser(message.content or "")
+    if parsed is not None:
+        uid, item = parsed
+        records.append((message.id, uid, WRONG_LOOTED_EQUIPMENT_NAMES.get(item, item)))
+    async with store.lock:
+        if edited:
+            store.replace(message.id, records)
+        else:
+            store.append(records, {message.channel.id: message.id} if store.live else {})
+
+@bot.listen("on_message")
+async def on_loot_message(message: discord.Message):
+    await apply_live_loot_message(message)
+
+# --------------------------------------------------------------------------------------------------------------------
+# Role index
+# --------------------------------------------------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class RoleInfo:
+    item: Optional[str]      # equipment item the role stands for
+    faction: Optional[str]   # one of MONOLITH_FACTIONS
+    faction_wars_24: bool    # one of FACTION_WARS_24_ROLES
+    position: int = 0
+
+@dataclass(frozen=True)
+class RoleLoadout:
+    faction: str             # one of MONOLITH_FACTIONS or "STALKERS"
+    items: FrozenSet[str]    # every equipment item from the roles, of any faction
+    faction_wars_24: bool
+
+def _match_role_suffix(name: str, candidates: Iterable[str]) -> Optional[str]:
+    """
+    Roles on the server have an emoji before the actual name, so the name is matched by suffix.
+    Takes the longest candidate that is the whole name or follows a non-alphanumeric character,
+    so "Improved Exoskeleton" is not also read as "Exoskeleton", nor "M860Monolith" as the "Monolith" faction.
+    """
+    best: Optional[str] = None
+    for c in candidates:
+        if not name.endswith(c):
+            continue
+        if len(name) > len(c) and name[-len(c) - 1].isalnum():
+            continue
+        if best is None or len(c) > len(best):
+            best = c
+    return best
+
+@functools.lru_cache(maxsize=None)
+def classify_role_name(name: str, position: int = 0) -> RoleInfo:
+    name = name.strip()
+    return RoleInfo(
+        item=_match_role_suffix(name, MONOLITH_ALL_EQUIPMENT | STALKERS_ALL_EQUIPMENT),
+        faction=_match_role_suffix(name, MONOLITH_FACTIONS),
+        faction_wars_24=_match_role_suffix(name, FACTION_WARS_24_ROLES) is not None,
+        position=position,
     )
-    merged = _merge_dicts(cached_part, fresh_part)
 
-    ts_now = int(time.time())
-    _write_loot_cache(_loot_cache_path(guild_id, faction, ts_now), merged)
-    _safe_remove(cache_path)
-    return merged
+def _build_loadout(infos: Iterable[RoleInfo]) -> RoleLoadout:
+    faction_info: Optional[RoleInfo] = None
+    items: Set[str] = set()
+    faction_wars_24 = False
+    for info in infos:
+        if info.item is not None:
+            items.add(info.item)
+        if info.faction is not None and (faction_info is None or info.position < faction_info.position):
+            faction_info = info
+        faction_wars_24 = faction_wars_24 or info.faction_wars_24
+    return RoleLoadout(
+        faction=faction_info.faction if faction_info is not None else "STALKERS",
+        items=frozenset(items),
+        faction_wars_24=faction_wars_24,
+    )
+
+def resolve_role_names(roles: Sequence[str]) -> RoleLoadout:
+    """
+    Loadout from role names (position = order in the list, as in member.roles).
+    Tuples (RollEvent.role_names) are memoized: the same member rolls with the same roles over and over.
+    """
+    if isinstance(roles, tuple):
+        return _resolve_role_name_tuple(roles)
+    return _build_loadout(classify_role_name(r, i) for i, r in enumerate(roles))
+
+@functools.lru_cache(maxsize=65536)
+def _resolve_role_name_tuple(roles: Tuple[str, ...]) -> RoleLoadout:
+    return _build_loadout(classify_role_name(r, i) for i, r in enumerate(roles))
+
+class RoleIndex:
+    """
+    Role ID -> RoleInfo for the equipment, faction and FactionWars24 roles of the guild.
+    Built once on ready and kept current by the guild role events, so members are classified
+    by role IDs without any string work.
+    """
+
+    def __init__(self):
+        self.roles: Dict[int, RoleInfo] = {}
+        # role set of a member (MemberRoleCache.role_ids) -> loadout; dropped whenever a role changes
+        self.loadouts: Dict[FrozenSet[int], RoleLoadout] = {}
+
+    def add(self, role: discord.Role) -> None:
+        info = classify_role_name(role.name, role.position)
+        if info.item is None and info.faction is None and not info.faction_wars_24:
+            self.roles.pop(role.id, None)
+        else:
+            self.roles[role.id] = info
+        self.loadouts.clear()
+
+    def remove(self, role_id: int) -> None:
+        self.roles.pop(role_id, None)
+        self.loadouts.clear()
+
+    def rebuild(self, guild: discord.Guild) -> None:
+        for role_id in [rid for rid in self.roles if guild.get_role(rid) is None]:
+            del self.roles[role_id]
+        for role in guild.roles:
+            self.add(role)
+
+    def resolve(self, role_ids: Iterable[int]) -> RoleLoadout:
+        """
+        Loadout of a member's role IDs. Frozen role sets are memoized, so members who keep their roles
+        get the same RoleLoadout object every time.
+        """
+        if isinstance(role_ids, frozenset):
+            loadout = self.loadouts.get(role_ids)
+            if loadout is None:
+                loadout = self.loadouts[role_ids] = self._resolve(role_ids)
+            return loadout
+        return self._resolve(role_ids)
+
+    def _resolve(self, role_ids: Iterable[int]) -> RoleLoadout:
+        roles = self.roles
+        return _build_loadout(roles[rid] for rid in roles.keys() & set(role_ids))
+
+role_index = RoleIndex()
+
+@bot.event
+async def on_guild_role_create(role: discord.Role):
+    role_index.add(role)
+    role_history.record_roles(role.guild.id, [(role.id, role.name, role.position)])
+
+@bot.event
+async def on_guild_role_update(before: discord.Role, after: discord.Role):
+    role_index.add(after)
+    role_history.record_roles(after.guild.id, [(after.id, after.name, after.position)])
+
+@bot.event
+async def on_guild_role_delete(role: discord.Role):
+    role_index.remove(role.id)
+
+# --------------------------------------------------------------------------------------------------------------------
+# Member role cache
+# --------------------------------------------------------------------------------------------------------------------
+
+# The gateway member query accepts at most 100 user IDs per request
+MEMBER_QUERY_BATCH = 100
+
+def member_role_ids(member: discord.Member) -> FrozenSet[int]:
+    return frozenset(r.id for r in member.roles if not r.is_default())
+
+class MemberRoleCache:
+    """
+    guild ID -> user ID -> role IDs, loaded from the chunked member list on ready and
+    kept current by the member events. Users missing from it are resolved in batches
+    through the gateway member query, never one REST fetch per roll.
+    """
+
+    def __init__(self):
+        self.roles: Dict[int, Dict[int, FrozenSet[int]]] = defaultdict(dict)
+        self.not_in_guild: Dict[int, Set[int]] = defaultdict(set)
+
+    def set_member(self, member: discord.Member) -> None:
+        self.roles[member.guild.id][member.id] = member_role_ids(member)
+        self.not_in_guild[member.guild.id].discard(member.id)
+
+    def remove_member(self, guild_id: int, user_id: int) -> None:
+        self.roles[guild_id].pop(user_id, None)
+
+    def load_guild(self, guild: discord.Guild) -> None:
+        for member in guild.members:
+            self.set_member(member)
+
+    def role_ids(self, guild_id: int, user_id: int) -> FrozenSet[int]:
+        return self.roles[guild_id].get(user_id, frozenset())
+
+    async def ensure(self, guild: discord.Guild, user_ids: Iterable[int]) -> None:
+        """
+        Resolves every user ID not cached yet with as few gateway member queries as possible.
+        Users that are not in the guild are remembered, so they are not queried again.
+        """
+        known = self.roles[guild.id]
+        not_in_guild = self.not_in_guild[guild.id]
+        unknown = sorted(uid for uid in set(user_ids) if uid not in known and uid not in not_in_guild)
+        for i in range(0, len(unknown), MEMBER_QUERY_BATCH):
+            batch = unknown[i:i + MEMBER_QUERY_BATCH]
+            try:
+                members = await guild.query_members(user_ids=batch, limit=len(batch), cache=True)
+            except asyncio.TimeoutError:
+                print(f"[DEBUG] Member query timed out for {len(batch)} users")
+                continue
+            for member in members:
+                self.set_member(member)
+            not_in_guild.update(uid for uid in batch if uid not in known)
+            print(f"[DEBUG] Resolved {len(members)}/{len(batch)} members through the gateway")
+
+member_roles = MemberRoleCache()
+
+# --------------------------------------------------------------------------------------------------------------------
+# Role history
+# --------------------------------------------------------------------------------------------------------------------
+
+class RoleHistory:
+    """
+    SQLite store of the role sets members held over time: one row per change, (guild, user, valid_from, role set),
+    valid_from being a snowflake so it compares directly with message IDs, and every distinct role set stored once.
+    Recorded from the member events (and every member on ready), so history starts when the bot first saw
+    a member; changes made while the bot was offline count from the next ready.
+    A guild's history is loaded into memory on first use and answered by binary search.
+    The name and position of every role are kept as well (the latest ones, deleted roles included),
+    so a replay can turn the role sets back into role names.
+    """
+
+    def __init__(self, path: str = ROLE_HISTORY_PATH):
+        self.path = path
+        self._db: Optional[sqlite3.Connection] = None
+        self.role_sets: Dict[int, FrozenSet[int]] = {}      # role set ID -> role IDs
+        self.role_set_ids: Dict[FrozenSet[int], int] = {}
+        # (guild ID, user ID) -> (valid_from snowflakes ascending, role set from each on)
+        self.timelines: Dict[Tuple[int, int], Tuple[List[int], List[FrozenSet[int]]]] = {}
+        self.loaded_guilds: Set[int] = set()
+        # (guild ID, role set) -> role names, lowest position first
+        self._role_names: Dict[Tuple[int, FrozenSet[int]], Tuple[str, ...]] = {}
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.path)
+            self._db.executescript("""
+                CREATE TABLE IF NOT EXISTS role_sets (
+                    role_set_id INTEGER PRIMARY KEY,
+                    role_ids TEXT NOT NULL UNIQUE   -- sorted role IDs, comma-separated
+                );
+                CREATE TABLE IF NOT EXISTS role_history (
+                    guild_id INTEGER NOT NULL,
+                    user_id INTEGER NOT NULL,
+                    valid_from INTEGER NOT NULL,    -- snowflake of the time the member got this role set
+                    role_set_id INTEGER NOT NULL,
+                    PRIMARY KEY (guild_id, user_id, valid_from)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS roles (
+                    guild_id INTEGER NOT NULL,
+                    role_id INTEGER NOT NULL,
+                    name TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    PRIMARY KEY (guild_id, role_id)
+                ) WITHOUT ROWID;
+            """)
+            for role_set_id, role_ids in self._db.execute("SELECT role_set_id, role_ids FROM role_sets"):
+                role_set = frozenset(int(r) for r in role_ids.split(",") if r)
+                self.role_sets[role_set_id] = role_set
+                self.role_set_ids[role_set] = role_set_id
+        return self._db
+
+    def _load_guild(self, guild_id: int) -> None:
+        if guild_id in self.loaded_guilds:
+            return
+        db = self.db
+        for user_id, valid_from, role_set_id in db.execute(
+            "SELECT user_id, valid_from, role_set_id FROM role_history WHERE guild_id = ? ORDER BY user_id, valid_from",
+            (guild_id,),
+        ):
+            ids, sets = self.timelines.setdefault((guild_id, user_id), ([], []))
+            ids.append(valid_from)
+            sets.append(self.role_sets[role_set_id])
+        self.loaded_guilds.add(guild_id)
+
+    def _role_set_id(self, role_ids: FrozenSet[int]) -> int:
+        role_set_id = self.role_set_ids.get(role_ids)
+        if role_set_id is None:
+            cur = self.db.execute(
+                "INSERT INTO role_sets (role_ids) VALUES (?)", (",".join(map(str, sorted(role_ids))),)
+            )
+            role_set_id = cur.lastrowid
+            self.role_sets[role_set_id] = role_ids
+            self.role_set_ids[role_ids] = role_set_id
+        return role_set_id
+
+    def record(self, guild_id: int, members: Iterable[Tuple[int, FrozenSet[int]]], at_id: Optional[int] = None) -> int:
+        """
+        Records that each (user ID, role IDs) holds those roles from snowflake at_id (now by default) on,
+        unless that is already the user's latest role set. Returns how many changes were stored.
+        """
+        self._load_guild(guild_id)
+        if at_id is None:
+            at_id = discord.utils.time_snowflake(discord.utils.utcnow())
+        rows = []
+        with self.db:
+            for user_id, role_ids in members:
+                ids, sets = self.timelines.setdefault((guild_id, user_id), ([], []))
+                if sets and sets[-1] == role_ids:
+                    continue
+                valid_from = max(at_id, ids[-1] + 1) if ids else at_id
+                role_set_id = self._role_set_id(role_ids)
+                ids.append(valid_from)
+                sets.append(self.role_sets[role_set_id])
+                rows.append((guild_id, user_id, valid_from, role_set_id))
+            self.db.executemany(
+                "INSERT OR REPLACE INTO role_history (guild_id, user_id, valid_from, role_set_id) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    def record_roles(self, guild_id: int, roles: Iterable[Tuple[int, str, int]]) -> None:
+        """Stores the (role ID, name, position) of roles."""
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO roles (guild_id, role_id, name, position) VALUES (?, ?, ?, ?)",
+                ((guild_id, role_id, name, position) for role_id, name, position in roles),
+            )
+        self._role_names.clear()
+
+    def guild_ids(self) -> List[int]:
+        return [guild_id for guild_id, in self.db.execute("SELECT DISTINCT guild_id FROM role_history")]
+
+    def role_names_at(self, guild_id: int, user_id: int, message_id: int) -> Optional[Tuple[str, ...]]:
+        """
+        roles_at as role names, lowest position first (as in member.roles); roles without a stored name are left out.
+        """
+        role_ids = self.roles_at(guild_id, user_id, message_id)
+        if role_ids is None:
+            return None
+        key = (guild_id, role_ids)
+        names = self._role_names.get(key)
+        if names is None and not role_ids:
+            names = ()
+        elif names is None:
+            rows = self.db.execute(
+                f"SELECT name FROM roles WHERE guild_id = ? AND role_id IN ({','.join('?' * len(role_ids))})"
+                " ORDER BY position, role_id",
+                (guild_id, *role_ids),
+            )
+            names = self._role_names[key] = tuple(name for name, in rows)
+        return names
+
+    def roles_at(self, guild_id: int, user_id: int, message_id: int) -> Optional[FrozenSet[int]]:
+        """
+        Role IDs the user held when message_id was posted, or None if the history does not reach back that far.
+        """
+        self._load_guild(guild_id)
+        timeline = self.timelines.get((guild_id, user_id))
+        if timeline is None:
+            return None
+        ids, sets = timeline
+        i = bisect.bisect_right(ids, message_id)
+        return sets[i - 1] if i else None
+
+role_history = RoleHistory()
+
+async def resolve_roll_loadouts(guild: discord.Guild, rolls: Sequence[Tuple[int, int]]) -> List[RoleLoadout]:
+    """
+    Loadouts of (message ID, user ID) rolls: the roles held at the message from the role history
+    (SCORE_WITH_ROLE_HISTORY), else the current roles from the member cache. Only rollers without history
+    for their roll are looked up, in one go.
+    """
+    role_sets: List[Optional[FrozenSet[int]]] = [
+        role_history.roles_at(guild.id, userid, message_id) if SCORE_WITH_ROLE_HISTORY else None
+        for message_id, userid in rolls
+    ]
+    missing = {userid for (_, userid), role_ids in zip(rolls, role_sets) if role_ids is None}
+    if missing:
+        await member_roles.ensure(guild, missing)
+    return [
+        role_index.resolve(role_ids if role_ids is not None else member_roles.role_ids(guild.id, userid))
+        for (_, userid), role_ids in zip(rolls, role_sets)
+    ]
+
+@bot.event
+async def on_member_join(member: discord.Member):
+    member_roles.set_member(member)
+    role_history.record(member.guild.id, [(member.id, member_role_ids(member))])
+
+@bot.event
+async def on_member_update(before: discord.Member, after: discord.Member):
+    member_roles.set_member(after)
+    role_history.record(after.guild.id, [(after.id, member_role_ids(after))])
+
+@bot.event
+async def on_raw_member_remove(payload: discord.RawMemberRemoveEvent):
+    member_roles.remove_member(payload.guild_id, payload.user.id)
+    role_history.record(payload.guild_id, [(payload.user.id, frozenset())])
+
+# --------------------------------------------------------------------------------------------------------------------
+# Armor selection reactions
+# --------------------------------------------------------------------------------------------------------------------
+
+class ArmorSelection:
+    """
+    Who reacted with which emoji on the armor selection messages (ARMOR_SELECTION_MESSAGES): fetched by refresh()
+    and kept current by the reaction events. Settles the FactionWars24 armor checks while scoring: an armor role
+    with the user's reaction for it is from this event, one without is the 2024 role.
+    version changes with every change of the reactions, for the scorers' resolution caches.
+    """
+
+    def __init__(self):
+        self.reactors: Dict[Tuple[int, str], Set[int]] = {}    # (message ID, emoji) -> user IDs
+        self.message_ids: List[int] = []
+        self.armor_emojis: Dict[str, List[str]] = defaultdict(list)
+        for emoji, armor in ARMOR_SELECTION_EMOJIS.items():
+            self.armor_emojis[armor].append(emoji)
+        self.loaded = False
+        self.version = 0
+
+    async def refresh(self, client: discord.Client) -> bool:
+        """
+        Fetches the reactors of every armor emoji on the armor selection messages.
+        Returns whether the reactions are loaded (a failed fetch keeps the previous ones, if any).
+        """
+        if not ARMOR_SELECTION_MESSAGES or not ARMOR_SELECTION_EMOJIS:
+            return False
+        reactors: Dict[Tuple[int, str], Set[int]] = {}
+        try:
+            for channel_id, message_id in ARMOR_SELECTION_MESSAGES:
+                channel = client.get_channel(channel_id) or await client.fetch_channel(channel_id)
+                message = await channel.fetch_message(message_id)
+                for reaction in message.reactions:
+                    emoji = getattr(reaction.emoji, "name", reaction.emoji)
+                    if emoji in ARMOR_SELECTION_EMOJIS:
+                        reactors[(message_id, emoji)] = {user.id async for user in reaction.users(limit=None)}
+        except discord.HTTPException as e:
+            print(f"[DEBUG] Armor selection reactions not fetched: {e}")
+            return self.loaded
+        self.reactors = reactors
+        self.message_ids = [message_id for _, message_id in ARMOR_SELECTION_MESSAGES]
+        self.loaded = True
+        self.version += 1
+        print(f"[DEBUG] Armor selection reactions: {sum(len(u) for u in reactors.values())} on {len(self.message_ids)} message(s)")
+        return True
+
+    def on_reaction(self, message_id: int, emoji: Optional[str], user_id: int, added: bool) -> None:
+        if not self.loaded or message_id not in self.message_ids or emoji not in ARMOR_SELECTION_EMOJIS:
+            return
+        users = self.reactors.setdefault((message_id, emoji), set())
+        if (user_id in users) != added:
+            if added:
+                users.add(user_id)
+            else:
+                users.discard(user_id)
+            self.version += 1
+
+    def verify(self, userid: int, equipped: Set[str]) -> bool:
+        """
+        Settles the FactionWars24 check of a user who is not cheating: every FactionWars24 armor in equipped
+        without the user's reaction for it is the 2024 role and is removed (and so is its bonus).
+        Returns False, leaving equipped as it is, if that cannot be told: the reactions are not loaded
+        or an armor has no emoji in ARMOR_SELECTION_EMOJIS.
+        """
+        if not self.loaded:
+            return False
+        from_2024 = []
+        for armor in equipped.intersection(_FACTION_WARS_24_ARMOR):
+            emojis = self.armor_emojis.get(armor)
+            if not emojis:
+                return False
+            if not any(userid in self.reactors.get((m, e), ()) for m in self.message_ids for e in emojis):
+                from_2024.append(armor)
+        for armor in from_2024:
+            equipped.remove(armor)
+        return True
+
+armor_selection = ArmorSelection()
+
+@bot.event
+async def on_raw_reaction_add(payload: discord.RawReactionActionEvent):
+    armor_selection.on_reaction(payload.message_id, payload.emoji.name, payload.user_id, added=True)
+
+@bot.event
+async def on_raw_reaction_remove(payload: discord.RawReactionActionEvent):
+    armor_selection.on_reaction(payload.message_id, payload.emoji.name, payload.user_id, added=False)
 
 # --------------------------------------------------------------------------------------------------------------------
 # Calculating equipment bonus and cheating checks
 # --------------------------------------------------------------------------------------------------------------------
 
-async def parse_roll_embed_message(message: discord.Message) -> Tuple[int, int, List[str]]:
+def parse_roll_embed_message(message: discord.Message) -> Tuple[int, int]:
     """
     Parse roll from embed.title and user id from embed.description.
 
@@ -610,60 +1690,66 @@ async def parse_roll_embed_message(message: discord.Message) -> Tuple[int, int,
       message.embeds[0].title == "<roll number>"
       message.embeds[0].description contains "<@userid> ..."
 
-    Returns: (roll, user_id, roles_list[str])
+    Returns: (roll, user_id). Raises ValueError for anything else; match_roll_embed_message does not.
     """
     if not message.embeds:
         raise ValueError("Message has no embeds.")
 
     e = message.embeds[0]
+    return parse_roll_embed(e.title, e.description)
 
-    # 1) roll from title
-    title = (e.title or "").strip()
-    if not title:
-        raise ValueError("Embed title is empty; cannot parse roll.")
-    try:
-        roll = int(title)
-    except ValueError as ex:
-        raise ValueError(f"Embed title is not an integer: {e.title!r}") from ex
+def match_roll_embed_message(message: discord.Message) -> Optional[Tuple[int, int]]:
+    """
+    (roll, user_id) of a roll embed message, or None for any other message.
+    """
+    if not message.embeds:
+        return None
+    e = message.embeds[0]
+    return match_roll_embed(e.title, e.description)
 
-    # 2) user_id from embed.description
-    desc = e.description or ""
-    
-    m = USER_MENTION_RE.search(desc)
-    if not m:
-        raise ValueError("No <@userid> mention found in embed.description.")
-    user_id = int(m.group(1))
-
-    # 3) fetch roles for that user (if possible)
-    roles: List[str] = []
-    if message.guild is None:
-        return roll, user_id, roles
-
-    member: Optional[discord.Member] = message.guild.get_member(user_id)
-    if member is None:
-        try:
-            member = await message.guild.fetch_member(user_id)
-        except (discord.NotFound, discord.Forbidden, discord.HTTPException):
-            member = None
+# Whatever int() takes as a base 10 literal. Embed titles are at most 256 characters,
+# far below the digit limit of int(), so a match always converts.
+_ROLL_TITLE_RE = re.compile(r"\s*([+-]?\d+(?:_\d+)*)\s*")
 
-    if member is None:
-        return roll, user_id, roles
+def match_roll_embed(title: Optional[str], description: Optional[str]) -> Optional[Tuple[int, int]]:
+    """
+    match_roll_embed_message on the plain embed fields (also used for exported history).
+    Returns: (roll, user_id), or None if the fields are not a roll
+    """
+    if not title:
+        return None
+    if title.isdecimal():
+        roll = int(title)  # the usual "42"
+    else:
+        literal = _ROLL_TITLE_RE.fullmatch(title)
+        if literal is None:
+            return None
+        roll = int(literal.group(1))
+    mention = USER_MENTION_RE.search(description) if description else None
+    if mention is None:
+        return None
+    return roll, int(mention.group(1))
 
-    roles = [r.name.strip() for r in member.roles if r != message.guild.default_role]
-    return roll, user_id, roles
+def parse_roll_embed(title: Optional[str], description: Optional[str]) -> Tuple[int, int]:
+    """
+    match_roll_embed, raising ValueError with the reason instead of returning None.
+    Returns: (roll, user_id)
+    """
+    parsed = match_roll_embed(title, description)
+    if parsed is not None:
+        return parsed
+    if not (title or "").strip():
+        raise ValueError("Embed title is empty; cannot parse roll.")
+    if _ROLL_TITLE_RE.fullmatch(title) is None:
+        raise ValueError(f"Embed title is not an integer: {title!r}")
+    raise ValueError("No <@userid> mention found in embed.description.")
 
 def get_faction(roles: Sequence[str]) -> str:
     """
-    If any role in roles is present in MONOLITH_FACTIONS, return that role name.
+    If any role in roles is one of MONOLITH_FACTIONS, return that faction name.
     Otherwise return "STALKERS".
     """
-    for r in roles:
-        for monolith_faction in MONOLITH_FACTIONS:
-            # such complication is required since the roles on the server have emoji before the actual name of the role
-            if r.strip().endswith(monolith_faction):
-                return monolith_faction
-
-    return "STALKERS"
+    return resolve_role_names(roles).faction
 
 def get_equipped_equipment(
     roles: Sequence[str],
@@ -672,33 +1758,49 @@ def get_equipped_equipment(
     """
     From roles, return only those that are equipment roles present in factionEquipmentList.
     """
-    equipped: Set[str] = set()
-    for r in roles:
-        for faction_eq in factionEquipmentList:
-            # such complication is required since the roles on the server have emoji before the actual name of the role
-            if r.strip().endswith(faction_eq):
-                equipped.add(faction_eq)
-    return equipped
+    return set(resolve_role_names(roles).items.intersection(factionEquipmentList))
 
 def filter_redundant_armor(
     equipped: Set[str], 
-    roles: List[str],
+    faction_wars_24: bool,
     userid: int,
     roll: int,
     faction: str,
-    equipmentDictionary: Dict[int, Set[str]],
+    equipmentDictionary: LootView,
+    faction_wars_24_checks: Optional[List[str]] = None,
 ) -> Set[str]:
     """
-    Filter out Faction Wars 24 roles and double armors/weapons for TRANSITIONED_FACTIONS
+    Filter out Faction Wars 24 roles and double armors/weapons for TRANSITIONED_FACTIONS.
+    The FactionWars24 check to ask for, if any, is appended to faction_wars_24_checks.
     """
-    global global_faction_wars_24_checks
-    
-    faction_wars_roles: Set[str] = set()
-    for r in roles:
-        for faction_r in FACTION_WARS_24_ROLES:
-            # such complication is required since the roles on the server have emoji before the actual name of the role
-            if r.strip().endswith(faction_r):
-                faction_wars_roles.add(faction_r)
+    equipped, check = _filter_redundant_armor(equipped, faction_wars_24, userid, faction)
+    if check is not None and not is_cheating(equipped, userid, equipmentDictionary)[0]:
+        check_string = faction_wars_24_check(check, roll)
+        if faction_wars_24_checks is not None:
+            faction_wars_24_checks.append(check_string)
+    return equipped
+
+def faction_wars_24_check(check: str, roll: int) -> str:
+    check_string = f"{check}{roll}"
+    print(f"[DEBUG] {check_string}")
+    return check_string
+
+# FactionWars24 armor of both sides
+_FACTION_WARS_24_ARMOR = frozenset(FACTION_WARS_24_STALKER_ARMOR | FACTION_WARS_24_MONOLITH_ARMOR)
+
+def _filter_redundant_armor(
+    equipped: Set[str],
+    faction_wars_24: bool,
+    userid: int,
+    faction: str,
+) -> Tuple[Set[str], Optional[str]]:
+    """
+    filter_redundant_armor without the roll and the loot: the FactionWars24 check to ask for, if any, is returned
+    as the check string up to the affected roll. It only applies if the user is not cheating (callers check that,
+    they need is_cheating of the filtered equipment anyway).
+    Returns: (equipped, check)
+    """
+    check: Optional[str] = None
     equipped_armors = equipped.intersection(ALL_ARMOR)
     if faction in TRANSITIONED_FACTIONS:
         # Noon
@@ -714,291 +1816,1390 @@ def filter_redundant_armor(
                 if eq in STALKER_ARMOR:
                     equipped.remove(eq)
             equipped_armors = equipped.intersection(ALL_ARMOR)
-        if len(equipped_armors) > 0 and len(faction_wars_roles) > 0 and (len(equipped_armors.intersection(FACTION_WARS_24_STALKER_ARMOR)) > 0 or len(equipped_armors.intersection(FACTION_WARS_24_MONOLITH_ARMOR)) > 0):
-            cheating, fake_list = is_cheating(equipped, userid, equipmentDictionary)
-            if not cheating:
-                check_string = f"Please, validate `{userid}`(Noon) for following gear: {equipped_armors}. Affected roll: {roll}"
-                print(f"[DEBUG] {check_string}")
-                global_faction_wars_24_checks.append(check_string)
+        if equipped_armors and faction_wars_24 and not equipped_armors.isdisjoint(_FACTION_WARS_24_ARMOR):
+            check = f"Please, validate `{userid}`(Noon) for following gear: {equipped_armors}. Affected roll: "
+    elif faction in MONOLITH_FACTIONS:
+        # Monolith
+        if equipped_armors:
+            for eq_armor in equipped_armors:
+                if eq_armor in FACTION_WARS_24_STALKER_ARMOR:
+                    equipped.remove(eq_armor)
+            if faction_wars_24 and not equipped_armors.isdisjoint(FACTION_WARS_24_MONOLITH_ARMOR):
+                check = f"Please, validate `{userid}`(Monolith) for following gear: {equipped_armors}. Affected roll: "
     else:
-        if faction in MONOLITH_FACTIONS:
-            # Monolith
-            if len(equipped_armors) > 0:
-                for eq_armor in equipped_armors:
-                    if eq_armor in FACTION_WARS_24_STALKER_ARMOR:
-                        equipped.remove(eq_armor)
-                if len(faction_wars_roles) > 0 and len(equipped_armors.intersection(FACTION_WARS_24_MONOLITH_ARMOR)) > 0:
-                    cheating, fake_list = is_cheating(equipped, userid, equipmentDictionary)
-                    if not cheating:
-                        check_string = f"Please, validate `{userid}`(Monolith) for following gear: {equipped_armors}. Affected roll: {roll}"
-                        print(f"[DEBUG] {check_string}")
-                        global_faction_wars_24_checks.append(check_string)
-
-        else:
-            # STALKERS
-            if len(equipped_armors) > 0:
-                for eq_armor in equipped_armors:
-                    if eq_armor in FACTION_WARS_24_MONOLITH_ARMOR:
-                        equipped.remove(eq_armor)
-                if len(faction_wars_roles) > 0 and len(equipped_armors.intersection(FACTION_WARS_24_STALKER_ARMOR)) > 0:
-                    cheating, fake_list = is_cheating(equipped, userid, equipmentDictionary)
-                    if not cheating:
-                        check_string = f"Please, validate `{userid}`(STALKERS) for following gear: {equipped_armors}. Affected roll: {roll}"
-                        print(f"[DEBUG] {check_string}")
-                        global_faction_wars_24_checks.append(check_string)
-    return equipped
+        # STALKERS
+        if equipped_armors:
+            for eq_armor in equipped_armors:
+                if eq_armor in FACTION_WARS_24_MONOLITH_ARMOR:
+                    equipped.remove(eq_armor)
+            if faction_wars_24 and not equipped_armors.isdisjoint(FACTION_WARS_24_STALKER_ARMOR):
+                check = f"Please, validate `{userid}`(STALKERS) for following gear: {equipped_armors}. Affected roll: "
+    return equipped, check
     
 def is_cheating(
     equipmentList: Set[str],
     userid: int,
-    equipmentDictionary: Dict[int, Set[str]],
+    equipmentDictionary: LootView,
 ) -> Tuple[bool, List[str]]:
     """
-    For each equipment in equipmentList, check it's present in equipmentDictionary[userid].
+    For each equipment in equipmentList, check it's looted by userid in equipmentDictionary.
     Anything missing is added to fakeEquipmentList.
 
     Returns: (isCheating, fakeEquipmentList)
     """
-    owned: Set[str] = equipmentDictionary.get(userid, set())
-    fakeEquipmentList: List[str] = []
-    for eq in equipmentList:
-        if eq not in owned:
-            fakeEquipmentList.append(eq)
-    
-    if len(fakeEquipmentList) == 1 and (fakeEquipmentList[0] in FACTION_WARS_24_MONOLITH_ARMOR or list(fakeEquipmentList)[0] in FACTION_WARS_24_STALKER_ARMOR):
+    return _is_cheating_owned(equipmentList, equipmentDictionary.mask(userid))
+
+def _is_cheating_owned(equipmentList: Set[str], owned: int) -> Tuple[bool, List[str]]:
+    # is_cheating against the mask of the items owned
+    if not _fake_mask(items_mask(equipmentList), owned):
         return False, []
-    return (len(fakeEquipmentList) > 0), fakeEquipmentList
+    return True, [eq for eq in equipmentList if not item_bit(eq) & owned]
+
+def _fake_mask(equipped_mask: int, owned_mask: int) -> int:
+    # equipped but not looted; a single missing FactionWars24 armor is forgiven (it may be the 2024 role)
+    fake = equipped_mask & ~owned_mask
+    if fake and not fake & (fake - 1) and fake & _FACTION_WARS_24_ARMOR_MASK:
+        return 0
+    return fake
+
+def find_cheating(checks: Iterable[Tuple[int, int]], loot: LootView) -> List[Tuple[int, int]]:
+    """
+    Batch is_cheating over (user ID, equipped mask) pairs.
+    Returns (index in checks, mask of the fake items) of every cheating pair.
+    """
+    masks = loot.masks if isinstance(loot, LootIndex) else None
+    found = []
+    for i, (userid, equipped_mask) in enumerate(checks):
+        owned = masks.get(userid, 0) if masks is not None else loot.mask(userid)
+        fake = _fake_mask(equipped_mask, owned)
+        if fake:
+            found.append((i, fake))
+    return found
+
+def _item_roll_bonus(eq: str, roll: int) -> int:
+    """
+    Bonus of a single item for a single roll, straight from the bonus tables.
+    Note: CONTAINS_9 is applied twice for rolls ending in 9 (once with ENDSIN_9, once for containing "9").
+    """
+    bonus = FLAT_EQUIPMENT_BONUSES.get(eq, 0)
+    if roll % 2 == 0:
+        bonus += EVEN_ROLL_EQUIPMENT_BONUSES.get(eq, 0)
+    else:
+        bonus += ODD_ROLL_EQUIPMENT_BONUSES.get(eq, 0)
+    if roll >= 70:
+        bonus += MORETHAN_70_EQUIPMENT_BONUSES.get(eq, 0)
+    if roll >= 75:
+        bonus += MORETHAN_75_EQUIPMENT_BONUSES.get(eq, 0)
+    if roll >= 80:
+        bonus += MORETHAN_80_EQUIPMENT_BONUSES.get(eq, 0)
+    if roll >= 85:
+        bonus += MORETHAN_85_EQUIPMENT_BONUSES.get(eq, 0)
+    if roll >= 90:
+        bonus += MORETHAN_90_EQUIPMENT_BONUSES.get(eq, 0)
+    if roll % 10 == 0:
+        bonus += ENDSIN_0_EQUIPMENT_BONUSES.get(eq, 0)
+    if roll % 10 == 5:
+        bonus += ENDSIN_5_EQUIPMENT_BONUSES.get(eq, 0)
+    if roll % 10 == 7:
+        bonus += ENDSIN_7_EQUIPMENT_BONUSES.get(eq, 0)
+    if roll % 10 == 9:
+        bonus += ENDSIN_9_EQUIPMENT_BONUSES.get(eq, 0)
+        bonus += CONTAINS_9_EQUIPMENT_BONUSES.get(eq, 0)
+    if "9" in str(roll):
+        bonus += CONTAINS_9_EQUIPMENT_BONUSES.get(eq, 0)
+    if roll == 100:
+        bonus -= UNLUCKY_100_EQUIPMENT_MINUSES.get(eq, 0)
+    return bonus
+
+MAX_ROLL = 100
+
+# Compiled ruleset: item -> bonus for every roll value 0..MAX_ROLL, rebuilt when BonusTable.version changes
+_compiled_bonus_table: Dict[str, Tuple[int, ...]] = {}
+_compiled_bonus_version = -1
+
+def _compile_bonus_tables() -> None:
+    global _compiled_bonus_table, _compiled_bonus_version
+    items: Set[str] = set()
+    for table in (
+        FLAT_EQUIPMENT_BONUSES, ODD_ROLL_EQUIPMENT_BONUSES, EVEN_ROLL_EQUIPMENT_BONUSES,
+        MORETHAN_90_EQUIPMENT_BONUSES, MORETHAN_85_EQUIPMENT_BONUSES, MORETHAN_80_EQUIPMENT_BONUSES,
+        MORETHAN_75_EQUIPMENT_BONUSES, MORETHAN_70_EQUIPMENT_BONUSES, ENDSIN_0_EQUIPMENT_BONUSES,
+        ENDSIN_5_EQUIPMENT_BONUSES, ENDSIN_7_EQUIPMENT_BONUSES, ENDSIN_9_EQUIPMENT_BONUSES,
+        CONTAINS_9_EQUIPMENT_BONUSES, UNLUCKY_100_EQUIPMENT_MINUSES,
+    ):
+        items.update(table)
+    _compiled_bonus_table = {
+        eq: tuple(_item_roll_bonus(eq, roll) for roll in range(MAX_ROLL + 1))
+        for eq in items
+    }
+    _loadout_bonus.cache_clear()
+    _compiled_bonus_version = BonusTable.version
+
+@functools.lru_cache(maxsize=65536)
+def _loadout_bonus(loadout: FrozenSet[str], roll: int) -> int:
+    table = _compiled_bonus_table
+    return sum(table[eq][roll] for eq in loadout if eq in table)
 
 def calculate_equipment_bonus(
     equipment: Sequence[str],
     roll: int,
 ) -> int:
     """
-    Placeholder bonus calculation.
-    You will fill EQUIPMENT_BONUSES with your real numbers.
+    Sum of the bonuses of all equipment for the roll, read from the compiled ruleset
+    (memoized per frozen loadout and roll for sets).
 
     Returns: equipmentBonus (int)
     """
-    bonus = 0
-    for eq in equipment:
-        
-        bonus += FLAT_EQUIPMENT_BONUSES.get(eq, 0)    
-        if roll % 2 == 0:
-            bonus += EVEN_ROLL_EQUIPMENT_BONUSES.get(eq, 0)
-        else:
-            bonus += ODD_ROLL_EQUIPMENT_BONUSES.get(eq, 0)
-        if roll >= 70:
-            bonus += MORETHAN_70_EQUIPMENT_BONUSES.get(eq, 0)
-        if roll >= 75:
-            bonus += MORETHAN_75_EQUIPMENT_BONUSES.get(eq, 0)
-        if roll >= 80:
-            bonus += MORETHAN_80_EQUIPMENT_BONUSES.get(eq, 0)
-        if roll >= 85:
-            bonus += MORETHAN_85_EQUIPMENT_BONUSES.get(eq, 0)
-        if roll >= 90:
-            bonus += MORETHAN_90_EQUIPMENT_BONUSES.get(eq, 0)
-        if roll % 10 == 0:
-            bonus += ENDSIN_0_EQUIPMENT_BONUSES.get(eq, 0)
-        if roll % 10 == 5:
-            bonus += ENDSIN_5_EQUIPMENT_BONUSES.get(eq, 0)
-        if roll % 10 == 7:
-            bonus += ENDSIN_7_EQUIPMENT_BONUSES.get(eq, 0)
-        if roll % 10 == 9:
-            bonus += ENDSIN_9_EQUIPMENT_BONUSES.get(eq, 0)
-            bonus += CONTAINS_9_EQUIPMENT_BONUSES.get(eq, 0)
-        if "9" in str(roll):
-            bonus += CONTAINS_9_EQUIPMENT_BONUSES.get(eq, 0)
-        if roll == 100:
-            bonus -= UNLUCKY_100_EQUIPMENT_MINUSES.get(eq, 0)
-    return bonus
+    if _compiled_bonus_version != BonusTable.version:
+        _compile_bonus_tables()
+    if not 0 <= roll <= MAX_ROLL:
+        return sum(_item_roll_bonus(eq, roll) for eq in equipment)
+    if isinstance(equipment, (set, frozenset)):
+        return _loadout_bonus(frozenset(equipment), roll)
+    table = _compiled_bonus_table
+    return sum(table[eq][roll] for eq in equipment if eq in table)
 
 # --------------------------------------------------------------------------------------------------------------------
 # Parse all rolls from the channel
 # --------------------------------------------------------------------------------------------------------------------
 
-
-async def count_rolls_in_channel(
-    *,
-    guild: discord.Guild,
-    channel: discord.TextChannel,
-    author: discord.Member,
-    interaction: discord.Interaction,
-    start_utc,
-    end_utc,
-) -> Tuple[int, int, List[Tuple[int, str]], Dict[int, List[str]], List[str]]:
+def _snowflake_bounds(start_utc: datetime, end_utc: datetime) -> Tuple[int, int]:
     """
-    Returns:
-      (monolith_total, stalkers_total, cheaters, cheater_fake_equipment_map)
+    Converts [start_utc, end_utc) into exclusive snowflake bounds (after_id, before_id),
+    the same ones channel.history(after=start_utc, before=end_utc) uses internally.
+    """
+    return (
+        discord.utils.time_snowflake(start_utc, high=True),
+        discord.utils.time_snowflake(end_utc, high=False),
+    )
 
-    Prints:
-      - Scores for each faction
-      - Cheaters and faked equipment
+def _split_snowflake_range(after_id: int, before_id: int, slices: int) -> List[Tuple[int, int]]:
     """
+    Splits the exclusive range (after_id, before_id) into up to `slices` adjacent exclusive ranges
+    which together cover every ID of the original range exactly once.
+    """
+    if slices <= 1 or before_id - after_id <= slices:
+        return [(after_id, before_id)]
+
+    step = (before_id - after_id) // slices
+    bounds = [after_id + step * i for i in range(slices)] + [before_id]
+    ranges: List[Tuple[int, int]] = []
+    for i in range(slices):
+        lo = bounds[i]
+        # the boundary ID belongs to the lower slice, so interior upper bounds are shifted by one
+        hi = bounds[i + 1] if i == slices - 1 else bounds[i + 1] + 1
+        ranges.append((lo, hi))
+    return ranges
+
+async def _fetch_history_slice(
+    channel: discord.TextChannel,
+    after_id: int,
+    before_id: int,
+    slice_no: int,
+    pages: asyncio.Queue,
+) -> None:
+    # puts the slice into `pages` a page at a time, then None (or the exception the fetch failed with);
+    # the bounded queue holds the fetch back while the reader is behind
+    fetched = 0
+    try:
+        page: List[discord.Message] = []
+        async for msg in channel.history(
+            limit=None,
+            oldest_first=True,
+            after=discord.Object(id=after_id),
+            before=discord.Object(id=before_id),
+        ):
+            page.append(msg)
+            if len(page) == HISTORY_PAGE_SIZE:
+                fetched += len(page)
+                await pages.put(page)
+                page = []
+                await history_pacer.pace(channel.id)
+        if page:
+            fetched += len(page)
+            await pages.put(page)
+    except Exception as e:
+        await pages.put(e)
+        return
+    print(f"[DEBUG] Slice {slice_no} of #{channel.name} fetched: {fetched} messages")
+    await pages.put(None)
 
-    # ---- pre-create all needed variables/objects ----
-    
-    # looted equipment dictionaries
-    await interaction.edit_original_response(content="Stage 1/2: parsing fairly looted equipment…")
-    monolith_looted: Dict[int, Set[str]] = await collect_monolith_loot(author)
-    stalkers_looted: Dict[int, Set[str]] = await collect_stalkers_loot(author)
-    merged_looted = _merge_dicts(monolith_looted, stalkers_looted)
-    # totals
-    monolith_total = 0
-    stalkers_total = 0
-
-    # cheaters and their fake equipment
-    cheaters: List[Tuple[int, str]] = []
-    cheater_fake_equipment: Dict[int, List[str]] = defaultdict(list)
-
-    # Object to hold one Weird Flower carrier. Once same roll was detected between two Weird Flower carriers, their rolls are set to 96 and 
-    # the first carrier gets deleted from the list.
-    weird_flower_carriers: Dict[int, Tuple[int, str, List[str]]] = defaultdict(tuple) # key: roll, value: tuple([User ID, faction, equipment])
-
-    # ---- get list of all messages from specified author ----
-    # (We stream messages; no need to materialize unless you want.)
-    scanned = 0
-    matched = 0
-    weird_flower_pairs: List[str] = []
-    monolith_cnt = 0
-    stalker_cnt = 0
-    monolith_users: Set[str] = set()
-    stalker_users: Set[str] = set()
-    monolith_pairs = 0
-    stalker_pairs = 0
-    split_pairs = 0
-    mon_weird_flower_rolls = 0
-    sta_weird_flower_rolls = 0
-    mon_weird_flower_carriers = set()
-    sta_weird_flower_carriers = set()
-    
-    await interaction.edit_original_response(content="Stage 2/2: parsing rolls…")
-    async for msg in channel.history(after=start_utc, before=end_utc, limit=None, oldest_first=True):
-        scanned += 1
-        if scanned % 50 == 0:
-            await asyncio.sleep(0.3)
-        if msg.author.id != author.id:
-            continue
+async def iter_channel_history_slices(
+    channel: discord.TextChannel,
+    after_id: int,
+    before_id: int,
+    slices: int = ROLL_SCAN_SLICES,
+) -> AsyncIterator[List[discord.Message]]:
+    """
+    Fetches the exclusive snowflake range (after_id, before_id) of the channel as `slices` sub-ranges at the same time.
+    Yields the messages a page at a time, oldest slice first, each page sorted by message ID,
+    so iterating the pages in order gives strict chronological order (Weird Flower pairing depends on it).
+    Later slices fetch at most HISTORY_SLICE_PREFETCH_PAGES pages ahead, so memory stays bounded.
+    """
+    ranges = _split_snowflake_range(after_id, before_id, slices)
+    queues = [asyncio.Queue(HISTORY_SLICE_PREFETCH_PAGES) for _ in ranges]
+    tasks = [
+        asyncio.create_task(_fetch_history_slice(channel, lo, hi, slice_no, pages))
+        for slice_no, ((lo, hi), pages) in enumerate(zip(ranges, queues), start=1)
+    ]
+    try:
+        for pages in queues:
+            while True:
+                page = await pages.get()
+                if page is None:
+                    break
+                if isinstance(page, Exception):
+                    raise page
+                page.sort(key=lambda m: m.id)
+                yield page
+    finally:
+        for task in tasks:
+            task.cancel()
 
-        matched += 1
 
-        # ---- parse roll message ----
-        try:
-            roll, userid, roles = await parse_roll_embed_message(msg)
-        except Exception:
-            # Skip messages that aren't the roll embed format
+# --------------------------------------------------------------------------------------------------------------------
+# Local roll message store
+# --------------------------------------------------------------------------------------------------------------------
+
+def _range_gaps(first_id: int, last_id: int, covered: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """
+    Parts of the inclusive ID range [first_id, last_id] not covered by the inclusive `covered` ranges.
+    """
+    gaps: List[Tuple[int, int]] = []
+    cur = first_id
+    for lo, hi in sorted(covered):
+        if hi < cur:
             continue
-        faction = get_faction(roles)
-        # Pick faction equipment list + looted dictionary
+        if lo > last_id:
+            break
+        if lo > cur:
+            gaps.append((cur, lo - 1))
+        cur = max(cur, hi + 1)
+        if cur > last_id:
+            break
+    if cur <= last_id:
+        gaps.append((cur, last_id))
+    return gaps
+
+class RollStore:
+    """
+    SQLite store of roll channel messages keyed by (channel_id, message_id), holding the parsed roll fields.
+    covered_ranges remembers which inclusive message ID ranges of a channel were fully fetched,
+    so only the gaps of a window have to come from Discord.
+    Only the channels with stored messages are kept current by the edit/delete events (tracks()).
+    """
+
+    def __init__(self, path: str = ROLL_STORE_PATH):
+        self.path = path
+        self._db: Optional[sqlite3.Connection] = None
+        self._channel_ids: Optional[Set[int]] = None
+        self._locks: DefaultDict[int, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.path)
+            self._db.executescript("""
+                CREATE TABLE IF NOT EXISTS roll_messages (
+                    channel_id INTEGER NOT NULL,
+                    message_id INTEGER NOT NULL,
+                    author_id INTEGER NOT NULL,
+                    roll INTEGER,               -- NULL if the message is not a roll embed
+                    user_id INTEGER,
+                    timestamp REAL NOT NULL,    -- embed timestamp (message creation time if the embed has none)
+                    edited_at REAL,
+                    deleted INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (channel_id, message_id)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS covered_ranges (
+                    channel_id INTEGER NOT NULL,
+                    first_id INTEGER NOT NULL,
+                    last_id INTEGER NOT NULL,
+                    PRIMARY KEY (channel_id, first_id)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS gateway_seen (
+                    id INTEGER PRIMARY KEY CHECK (id = 0),
+                    seen_id INTEGER NOT NULL    -- snowflake of the last time the gateway was known connected
+                );
+            """)
+        return self._db
+
+    @staticmethod
+    def _row(msg: discord.Message) -> Tuple:
+        roll, user_id = match_roll_embed_message(msg) or (None, None)
+        embed_ts = msg.embeds[0].timestamp if msg.embeds else None
+        return (
+            msg.channel.id,
+            msg.id,
+            msg.author.id,
+            roll,
+            user_id,
+            (embed_ts or msg.created_at).timestamp(),
+            msg.edited_at.timestamp() if msg.edited_at else None,
+        )
+
+    @property
+    def channel_ids(self) -> Set[int]:
+        if self._channel_ids is None:
+            self._channel_ids = {
+                channel_id for channel_id, in self.db.execute(
+                    "SELECT DISTINCT channel_id FROM covered_ranges"
+                    " UNION SELECT DISTINCT channel_id FROM roll_messages"
+                )
+            }
+        return self._channel_ids
+
+    def tracks(self, channel_id: int) -> bool:
+        """Whether messages of the channel are stored, so its edits and deletes have to be recorded."""
+        return channel_id in self.channel_ids
+
+    def add_messages(self, messages: Iterable[discord.Message]) -> None:
+        rows = [self._row(msg) for msg in messages]
+        self.channel_ids.update(row[0] for row in rows)
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO roll_messages"
+                " (channel_id, message_id, author_id, roll, user_id, timestamp, edited_at, deleted)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, 0)",
+                rows,
+            )
+
+    def update_message(self, msg: discord.Message) -> None:
+        """Re-parses an edited message, if it is stored."""
+        channel_id, message_id, _, roll, user_id, _, edited_at = self._row(msg)
+        with self.db:
+            self.db.execute(
+                "UPDATE roll_messages SET roll = ?, user_id = ?, edited_at = ? WHERE channel_id = ? AND message_id = ?",
+                (roll, user_id, edited_at, channel_id, message_id),
+            )
+
+    def mark_deleted(self, channel_id: int, message_ids: Iterable[int]) -> None:
+        with self.db:
+            self.db.executemany(
+                "UPDATE roll_messages SET deleted = 1 WHERE channel_id = ? AND message_id = ?",
+                ((channel_id, mid) for mid in message_ids),
+            )
+
+    def covered(self, channel_id: int) -> List[Tuple[int, int]]:
+        return self.db.execute(
+            "SELECT first_id, last_id FROM covered_ranges WHERE channel_id = ? ORDER BY first_id",
+            (channel_id,),
+        ).fetchall()
+
+    def mark_covered(self, channel_id: int, first_id: int, last_id: int) -> None:
+        # merge with overlapping/adjacent ranges so the table stays small
+        merged: List[List[int]] = []
+        for lo, hi in sorted(self.covered(channel_id) + [(first_id, last_id)]):
+            if merged and lo <= merged[-1][1] + 1:
+                merged[-1][1] = max(merged[-1][1], hi)
+            else:
+                merged.append([lo, hi])
+        with self.db:
+            self.db.execute("DELETE FROM covered_ranges WHERE channel_id = ?", (channel_id,))
+            self.db.executemany(
+                "INSERT INTO covered_ranges (channel_id, first_id, last_id) VALUES (?, ?, ?)",
+                ((channel_id, lo, hi) for lo, hi in merged),
+            )
+
+    def channel_lock(self, channel_id: int) -> asyncio.Lock:
+        """
+        Held around sync() and the iter_messages() read after it, so no other sync of the channel
+        rewrites or marks deleted the rows a reader has not reached yet.
+        """
+        return self._locks[channel_id]
+
+    def seen_id(self) -> Optional[int]:
+        row = self.db.execute("SELECT seen_id FROM gateway_seen WHERE id = 0").fetchone()
+        return row[0] if row else None
+
+    def mark_seen(self) -> None:
+        """Records that the gateway is connected now: edits and deletes up to now were seen."""
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO gateway_seen (id, seen_id) VALUES (0, ?)",
+                (discord.utils.time_snowflake(discord.utils.utcnow()),),
+            )
+
+    def revalidate(self, margin_seconds: float) -> int:
+        """
+        Uncovers the part of the covered ranges after margin_seconds before the gateway was last seen
+        (mark_seen; without a record, the last ROLL_STORE_REVALIDATE_SECONDS), so the next sync fetches it again.
+        Only the newest ranges reach past that point, and running it again changes nothing.
+        Returns how many ranges were shortened or dropped.
+        """
+        seen_id = self.seen_id()
+        if seen_id is None:
+            seen_id = discord.utils.time_snowflake(
+                discord.utils.utcnow() - timedelta(seconds=ROLL_STORE_REVALIDATE_SECONDS)
+            )
+        cut_id = seen_id - (int(margin_seconds * 1000) << 22)   # snowflakes count milliseconds from bit 22 up
+        changed = 0
+        with self.db:
+            for channel_id, first_id, last_id in self.db.execute(
+                "SELECT channel_id, first_id, last_id FROM covered_ranges WHERE last_id > ?", (cut_id,)
+            ).fetchall():
+                if first_id > cut_id:
+                    self.db.execute(
+                        "DELETE FROM covered_ranges WHERE channel_id = ? AND first_id = ?", (channel_id, first_id)
+                    )
+                else:
+                    self.db.execute(
+                        "UPDATE covered_ranges SET last_id = ? WHERE channel_id = ? AND first_id = ?",
+                        (cut_id, channel_id, first_id),
+                    )
+                changed += 1
+        return changed
+
+    async def sync(self, channel: discord.TextChannel, first_id: int, last_id: int) -> int:
+        """
+        Fetches the parts of [first_id, last_id] that are not stored yet. Returns how many messages were fetched.
+        Messages stored in a fetched part (an unsettled or revalidated one) that are not returned again
+        were deleted in the meantime and are marked so once the part is fetched completely.
+        Callers hold channel_lock(channel.id).
+        """
+        settled_id = discord.utils.time_snowflake(
+            discord.utils.utcnow() - timedelta(seconds=ROLL_STORE_SETTLE_SECONDS), high=True
+        )
+        fetched = 0
+        for gap_first, gap_last in _range_gaps(first_id, last_id, self.covered(channel.id)):
+            print(f"[DEBUG] Fetching #{channel.name} gap {gap_first}..{gap_last}")
+            fetched_ids: Set[int] = set()
+            async for batch in iter_channel_history_slices(channel, gap_first - 1, gap_last + 1):
+                self.add_messages(batch)
+                fetched_ids.update(msg.id for msg in batch)
+            fetched += len(fetched_ids)
+            with self.db:
+                stored_ids = self.db.execute(
+                    "SELECT message_id FROM roll_messages"
+                    " WHERE channel_id = ? AND message_id BETWEEN ? AND ? AND deleted = 0",
+                    (channel.id, gap_first, gap_last),
+                ).fetchall()
+                self.db.executemany(
+                    "UPDATE roll_messages SET deleted = 1 WHERE channel_id = ? AND message_id = ?",
+                    ((channel.id, mid) for mid, in stored_ids if mid not in fetched_ids),
+                )
+            if gap_first <= settled_id:
+                self.mark_covered(channel.id, gap_first, min(gap_last, settled_id))
+        return fetched
+
+    def iter_messages(
+        self,
+        channel_id: int,
+        first_id: int,
+        last_id: int,
+        batch_size: int = 5000,
+    ) -> Iterable[List[Tuple[int, int, Optional[int], Optional[int]]]]:
+        """
+        Yields batches of (message_id, author_id, roll, user_id) in message ID order, skipping deleted messages.
+        """
+        cur = self.db.execute(
+            "SELECT message_id, author_id, roll, user_id FROM roll_messages"
+            " WHERE channel_id = ? AND message_id BETWEEN ? AND ? AND deleted = 0"
+            " ORDER BY message_id",
+            (channel_id, first_id, last_id),
+        )
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                return
+            yield rows
+
+roll_store = RollStore()
+
+# True between on_ready (after the roll store was revalidated) or on_resumed and the next disconnect:
+# only then were all edits and deletes seen, and only then is the gateway recorded as seen
+gateway_seen_live = False
+
+@tasks.loop(seconds=GATEWAY_SEEN_INTERVAL_SECONDS)
+async def record_gateway_seen():
+    if gateway_seen_live:
+        roll_store.mark_seen()
+
+@bot.event
+async def on_disconnect():
+    global gateway_seen_live
+    if gateway_seen_live:
+        roll_store.mark_seen()
+    gateway_seen_live = False
+
+@bot.event
+async def on_resumed():
+    # a resumed session replays the missed events
+    global gateway_seen_live
+    gateway_seen_live = True
+
+@bot.event
+async def on_raw_message_edit(payload: discord.RawMessageUpdateEvent):
+    if roll_store.tracks(payload.channel_id):
+        roll_store.update_message(payload.message)
+    await apply_live_loot_message(payload.message, edited=True)
+
+@bot.event
+async def on_raw_message_delete(payload: discord.RawMessageDeleteEvent):
+    if roll_store.tracks(payload.channel_id):
+        roll_store.mark_deleted(payload.channel_id, [payload.message_id])
+
+@bot.event
+async def on_raw_bulk_message_delete(payload: discord.RawBulkMessageDeleteEvent):
+    if roll_store.tracks(payload.channel_id):
+        roll_store.mark_deleted(payload.channel_id, payload.message_ids)
+
+def _snowflake_seconds(message_id: int) -> float:
+    # creation time of a snowflake as a UNIX timestamp (discord.utils.snowflake_time without the datetime)
+    return ((message_id >> 22) + discord.utils.DISCORD_EPOCH) / 1000
+
+@dataclass
+class FactionTotals:
+    rolls: int = 0
+    base: int = 0
+    bonus: int = 0
+    users: int = 0
+    weird_flower_carriers: int = 0
+
+    @property
+    def score(self) -> int:
+        return self.base + self.bonus
+
+class ScoreBuckets:
+    """
+    Per-bucket aggregates of the rolls of a RollScorer, per faction: roll count, base and bonus totals,
+    plus per-user roll counts for distinct users and Weird Flower carriers.
+    Every roll is placed by its own message time, with its current contribution (pending and paired
+    Weird Flower rolls included), so all buckets together always add up to the scorer totals.
+
+    query() answers the bucket-aligned part of [start, end) from prefix sums and only walks
+    the individual rolls of the two partial edge buckets.
+    """
+
+    # index of each measure in a bucket's aggregate row; monolith first, then STALKERS
+    _ROLLS, _BASE, _BONUS = 0, 1, 2
+
+    def __init__(self, bucket_seconds: int):
+        self.bucket_seconds = bucket_seconds
+        # bucket -> message ID -> (timestamp, is_monolith, base, bonus, user ID, has Weird Flower)
+        self.rolls: Dict[int, Dict[int, Tuple[float, bool, int, int, int, bool]]] = defaultdict(dict)
+        self.sums: Dict[int, List[int]] = {}  # bucket -> [mon rolls, mon base, mon bonus, sta rolls, sta base, sta bonus]
+        self.users: Dict[int, List[Dict[int, int]]] = {}  # bucket -> [mon users, sta users, mon carriers, sta carriers]
+        self._prefix: Optional[Tuple[List[int], List[List[int]]]] = None
+
+    def _update(self, bucket: int, entry: Tuple[float, bool, int, int, int, bool], sign: int) -> None:
+        _, is_monolith, base, bonus, userid, weird_flower = entry
+        sums = self.sums.setdefault(bucket, [0] * 6)
+        users = self.users.setdefault(bucket, [defaultdict(int) for _ in range(4)])
+        offset = 0 if is_monolith else 3
+        sums[offset + self._ROLLS] += sign
+        sums[offset + self._BASE] += sign * base
+        sums[offset + self._BONUS] += sign * bonus
+        for counts in (users[0 if is_monolith else 1], users[2 if is_monolith else 3] if weird_flower else None):
+            if counts is None:
+                continue
+            counts[userid] += sign
+            if counts[userid] <= 0:
+                del counts[userid]
+        self._prefix = None
+
+    def set(self, message_id: int, faction: str, base: int, bonus: int, userid: int, weird_flower: bool) -> None:
+        ts = _snowflake_seconds(message_id)
+        bucket = int(ts // self.bucket_seconds)
+        old = self.rolls[bucket].get(message_id)
+        if old is not None:
+            self._update(bucket, old, -1)
+        entry = (ts, faction in MONOLITH_FACTIONS, base, bonus, userid, weird_flower)
+        self.rolls[bucket][message_id] = entry
+        self._update(bucket, entry, 1)
+
+    def remove(self, message_id: int) -> None:
+        bucket = int(_snowflake_seconds(message_id) // self.bucket_seconds)
+        old = self.rolls.get(bucket, {}).pop(message_id, None)
+        if old is not None:
+            self._update(bucket, old, -1)
+
+    def _prefix_sums(self) -> Tuple[List[int], List[List[int]]]:
+        if self._prefix is None:
+            keys = sorted(self.sums)
+            prefix = [[0] * 6]
+            for key in keys:
+                prefix.append([a + b for a, b in zip(prefix[-1], self.sums[key])])
+            self._prefix = (keys, prefix)
+        return self._prefix
+
+    def query(self, start_ts: float, end_ts: float) -> Tuple[FactionTotals, FactionTotals]:
+        """
+        Totals of the rolls with start_ts <= message time < end_ts. Returns (monolith, stalkers).
+        """
+        first_full = -int(-start_ts // self.bucket_seconds)  # ceil
+        end_full = int(end_ts // self.bucket_seconds)         # floor, exclusive
+
+        sums = [0] * 6
+        users: List[Set[int]] = [set(), set(), set(), set()]
+        edge_buckets: Set[int] = set()
+        if first_full < end_full:
+            keys, prefix = self._prefix_sums()
+            lo, hi = bisect.bisect_left(keys, first_full), bisect.bisect_left(keys, end_full)
+            sums = [b - a for a, b in zip(prefix[lo], prefix[hi])]
+            for key in keys[lo:hi]:
+                for i, counts in enumerate(self.users[key]):
+                    users[i].update(counts)
+            # partial buckets at either end, if the bounds are not aligned
+            if start_ts < first_full * self.bucket_seconds:
+                edge_buckets.add(first_full - 1)
+            if end_ts > end_full * self.bucket_seconds:
+                edge_buckets.add(end_full)
+        else:
+            # no whole bucket inside the range: it lies within one bucket or straddles two
+            edge_buckets = {int(start_ts // self.bucket_seconds), end_full}
+
+        for bucket in edge_buckets:
+            for ts, is_monolith, base, bonus, userid, weird_flower in self.rolls.get(bucket, {}).values():
+                if not start_ts <= ts < end_ts:
+                    continue
+                offset = 0 if is_monolith else 3
+                sums[offset + self._ROLLS] += 1
+                sums[offset + self._BASE] += base
+                sums[offset + self._BONUS] += bonus
+                users[0 if is_monolith else 1].add(userid)
+                if weird_flower:
+                    users[2 if is_monolith else 3].add(userid)
+
+        return (
+            FactionTotals(sums[0], sums[1], sums[2], len(users[0]), len(users[2])),
+            FactionTotals(sums[3], sums[4], sums[5], len(users[1]), len(users[3])),
+        )
+
+@dataclass
+class ScoredRoll:
+    """
+    What one roll message contributed to a RollScorer, kept so the contribution can be reversed.
+    """
+    userid: int
+    faction: str
+    roll: int
+    equipped: FrozenSet[str]
+    state: str = "scored"           # "scored", "cheating", "carrier" (unpaired Weird Flower) or "paired"
+    points: int = 0                 # committed to the totals by this roll
+    partner: Optional[int] = None   # message ID of the other Weird Flower carrier of the pair
+    pair_string: str = ""
+    pair_kind: str = ""             # "monolith", "stalker" or "split"
+    fake_equipment: Tuple[str, ...] = ()    # of a cheating roll
+
+# Equipment a roll may wear per kind of faction, frozen once instead of copied per roll
+_MONOLITH_EQUIPMENT = frozenset(MONOLITH_ALL_EQUIPMENT)
+_TRANSITIONED_EQUIPMENT = frozenset(MONOLITH_ALL_EQUIPMENT | STALKERS_ALL_EQUIPMENT)
+_STALKERS_EQUIPMENT = frozenset(STALKERS_ALL_EQUIPMENT)
+
+class FactionContext:
+    """
+    What scoring a roll of one faction needs: the equipment it can wear and the loot it is checked against.
+    TRANSITIONED_FACTIONS wear the gear of both sides and are checked against both loot channels.
+    """
+    __slots__ = ("faction", "equipment", "looted")
+
+    def __init__(self, faction: str, monolith_looted: LootView, stalkers_looted: LootView, merged_looted: Optional[LootView] = None):
+        self.faction = faction
         if faction in MONOLITH_FACTIONS:
-            faction_equipment_list = set(MONOLITH_ALL_EQUIPMENT)
-            faction_looted_dict = monolith_looted
-            is_monolith = True
+            self.equipment = _MONOLITH_EQUIPMENT
+            self.looted = monolith_looted
             if faction in TRANSITIONED_FACTIONS:
-                faction_equipment_list |= STALKERS_ALL_EQUIPMENT
-                faction_looted_dict = merged_looted
-            monolith_cnt += 1
-            monolith_users.add(userid)
+                self.equipment = _TRANSITIONED_EQUIPMENT
+                self.looted = merged_looted if merged_looted is not None else MergedLoot(monolith_looted, stalkers_looted)
         else:
-            faction_equipment_list = STALKERS_ALL_EQUIPMENT
-            faction_looted_dict = stalkers_looted
-            is_monolith = False
-            stalker_cnt += 1
-            stalker_users.add(userid)
-
-        equipped = get_equipped_equipment(roles, faction_equipment_list)
-        equipped = filter_redundant_armor(equipped, roles, userid, roll, faction, faction_looted_dict)
-        
-        cheating, fake_list = is_cheating(equipped, userid, faction_looted_dict)
-        if cheating:
-            cheaters_ids = [pair[0] for pair in cheaters]
-            if (userid not in cheaters_ids):
-                cheaters.append((userid, faction))
-            # accumulate (dedupe while preserving order)
-            existing = set(cheater_fake_equipment[userid])
-            for x in fake_list:
-                if x not in existing:
-                    cheater_fake_equipment[userid].append(x)
-                    existing.add(x)
+            self.equipment = _STALKERS_EQUIPMENT
+            self.looted = stalkers_looted
+
+    def equipped(self, loadout: RoleLoadout) -> Set[str]:
+        return set(loadout.items.intersection(self.equipment))
+
+class ResolvedLoadout:
+    """
+    Everything about a roll that only depends on who rolled with which loadout against which loot:
+    faction, equipment left after filter_redundant_armor, the cheater verdict and the FactionWars24 check.
+    Valid for rolls with a message ID in [since, until), over which the user's loot does not change,
+    and while the armor selection reactions are at armor_version.
+    """
+    __slots__ = (
+        "loot_version", "armor_version", "since", "until", "faction", "equipped", "cheating", "fake_list", "check",
+        "weird_flower", "weird_bolt", "loadout_id",
+    )
+
+    def __init__(
+        self,
+        loot_version: int,
+        armor_version: int,
+        since: int,
+        until: int,
+        faction: str,
+        equipped: FrozenSet[str],
+        cheating: bool,
+        fake_list: List[str],
+        check: Optional[str],
+    ):
+        self.loot_version = loot_version
+        self.armor_version = armor_version
+        self.since = since
+        self.until = until
+        self.faction = faction
+        self.equipped = equipped
+        self.cheating = cheating
+        self.fake_list = fake_list
+        self.check = check                  # FactionWars24 check to log for every roll, up to the roll value
+        self.weird_flower = "Weird Flower" in equipped and not cheating
+        self.weird_bolt = "Weird Bolt" in equipped
+        self.loadout_id = -1                # row of the equipment in the bonus matrix of ColumnarRollScorer
+
+class _CheaterRecord:
+    """
+    Fake equipment of one cheater: the reported list (first seen first) and the same items as a set.
+    """
+    __slots__ = ("fake_equipment", "seen")
+
+    def __init__(self, fake_equipment: List[str]):
+        self.fake_equipment = fake_equipment
+        self.seen: Set[str] = set(fake_equipment)
+
+class RollScorer:
+    """
+    Scoring state of one battle window: faction detection, cheater check, equipment bonus and Weird Flower pairing.
+    Rolls must be added in chronological order. Unpaired Weird Flower carriers are kept as pending points,
+    so monolith_score/stalkers_score are the final totals at any moment.
+
+    With track_messages=True every roll is remembered by message ID and can be reversed with remove_roll
+    (used by the live scoreboard). Detected cheaters stay listed after their rolls are removed.
+    With bucket_seconds, ScoreBuckets aggregates are kept next to the totals for range queries.
+    With defer_weird_flowers=True Weird Flower rolls are only counted and listed in deferred_weird_flowers,
+    in order, for a later pairing pass (a shard of a sharded recount).
+    """
+
+    def __init__(
+        self,
+        monolith_looted: LootView,
+        stalkers_looted: LootView,
+        track_messages: bool = False,
+        bucket_seconds: Optional[int] = None,
+        defer_weird_flowers: bool = False,
+    ):
+        self.monolith_looted = monolith_looted
+        self.stalkers_looted = stalkers_looted
+        self.merged_looted = MergedLoot(monolith_looted, stalkers_looted)
+
+        # committed totals and points of the still unpaired Weird Flower carriers
+        self.monolith_total = 0
+        self.stalkers_total = 0
+        self.monolith_pending = 0
+        self.stalkers_pending = 0
+
+        # cheaters and their fake equipment
+        self.cheaters: List[Tuple[int, str]] = []
+        self.cheater_fake_equipment: Dict[int, List[str]] = defaultdict(list)
+        self._cheater_records: Dict[int, _CheaterRecord] = {}
+        self._faction_contexts: Dict[str, FactionContext] = {}
+        # (user ID, loadout) -> resolution, valid while merged_looted.version is its loot_version (and armor_selection.version its armor_version)
+        self._resolved: Dict[Tuple[int, RoleLoadout], ResolvedLoadout] = {}
+        self.as_of_roll = CHEATER_CHECK_AS_OF_ROLL
+        self.armor_selection = armor_selection
+        # FactionWars24 checks that could not be settled, one per affected roll, for the report
+        self.faction_wars_24_checks: List[str] = []
+
+        # Object to hold one Weird Flower carrier. Once same roll was detected between two Weird Flower carriers, their rolls are set to 96 and
+        # the first carrier gets deleted from the list.
+        self.weird_flower_carriers: Dict[int, Tuple[int, str, FrozenSet[str], Optional[int]]] = {} # key: roll, value: (User ID, faction, equipment, message ID)
+        self.weird_flower_pairs: List[str] = []
+        # (roll, user ID, faction, equipment, message ID) of the Weird Flower rolls left for the pairing pass
+        self.deferred_weird_flowers: Optional[List[Tuple[int, int, str, FrozenSet[str], Optional[int]]]] = [] if defer_weird_flowers else None
+
+        self.monolith_cnt = 0
+        self.stalker_cnt = 0
+        self.monolith_users: Dict[int, int] = defaultdict(int)  # user -> rolls, so removed rolls can be uncounted
+        self.stalker_users: Dict[int, int] = defaultdict(int)
+        self.monolith_pairs = 0
+        self.stalker_pairs = 0
+        self.split_pairs = 0
+        self.mon_weird_flower_rolls = 0
+        self.sta_weird_flower_rolls = 0
+        self.mon_weird_flower_carriers: Dict[int, int] = defaultdict(int)
+        self.sta_weird_flower_carriers: Dict[int, int] = defaultdict(int)
+
+        self.track_messages = track_messages
+        self.messages: Dict[int, ScoredRoll] = {}
+        # roll value -> message IDs of the tracked Weird Flower rolls, ascending, so a value can be paired again
+        self._weird_flower_ids: DefaultDict[int, List[int]] = defaultdict(list)
+        # message IDs of the tracked cheating rolls, ascending, so the cheaters can be listed again
+        self._cheating_ids: List[int] = []
+        # message ID -> FactionWars24 check of a tracked roll
+        self._checks: Dict[int, str] = {}
+        # per-time-bucket aggregates for range queries (rolls need message IDs for that)
+        self.buckets: Optional[ScoreBuckets] = ScoreBuckets(bucket_seconds) if bucket_seconds else None
+
+    @property
+    def monolith_score(self) -> int:
+        return self.monolith_total + self.monolith_pending
+
+    @property
+    def stalkers_score(self) -> int:
+        return self.stalkers_total + self.stalkers_pending
+
+    def _commit(self, faction: str, points: int) -> None:
+        if faction in MONOLITH_FACTIONS:
+            self.monolith_total += points
         else:
-            # if Weird Flower is detected, the roll is not calculated and kept in the dictionary
-            # till the end of parsing. 
-            if "Weird Flower" in equipped:
-                if faction in MONOLITH_FACTIONS:
-                    mon_weird_flower_rolls += 1
-                    mon_weird_flower_carriers.add(userid)
-                else:
-                    sta_weird_flower_rolls += 1
-                    sta_weird_flower_carriers.add(userid)
-                    
-                if roll in weird_flower_carriers:
-                    # handle detected pair with Weird Flowers
-                    paired_userid, paired_faction, paired_equipped = weird_flower_carriers[roll]
-                    pair_string = f"(roll {roll}): `{userid}`, `{paired_userid}`"
-                    print(f"[DEBUG] Pair with Weird Flowers detected {pair_string}")
-                    if faction == paired_faction:
-                        if faction in MONOLITH_FACTIONS:
-                            monolith_pairs += 1
-                        else:
-                            stalker_pairs += 1
-                    else:
-                        split_pairs += 1
-                    weird_flower_pairs.append(pair_string)
-                    del weird_flower_carriers[roll]
-                    paired_roll = WEIRD_FLOWER_PAIR_ROLL
-                    if (roll == 1 or roll == 2):
-                        roll = WEIRD_FLOWER_PAIR_ROLL
-                        if "Weird Bolt" in equipped:
-                            roll = WEIRD_BOLT_1_2_ROLL
-                        if "Weird Bolt" in paired_equipped:
-                            paired_roll = WEIRD_BOLT_1_2_ROLL
-                    else:
-                        roll = WEIRD_FLOWER_PAIR_ROLL
-                    equipment_bonus = calculate_equipment_bonus(paired_equipped, paired_roll)
-                    if paired_faction in MONOLITH_FACTIONS:
-                        monolith_total += (paired_roll + equipment_bonus)
-                    else:
-                        stalkers_total += (paired_roll + equipment_bonus)
-                    
-                else:
-                    weird_flower_carriers[roll] = tuple([userid, faction, equipped])
-                    continue
-            elif (roll == 1 or roll == 2) and "Weird Bolt" in equipped:
-                roll = WEIRD_BOLT_1_2_ROLL
+            self.stalkers_total += points
+
+    def _add_pending(self, faction: str, points: int) -> None:
+        if faction in MONOLITH_FACTIONS:
+            self.monolith_pending += points
+        else:
+            self.stalkers_pending += points
+
+    @staticmethod
+    def _unpaired_roll(roll: int, equipped: FrozenSet[str]) -> int:
+        if (roll == 1 or roll == 2) and "Weird Bolt" in equipped:
+            return WEIRD_BOLT_1_2_ROLL
+        return roll
+
+    def _unpaired_points(self, roll: int, equipped: FrozenSet[str]) -> int:
+        roll = self._unpaired_roll(roll, equipped)
+        return roll + calculate_equipment_bonus(equipped, roll)
+
+    def _bucket(
+        self,
+        message_id: Optional[int],
+        faction: str,
+        base: int,
+        bonus: int,
+        userid: int,
+        weird_flower: bool = False,
+    ) -> None:
+        if self.buckets is not None and message_id is not None:
+            self.buckets.set(message_id, faction, base, bonus, userid, weird_flower)
+
+    def _count_roll(self, userid: int, faction: str, delta: int) -> None:
+        users = self.monolith_users if faction in MONOLITH_FACTIONS else self.stalker_users
+        if faction in MONOLITH_FACTIONS:
+            self.monolith_cnt += delta
+        else:
+            self.stalker_cnt += delta
+        users[userid] += delta
+        if users[userid] <= 0:
+            del users[userid]
+
+    def _count_weird_flower_roll(self, userid: int, faction: str, delta: int) -> None:
+        if faction in MONOLITH_FACTIONS:
+            self.mon_weird_flower_rolls += delta
+            carriers = self.mon_weird_flower_carriers
+        else:
+            self.sta_weird_flower_rolls += delta
+            carriers = self.sta_weird_flower_carriers
+        carriers[userid] += delta
+        if carriers[userid] <= 0:
+            del carriers[userid]
+
+    def _faction_context(self, faction: str) -> FactionContext:
+        context = self._faction_contexts.get(faction)
+        if context is None:
+            context = self._faction_contexts[faction] = FactionContext(
+                faction, self.monolith_looted, self.stalkers_looted, self.merged_looted,
+            )
+        return context
+
+    def _resolve(self, userid: int, loadout: RoleLoadout, loot_version: int, as_of: int) -> ResolvedLoadout:
+        faction = loadout.faction
+        context = self._faction_context(faction)
+        equipped, check = _filter_redundant_armor(context.equipped(loadout), loadout.faction_wars_24, userid, faction)
+        owned, since, until = context.looted.owned_at(userid, as_of)
+        cheating, fake_list = _is_cheating_owned(equipped, owned)
+        if cheating:
+            check = None
+        elif check is not None and self.armor_selection.verify(userid, equipped):
+            # settled by the armor selection reactions; the 2024 armor (if any) was dropped, with its bonus
+            check = None
+        return ResolvedLoadout(
+            loot_version, self.armor_selection.version, since, until,
+            faction, frozenset(equipped), cheating, fake_list, check,
+        )
 
-            equipment_bonus = calculate_equipment_bonus(equipped, roll)
-            if is_monolith:
-                monolith_total += (roll + equipment_bonus)
+    def resolve(self, userid: int, loadout: RoleLoadout, message_id: Optional[int] = None) -> ResolvedLoadout:
+        """
+        The resolution of the user's loadout for a roll, computed once per (user, loadout) until the loot
+        or the armor selection reactions change.
+        With as_of_roll (CHEATER_CHECK_AS_OF_ROLL) the roll is judged against the loot posted before its message,
+        so a new resolution is also needed once a roll is past the user's next loot; rolls without a message ID,
+        or all rolls otherwise, are judged against all loot. Cheaters are listed by the rolls (add_roll).
+        """
+        as_of = message_id if self.as_of_roll and message_id is not None else LOOT_NOW
+        loot_version = self.merged_looted.version
+        key = (userid, loadout)
+        resolved = self._resolved.get(key)
+        if (
+            resolved is None or resolved.loot_version != loot_version or not resolved.since <= as_of < resolved.until
+            or resolved.armor_version != self.armor_selection.version
+        ):
+            resolved = self._resolved[key] = self._resolve(userid, loadout, loot_version, as_of)
+        return resolved
+
+    def _add_cheater(self, userid: int, faction: str, fake_list: Iterable[str]) -> None:
+        record = self._cheater_records.get(userid)
+        if record is None:
+            self.cheaters.append((userid, faction))
+            record = self._cheater_records[userid] = _CheaterRecord(self.cheater_fake_equipment[userid])
+        # accumulate (dedupe while preserving order)
+        seen = record.seen
+        for x in fake_list:
+            if x not in seen:
+                record.fake_equipment.append(x)
+                seen.add(x)
+
+    def add_roll(self, roll: int, userid: int, loadout: RoleLoadout, message_id: Optional[int] = None) -> None:
+        resolved = self.resolve(userid, loadout, message_id)
+        faction, equipped = resolved.faction, resolved.equipped
+        self._count_roll(userid, faction, 1)
+        if resolved.check is not None:
+            self._add_check(faction_wars_24_check(resolved.check, roll), message_id)
+
+        if resolved.cheating:
+            self._remember(message_id, userid, faction, roll, equipped, state="cheating", fake_equipment=tuple(resolved.fake_list))
+            self._add_cheating_roll(userid, faction, resolved.fake_list, message_id)
+            self._bucket(message_id, faction, 0, 0, userid)
+            return
+
+        # if Weird Flower is detected, the roll is not calculated until a pair is found (or the window ends)
+        if resolved.weird_flower:
+            self._count_weird_flower_roll(userid, faction, 1)
+            self._add_weird_flower_roll(roll, userid, faction, equipped, message_id)
+            return
+
+        scored_roll = roll
+        if (roll == 1 or roll == 2) and resolved.weird_bolt:
+            scored_roll = WEIRD_BOLT_1_2_ROLL
+        bonus = calculate_equipment_bonus(equipped, scored_roll)
+        points = scored_roll + bonus
+        self._commit(faction, points)
+        self._remember(message_id, userid, faction, roll, equipped, points=points)
+        self._bucket(message_id, faction, scored_roll, bonus, userid)
+
+    def _remember(
+        self,
+        message_id: Optional[int],
+        userid: int,
+        faction: str,
+        roll: int,
+        equipped: FrozenSet[str],
+        state: str = "scored",
+        points: int = 0,
+        fake_equipment: Tuple[str, ...] = (),
+    ) -> None:
+        # the ScoredRoll is only built if it is kept
+        if self.track_messages and message_id is not None:
+            self.messages[message_id] = ScoredRoll(userid, faction, roll, equipped, state, points, fake_equipment=fake_equipment)
+
+    def _add_check(self, check: str, message_id: Optional[int]) -> None:
+        self.faction_wars_24_checks.append(check)
+        if self.track_messages and message_id is not None:
+            self._checks[message_id] = check
+
+    def _add_cheating_roll(self, userid: int, faction: str, fake_list: List[str], message_id: Optional[int]) -> None:
+        # tracked cheating rolls list their cheaters in message order, like a rescan
+        if self.track_messages and message_id is not None:
+            ids = self._cheating_ids
+            if ids and message_id < ids[-1]:
+                bisect.insort(ids, message_id)
+                self._relist_cheaters()
+                return
+            ids.append(message_id)
+        self._add_cheater(userid, faction, fake_list)
+
+    def _relist_cheaters(self) -> None:
+        """
+        Lists the cheaters again from the tracked cheating rolls, in message order.
+        """
+        self.cheaters.clear()
+        self.cheater_fake_equipment.clear()
+        self._cheater_records.clear()
+        for message_id in self._cheating_ids:
+            scored = self.messages[message_id]
+            self._add_cheater(scored.userid, scored.faction, scored.fake_equipment)
+
+    def _add_weird_flower_roll(
+        self,
+        roll: int,
+        userid: int,
+        faction: str,
+        equipped: FrozenSet[str],
+        message_id: Optional[int],
+    ) -> None:
+        if self.deferred_weird_flowers is not None:
+            self.deferred_weird_flowers.append((roll, userid, faction, equipped, message_id))
+            return
+        if self.track_messages and message_id is not None:
+            ids = self._weird_flower_ids[roll]
+            if ids and message_id < ids[-1]:
+                # older than a roll of the same value (an edited roll): pair the value again in message order
+                self._repair_weird_flowers(roll, added=(message_id, userid, faction, equipped))
+                return
+            ids.append(message_id)
+        if roll not in self.weird_flower_carriers:
+            self.weird_flower_carriers[roll] = (userid, faction, equipped, message_id)
+            unpaired_roll = self._unpaired_roll(roll, equipped)
+            unpaired_bonus = calculate_equipment_bonus(equipped, unpaired_roll)
+            self._add_pending(faction, unpaired_roll + unpaired_bonus)
+            self._remember(message_id, userid, faction, roll, equipped, state="carrier")
+            self._bucket(message_id, faction, unpaired_roll, unpaired_bonus, userid, weird_flower=True)
+            return
+
+        # handle detected pair with Weird Flowers
+        paired_userid, paired_faction, paired_equipped, paired_message_id = self.weird_flower_carriers.pop(roll)
+        self._add_pending(paired_faction, -self._unpaired_points(roll, paired_equipped))
+        pair_string = f"(roll {roll}): `{userid}`, `{paired_userid}`"
+        print(f"[DEBUG] Pair with Weird Flowers detected {pair_string}")
+        if faction == paired_faction:
+            if faction in MONOLITH_FACTIONS:
+                self.monolith_pairs += 1
+                pair_kind = "monolith"
             else:
-                stalkers_total += (roll + equipment_bonus)
-
-    # Handle rest of rolls in weird_flower_carriers, which didn't get pair
-    for roll, carrier_info in weird_flower_carriers.items():
-        nonpaired_userid, nonpaired_faction, nonpaired_equipped = carrier_info
-        if (roll == 1 or roll == 2) and "Weird Bolt" in nonpaired_equipped:
-            roll = WEIRD_BOLT_1_2_ROLL
-        equipment_bonus = calculate_equipment_bonus(nonpaired_equipped, roll)
-        if nonpaired_faction in MONOLITH_FACTIONS:
-            monolith_total += (roll + equipment_bonus)
+                self.stalker_pairs += 1
+                pair_kind = "stalker"
         else:
-            stalkers_total += (roll + equipment_bonus)
+            self.split_pairs += 1
+            pair_kind = "split"
+        self.weird_flower_pairs.append(pair_string)
+
+        own_roll = WEIRD_FLOWER_PAIR_ROLL
+        paired_roll = WEIRD_FLOWER_PAIR_ROLL
+        if (roll == 1 or roll == 2):
+            if "Weird Bolt" in equipped:
+                own_roll = WEIRD_BOLT_1_2_ROLL
+            if "Weird Bolt" in paired_equipped:
+                paired_roll = WEIRD_BOLT_1_2_ROLL
+        paired_bonus = calculate_equipment_bonus(paired_equipped, paired_roll)
+        own_bonus = calculate_equipment_bonus(equipped, own_roll)
+        paired_points = paired_roll + paired_bonus
+        own_points = own_roll + own_bonus
+        self._commit(paired_faction, paired_points)
+        self._commit(faction, own_points)
+        self._bucket(paired_message_id, paired_faction, paired_roll, paired_bonus, paired_userid, weird_flower=True)
+        self._bucket(message_id, faction, own_roll, own_bonus, userid, weird_flower=True)
+
+        if self.track_messages and message_id is not None and paired_message_id is not None:
+            self.messages[paired_message_id] = ScoredRoll(
+                paired_userid, paired_faction, roll, paired_equipped, "paired", paired_points,
+                message_id, pair_string, pair_kind,
+            )
+            self.messages[message_id] = ScoredRoll(
+                userid, faction, roll, equipped, "paired", own_points,
+                paired_message_id, pair_string, pair_kind,
+            )
+
+    def flush(self) -> None:
+        """
+        Scores rolls still buffered. Every roll is scored as it is added here, so there is nothing to do;
+        backends that score in batches (ColumnarRollScorer) need it before the totals are read.
+        """
+
+    def _repair_weird_flowers(
+        self,
+        roll: int,
+        removed: Optional[int] = None,
+        added: Optional[Tuple[int, int, str, FrozenSet[str]]] = None,
+    ) -> None:
+        """
+        Reverses every tracked Weird Flower roll of one roll value and pairs them again in message order,
+        without the `removed` message ID and with the `added` (message ID, user ID, faction, equipment) roll,
+        so the pairs are the ones a rescan of the remaining rolls finds.
+        """
+        rolls: List[Tuple[int, int, str, FrozenSet[str]]] = []
+        for message_id in self._weird_flower_ids.pop(roll, ()):
+            scored = self.messages[message_id]
+            if scored.state == "carrier":
+                del self.weird_flower_carriers[roll]
+                self._add_pending(scored.faction, -self._unpaired_points(roll, scored.equipped))
+            else:
+                self._commit(scored.faction, -scored.points)
+                if message_id < scored.partner:     # once per pair
+                    if scored.pair_kind == "monolith":
+                        self.monolith_pairs -= 1
+                    elif scored.pair_kind == "stalker":
+                        self.stalker_pairs -= 1
+                    else:
+                        self.split_pairs -= 1
+                    self.weird_flower_pairs.remove(scored.pair_string)
+            if message_id != removed:
+                rolls.append((message_id, scored.userid, scored.faction, scored.equipped))
+        if added is not None:
+            rolls.append(added)
+            rolls.sort(key=lambda r: r[0])
+        for message_id, userid, faction, equipped in rolls:
+            self._add_weird_flower_roll(roll, userid, faction, equipped, message_id)
+
+    def remove_roll(self, message_id: int) -> bool:
+        """
+        Reverses the contribution of a tracked roll. If it was a Weird Flower roll, the other Weird Flower rolls
+        of its value are paired again in message order, as a rescan without it would pair them;
+        if it was a cheating roll, the cheaters are listed again from the remaining ones.
+        Returns False if the message was not a tracked roll.
+        """
+        scored = self.messages.get(message_id)
+        if scored is None:
+            return False
+
+        self._count_roll(scored.userid, scored.faction, -1)
+        check = self._checks.pop(message_id, None)
+        if check is not None:
+            self.faction_wars_24_checks.remove(check)
+        if scored.state == "scored":
+            self._commit(scored.faction, -scored.points)
+        elif scored.state in ("carrier", "paired"):
+            self._count_weird_flower_roll(scored.userid, scored.faction, -1)
+            self._repair_weird_flowers(scored.roll, removed=message_id)
+        del self.messages[message_id]
+        if scored.state == "cheating":
+            self._cheating_ids.remove(message_id)
+            self._relist_cheaters()
+        if self.buckets is not None:
+            self.buckets.remove(message_id)
+        return True
+
+class ColumnarRollScorer(RollScorer):
+    """
+    RollScorer of the "numpy" backend, for full recounts. Each resolved loadout (RollScorer.resolve)
+    gets a loadout ID for its equipment; rolls are buffered as columns
+    (roll value, faction code, loadout ID, cheater flag) and scored per batch: base and bonus come from
+    gathers into a per-(loadout, roll) bonus matrix, built from the compiled per-(item, roll) table.
+    Weird Flower carriers still go through the sequential pairing of RollScorer in arrival order,
+    so every total is exactly the pure-Python one.
+
+    Call flush() before reading the totals. Like a RollScorer without track_messages it keeps no messages
+    (and no buckets), so remove_roll() finds nothing to reverse and returns False: rescoring after edits
+    or deletes is the live scoreboard's job, which always uses RollScorer.
+    """
 
-    # ---- Print results ----
-    print("=== COUNT ROLLS RESULTS ===")
+    _MONOLITH, _STALKERS = 0, 1
+
+    def __init__(self, monolith_looted: LootView, stalkers_looted: LootView, defer_weird_flowers: bool = False):
+        check_scoring_backend("numpy")
+        super().__init__(monolith_looted, stalkers_looted, defer_weird_flowers=defer_weird_flowers)
+        self._loadout_ids: Dict[FrozenSet[str], int] = {}
+        self._loadouts: List[FrozenSet[str]] = []
+        self._bonus_matrix = None          # loadout ID x roll -> bonus
+        self._bonus_matrix_version = -1
+        self._weird_bolt = None            # loadout ID -> has Weird Bolt
+        self._clear_columns()
+
+    def _clear_columns(self) -> None:
+        self._rolls = array("q")
+        self._factions = array("b")
+        self._loadout_col = array("q")
+        self._cheater_col = array("b")
+        self._flower_col = array("b")
+        self._users = array("q")
+
+    def _resolve(self, userid: int, loadout: RoleLoadout, loot_version: int, as_of: int) -> ResolvedLoadout:
+        resolved = super()._resolve(userid, loadout, loot_version, as_of)
+        resolved.loadout_id = self._loadout_ids.get(resolved.equipped, -1)
+        if resolved.loadout_id < 0:
+            resolved.loadout_id = self._loadout_ids[resolved.equipped] = len(self._loadouts)
+            self._loadouts.append(resolved.equipped)
+        return resolved
+
+    def add_roll(self, roll: int, userid: int, loadout: RoleLoadout, message_id: Optional[int] = None) -> None:
+        resolved = self.resolve(userid, loadout, message_id)
+        faction = resolved.faction
+        if resolved.check is not None:
+            self.faction_wars_24_checks.append(faction_wars_24_check(resolved.check, roll))
+        if resolved.cheating:
+            self._add_cheater(userid, faction, resolved.fake_list)
+
+        self._rolls.append(roll)
+        self._factions.append(self._MONOLITH if faction in MONOLITH_FACTIONS else self._STALKERS)
+        self._loadout_col.append(resolved.loadout_id)
+        self._cheater_col.append(resolved.cheating)
+        self._flower_col.append(resolved.weird_flower)
+        self._users.append(userid)
+        if resolved.weird_flower:
+            self._count_weird_flower_roll(userid, faction, 1)
+            self._add_weird_flower_roll(roll, userid, faction, resolved.equipped, message_id)
+        if len(self._rolls) >= COLUMNAR_BATCH_ROLLS:
+            self.flush()
+
+    def _bonuses(self) -> np.ndarray:
+        if _compiled_bonus_version != BonusTable.version:
+            _compile_bonus_tables()
+        if self._bonus_matrix is None or self._bonus_matrix_version != _compiled_bonus_version or len(self._bonus_matrix) < len(self._loadouts):
+            items = sorted(_compiled_bonus_table)
+            item_matrix = np.array([_compiled_bonus_table[eq] for eq in items], dtype=np.int64).reshape(len(items), MAX_ROLL + 1)
+            column = {eq: i for i, eq in enumerate(items)}
+            membership = np.zeros((len(self._loadouts), len(items)), dtype=np.int64)
+            for loadout_id, equipped in enumerate(self._loadouts):
+                for eq in equipped:
+                    if eq in column:
+                        membership[loadout_id, column[eq]] = 1
+            self._bonus_matrix = membership @ item_matrix
+            self._bonus_matrix_version = _compiled_bonus_version
+            self._weird_bolt = np.array(["Weird Bolt" in equipped for equipped in self._loadouts], dtype=bool)
+        return self._bonus_matrix
+
+    def flush(self) -> None:
+        if not self._rolls:
+            return
+        rolls = np.frombuffer(self._rolls, dtype=np.int64)
+        monolith = np.frombuffer(self._factions, dtype=np.int8) == self._MONOLITH
+        loadout_ids = np.frombuffer(self._loadout_col, dtype=np.int64)
+        scored = ~(np.frombuffer(self._cheater_col, dtype=np.int8).astype(bool) | np.frombuffer(self._flower_col, dtype=np.int8).astype(bool))
+        users = np.frombuffer(self._users, dtype=np.int64)
+
+        # roll counts of every roll, cheaters and Weird Flower carriers included
+        monolith_cnt = int(monolith.sum())
+        self.monolith_cnt += monolith_cnt
+        self.stalker_cnt += len(rolls) - monolith_cnt
+        for mask, counts in ((monolith, self.monolith_users), (~monolith, self.stalker_users)):
+            ids, n = np.unique(users[mask], return_counts=True)
+            for userid, cnt in zip(ids.tolist(), n.tolist()):
+                counts[userid] += cnt
+
+        # points of the scored rolls
+        bonus_matrix = self._bonuses()
+        roll, loadout_id, monolith = rolls[scored], loadout_ids[scored], monolith[scored]
+        base = np.where(((roll == 1) | (roll == 2)) & self._weird_bolt[loadout_id], WEIRD_BOLT_1_2_ROLL, roll)
+        in_table = (base >= 0) & (base <= MAX_ROLL)
+        bonus = np.zeros_like(base)
+        bonus[in_table] = bonus_matrix[loadout_id[in_table], base[in_table]]
+        for i in np.flatnonzero(~in_table).tolist():
+            bonus[i] = calculate_equipment_bonus(self._loadouts[loadout_id[i]], int(base[i]))
+        points = base + bonus
+        self.monolith_total += int(points[monolith].sum())
+        self.stalkers_total += int(points[~monolith].sum())
+        self._clear_columns()
+
+SCORING_BACKENDS = ("python", "numpy")
+
+def check_scoring_backend(backend: Optional[str]) -> str:
+    """
+    The backend of a run (default SCORING_BACKEND).
+    Raises ValueError for an unknown backend, or "numpy" without numpy installed.
+    """
+    backend = backend or SCORING_BACKEND
+    if backend not in SCORING_BACKENDS:
+        raise ValueError(f"Unknown scoring backend '{backend}'. Expected one of: {', '.join(SCORING_BACKENDS)}.")
+    if backend == "numpy" and np is None:
+        raise ValueError("The numpy scoring backend needs numpy (pip install numpy).")
+    return backend
+
+def make_roll_scorer(
+    monolith_looted: LootView,
+    stalkers_looted: LootView,
+    backend: Optional[str] = None,
+    defer_weird_flowers: bool = False,
+) -> RollScorer:
+    """
+    Scorer of a full recount on the given backend (check_scoring_backend). Its rolls cannot be removed
+    (no track_messages on either backend); use RollScorer(track_messages=True) for that.
+    """
+    if check_scoring_backend(backend) == "numpy":
+        return ColumnarRollScorer(monolith_looted, stalkers_looted, defer_weird_flowers)
+    return RollScorer(monolith_looted, stalkers_looted, defer_weird_flowers=defer_weird_flowers)
+
+@dataclass
+class RollQuery:
+    """
+    One scoring window of a channel scan: rolls posted by any of `authors` in [start_utc, end_utc).
+    """
+    start_utc: datetime
+    end_utc: datetime
+    authors: List[discord.Member]
+    label: str = ""
+
+async def parse_roll_queries(
+    text: str,
+    tz_name: str,
+    guild: discord.Guild,
+    default_author: discord.Member,
+) -> List[RollQuery]:
+    """
+    Parses "START, END[, @author ...]" queries separated by ';'. Authors are mentions or IDs,
+    the default author is used when none are given. Raises ValueError on bad input.
+    """
+    queries = []
+    for part in text.split(";"):
+        if not part.strip():
+            continue
+        fields = [f.strip() for f in part.split(",")]
+        if len(fields) not in (2, 3):
+            raise ValueError(f"Bad window '{part.strip()}'. Expected: START, END[, @author ...]")
+        start_utc = parse_datetime(fields[0], tz_name)
+        end_utc = parse_datetime(fields[1], tz_name)
+        if end_utc <= start_utc:
+            raise ValueError(f"End must be after Start in '{part.strip()}'.")
+
+        authors = [default_author]
+        if len(fields) == 3:
+            author_ids = extract_user_ids_from_text(fields[2]) | {int(x) for x in re.findall(r"\b\d{15,25}\b", fields[2])}
+            if not author_ids:
+                raise ValueError(f"No authors found in '{fields[2]}'.")
+            authors = []
+            for author_id in sorted(author_ids):
+                member = guild.get_member(author_id)
+                if member is None:
+                    try:
+                        member = await guild.fetch_member(author_id)
+                    except discord.HTTPException:
+                        raise ValueError(f"Author `{author_id}` is not a member of this server.")
+                authors.append(member)
+
+        queries.append(RollQuery(start_utc, end_utc, authors, f"{fields[0]} → {fields[1]}"))
+    return queries
+
+@dataclass
+class RollQueryResult:
+    query: RollQuery
+    scorer: RollScorer
+    matched: int = 0
+
+async def _collect_query_loot(queries: Sequence[RollQuery]) -> List[Tuple[LootView, LootView]]:
+    """
+    Loot of every query's author set. Each author's loot is collected once, however many queries it appears in;
+    several authors are combined into a merged view instead of a copy.
+    Returns: [(monolith_looted, stalkers_looted)] in query order
+    """
+    authors = {a.id: a for q in queries for a in q.authors}
+    collected = await asyncio.gather(*(collect_all_loot(a) for a in authors.values()))
+    loot_by_author = dict(zip(authors, collected))
+
+    query_loot: List[Tuple[LootView, LootView]] = []
+    for q in queries:
+        if len(q.authors) == 1:
+            query_loot.append(loot_by_author[q.authors[0].id])
+        else:
+            query_loot.append((
+                MergedLoot(*(loot_by_author[a.id][0] for a in q.authors)),
+                MergedLoot(*(loot_by_author[a.id][1] for a in q.authors)),
+            ))
+    return query_loot
+
+def _print_roll_report(channel: discord.TextChannel, result: RollQueryResult) -> None:
+    print(f"=== COUNT ROLLS RESULTS {result.query.label} ===")
     print(f"Channel: #{channel.name} ({channel.id})")
-    print(f"Author: {author} ({author.id})")
-    print(f"Messages scanned: {scanned}")
-    print(f"Messages matched (by author): {matched}")
+    print(f"Authors: {', '.join(f'{a} ({a.id})' for a in result.query.authors)}")
+    print(f"Window: {result.query.start_utc} → {result.query.end_utc}")
+    print(f"Messages matched (by author): {result.matched}")
+    _print_scorer_summary(result.scorer)
+
+def _print_scorer_summary(scorer: RollScorer) -> None:
+    monolith_total, stalkers_total = scorer.monolith_score, scorer.stalkers_score
+    monolith_cnt, stalker_cnt = scorer.monolith_cnt, scorer.stalker_cnt
+    monolith_users, stalker_users = scorer.monolith_users, scorer.stalker_users
+    stalker_pairs, monolith_pairs, split_pairs = scorer.stalker_pairs, scorer.monolith_pairs, scorer.split_pairs
+    mon_weird_flower_rolls, sta_weird_flower_rolls = scorer.mon_weird_flower_rolls, scorer.sta_weird_flower_rolls
+    mon_weird_flower_carriers, sta_weird_flower_carriers = scorer.mon_weird_flower_carriers, scorer.sta_weird_flower_carriers
+    cheaters, cheater_fake_equipment = scorer.cheaters, scorer.cheater_fake_equipment
+
     print(f"Monolith total score: {monolith_total} x {MONOLITH_MULTIPLIER} = {monolith_total * MONOLITH_MULTIPLIER}")
     print(f"STALKERS total score: {stalkers_total}")
     print(f"Monolith rolls = {monolith_cnt}, STALKERS rolls = {stalker_cnt}")
     print(f"Monolith members = {len(monolith_users)}, STALKERS members = {len(stalker_users)}")
-    print(f"Average {monolith_cnt/len(monolith_users)} rolls per mоnolithian")
-    print(f"Average {stalker_cnt/len(stalker_users)} rolls per stalker")
+    print(f"Average {monolith_cnt/max(len(monolith_users), 1)} rolls per mоnolithian")
+    print(f"Average {stalker_cnt/max(len(stalker_users), 1)} rolls per stalker")
     print(f"Weird Flower pairs: STALKER only = {stalker_pairs}, Monolith only = {monolith_pairs}, split = {split_pairs}, total = {stalker_pairs + monolith_pairs + split_pairs}")
     print(f"Weird Flower carriers: STALKERS - {len(sta_weird_flower_carriers)}, Monolith - {len(mon_weird_flower_carriers)}")
     print(f"Rolls from Weird Flower carriers: STALKERS - {sta_weird_flower_rolls}, Monolith - {mon_weird_flower_rolls}")
-    print(f"Average rolls per Weird Flower carrier: STALKERS - {sta_weird_flower_rolls/len(sta_weird_flower_carriers)}, Monolith - {mon_weird_flower_rolls/len(mon_weird_flower_carriers)}")
-    
+    print(f"Average rolls per Weird Flower carrier: STALKERS - {sta_weird_flower_rolls/max(len(sta_weird_flower_carriers), 1)}, Monolith - {mon_weird_flower_rolls/max(len(mon_weird_flower_carriers), 1)}")
+
     if cheaters:
         print("=== CHEATERS ===")
         for uid, faction in cheaters:
@@ -1007,7 +3208,805 @@ async def count_rolls_in_channel(
     else:
         print("No cheaters detected.")
 
-    return monolith_total, stalkers_total, cheaters, dict(cheater_fake_equipment), weird_flower_pairs
+async def count_rolls_multi(
+    *,
+    guild: discord.Guild,
+    channel: discord.TextChannel,
+    queries: Sequence[RollQuery],
+    interaction: discord.Interaction,
+    backend: Optional[str] = None,
+) -> List[RollQueryResult]:
+    """
+    Scores several (window, author set) queries in one pass over the channel: the history from the earliest
+    start to the latest end is read once and every roll is routed into each query it belongs to.
+    Each query has its own scorer on `backend` (make_roll_scorer), so totals and Weird Flower pairing stay separate.
+
+    Returns one RollQueryResult per query, in query order.
+    """
+
+    # looted equipment dictionaries
+    await interaction.edit_original_response(content="Stage 1/2: parsing fairly looted equipment…")
+    throttled_before = history_pacer.throttled_seconds
+    query_loot = await _collect_query_loot(queries)
+    results = [
+        RollQueryResult(q, make_roll_scorer(monolith_looted, stalkers_looted, backend))
+        for q, (monolith_looted, stalkers_looted) in zip(queries, query_loot)
+    ]
+
+    # (after_id, before_id, author IDs, result) per query, for routing
+    routes = []
+    for result in results:
+        after_id, before_id = _snowflake_bounds(result.query.start_utc, result.query.end_utc)
+        routes.append((after_id, before_id, frozenset(a.id for a in result.query.authors), result))
+
+    scanned = 0
+
+    await interaction.edit_original_response(content="Stage 2/2: parsing rolls…")
+    # reactions on the armor selection messages settle the FactionWars24 checks while scoring
+    await armor_selection.refresh(bot)
+    # one pass over the union of the windows; only the parts not in the local store are fetched from Discord
+    first_id = min(r[0] for r in routes) + 1
+    last_id = max(r[1] for r in routes) - 1
+    # no other sync of the channel may rewrite the rows between the batches of the read
+    async with roll_store.channel_lock(channel.id):
+        fetched = await roll_store.sync(channel, first_id, last_id)
+        for batch in roll_store.iter_messages(channel.id, first_id, last_id):
+            routed_batch: List[Tuple[RollQueryResult, int, int, int]] = []
+            for message_id, author_id, roll, userid in batch:
+                scanned += 1
+                for after_id, before_id, author_ids, result in routes:
+                    if not (after_id < message_id < before_id and author_id in author_ids):
+                        continue
+
+                    result.matched += 1
+
+                    # Skip messages that aren't the roll embed format
+                    if roll is None:
+                        continue
+                    routed_batch.append((result, message_id, roll, userid))
+
+            # roles held at each roll; rollers without role history are resolved at once
+            loadouts = await resolve_roll_loadouts(guild, [(message_id, userid) for _, message_id, _, userid in routed_batch])
+
+            for (result, message_id, roll, userid), loadout in zip(routed_batch, loadouts):
+                result.scorer.add_roll(roll, userid, loadout, message_id)
+
+    for result in results:
+        result.scorer.flush()
+
+    # ---- Print results ----
+    print(f"Messages scanned: {scanned} ({fetched} fetched from Discord, the rest from the local store)")
+    print(f"Time throttled by rate limits: {history_pacer.throttled_seconds - throttled_before:.2f}s")
+    for result in results:
+        _print_roll_report(channel, result)
+
+    return results
+
+async def count_rolls_in_channel(
+    *,
+    guild: discord.Guild,
+    channel: discord.TextChannel,
+    author: discord.Member,
+    interaction: discord.Interaction,
+    start_utc,
+    end_utc,
+) -> Tuple[int, int, List[Tuple[int, str]], Dict[int, List[str]], List[str]]:
+    """
+    Returns:
+      (monolith_total, stalkers_total, cheaters, cheater_fake_equipment_map)
+
+    Prints:
+      - Scores for each faction
+      - Cheaters and faked equipment
+    """
+    [result] = await count_rolls_multi(
+        guild=guild,
+        channel=channel,
+        queries=[RollQuery(start_utc, end_utc, [author])],
+        interaction=interaction,
+    )
+    scorer = result.scorer
+    return scorer.monolith_score, scorer.stalkers_score, scorer.cheaters, dict(scorer.cheater_fake_equipment), scorer.weird_flower_pairs
+
+
+# --------------------------------------------------------------------------------------------------------------------
+# Live scoreboard
+# --------------------------------------------------------------------------------------------------------------------
+
+class LiveScoreboard:
+    """
+    Keeps a RollScorer current for LIVE_ROLL_CHANNEL_ID: replays the battle so far from the roll store on start,
+    then applies new rolls from on_message and reverses edited or deleted ones.
+    Events are applied one at a time, in arrival order.
+    """
+
+    def __init__(self):
+        self.scorer: Optional[RollScorer] = None
+        self.guild: Optional[discord.Guild] = None
+        self.lock = asyncio.Lock()
+        self.first_id = 0          # first message ID of the battle
+        self.replayed_up_to = 0    # messages up to this ID came from history on start
+
+    @property
+    def enabled(self) -> bool:
+        return None not in (LIVE_ROLL_CHANNEL_ID, LIVE_ROLL_AUTHOR_ID, LIVE_LOOT_AUTHOR_ID)
+
+    @staticmethod
+    async def _add(scorer: RollScorer, guild: discord.Guild, rolls: List[Tuple[int, int, int]]) -> None:
+        # rolls: (message_id, roll, user_id)
+        loadouts = await resolve_roll_loadouts(guild, [(message_id, userid) for message_id, _, userid in rolls])
+        for (message_id, roll, userid), loadout in zip(rolls, loadouts):
+            scorer.add_roll(roll, userid, loadout, message_id)
+
+    async def start(self, guild: discord.Guild) -> None:
+        channel = guild.get_channel(LIVE_ROLL_CHANNEL_ID)
+        loot_author = guild.get_member(LIVE_LOOT_AUTHOR_ID)
+        if not isinstance(channel, discord.TextChannel) or loot_author is None:
+            print("[DEBUG] Live scoreboard: roll channel or loot bot not found")
+            return
+
+        # the previous scorer answers /score until the new one has replayed the battle; new events wait for the lock
+        async with self.lock:
+            # the stores' own indexes: loot seen by on_message counts for the next roll without a refresh
+            monolith_looted, stalkers_looted = await collect_all_loot(loot_author)
+            scorer = RollScorer(monolith_looted, stalkers_looted, track_messages=True, bucket_seconds=SCORE_BUCKET_SECONDS)
+
+            start_utc = parse_datetime(LIVE_BATTLE_START, DEFAULT_TZ) if LIVE_BATTLE_START else discord.utils.utcnow()
+            after_id, before_id = _snowflake_bounds(start_utc, discord.utils.utcnow())
+            self.first_id, self.replayed_up_to = after_id + 1, max(after_id + 1, before_id - 1)
+            async with roll_store.channel_lock(channel.id):
+                await roll_store.sync(channel, self.first_id, self.replayed_up_to)
+                for batch in roll_store.iter_messages(channel.id, self.first_id, self.replayed_up_to):
+                    await self._add(scorer, guild, [
+                        (message_id, roll, userid)
+                        for message_id, author_id, roll, userid in batch
+                        if author_id == LIVE_ROLL_AUTHOR_ID and roll is not None
+                    ])
+            self.scorer, self.guild = scorer, guild
+            print(f"[DEBUG] Live scoreboard started: {len(scorer.messages)} rolls replayed")
+
+    def _is_roll_message(self, message: discord.Message) -> bool:
+        return (
+            self.enabled
+            and message.channel.id == LIVE_ROLL_CHANNEL_ID
+            and message.author.id == LIVE_ROLL_AUTHOR_ID
+        )
+
+    async def apply_message(self, message: discord.Message) -> None:
+        if not self._is_roll_message(message):
+            return
+        parsed = match_roll_embed_message(message)
+        if parsed is None:
+            return
+        roll, userid = parsed
+        async with self.lock:
+            if self.scorer is None or message.id <= self.replayed_up_to:
+                return
+            await self._add(self.scorer, self.guild, [(message.id, roll, userid)])
+
+    async def apply_edit(self, message: discord.Message) -> None:
+        if not self._is_roll_message(message):
+            return
+        async with self.lock:
+            if self.scorer is None or message.id < self.first_id:
+                return
+            self.scorer.remove_roll(message.id)
+            parsed = match_roll_embed_message(message)
+            if parsed is None:
+                return
+            roll, userid = parsed
+            await self._add(self.scorer, self.guild, [(message.id, roll, userid)])
+
+    async def apply_delete(self, channel_id: int, message_ids: Iterable[int]) -> None:
+        if not self.enabled or channel_id != LIVE_ROLL_CHANNEL_ID:
+            return
+        async with self.lock:
+            if self.scorer is None:
+                return
+            for message_id in message_ids:
+                self.scorer.remove_roll(message_id)
+
+live_scoreboard = LiveScoreboard()
+
+@bot.listen("on_message")
+async def on_live_roll_message(message: discord.Message):
+    await live_scoreboard.apply_message(message)
+
+@bot.listen("on_raw_message_edit")
+async def on_live_roll_edit(payload: discord.RawMessageUpdateEvent):
+    await live_scoreboard.apply_edit(payload.message)
+
+@bot.listen("on_raw_message_delete")
+async def on_live_roll_delete(payload: discord.RawMessageDeleteEvent):
+    await live_scoreboard.apply_delete(payload.channel_id, [payload.message_id])
+
+@bot.listen("on_raw_bulk_message_delete")
+async def on_live_roll_bulk_delete(payload: discord.RawBulkMessageDeleteEvent):
+    await live_scoreboard.apply_delete(payload.channel_id, payload.message_ids)
+
+# --------------------------------------------------------------------------------------------------------------------
+# Offline replay of exported channel history
+# --------------------------------------------------------------------------------------------------------------------
+
+# Bytes read from an export file at a time by the streaming parser
+EXPORT_READ_CHUNK = 1 << 20
+
+# Runs of the whitespace (and commas) between the values of an export, indentation included
+_EXPORT_SKIP_RE = {skip: re.compile(f"[{re.escape(skip)}]*") for skip in (" \t\r\n", " \t\r\n,")}
+
+@dataclass(frozen=True)
+class RollEvent:
+    """
+    A roll in normalized form, independent of Discord objects.
+    """
+    message_id: int
+    timestamp: float                # UNIX seconds
+    roll: int
+    user_id: int
+    role_names: Optional[Tuple[str, ...]]   # roles of the roller, lowest position first (as in member.roles); None if unknown
+
+@dataclass(frozen=True)
+class LootEvent:
+    message_id: int
+    faction: str                    # "monolith" or "stalkers"
+    user_id: int
+    item: str                       # role naming (WRONG_LOOTED_EQUIPMENT_NAMES applied)
+
+class ScoringEngine:
+    """
+    Scores a stream of RollEvent/LootEvent without Discord: a scorer on `backend` (make_roll_scorer) fed with
+    loadouts resolved from role names. Rolls are judged against the loot seen so far, so loot goes first to score
+    like /count_rolls.
+    """
+
+    def __init__(self, backend: Optional[str] = None):
+        self.monolith_looted = LootIndex()
+        self.stalkers_looted = LootIndex()
+        self.scorer = make_roll_scorer(self.monolith_looted, self.stalkers_looted, backend)
+        self.rolls = 0
+        self.loot = 0
+        # rolls whose roller's roles were unknown, scored as STALKERS without equipment
+        self.rolls_without_roles = 0
+        self.users_without_roles: Set[int] = set()
+
+    def add_loot(self, event: LootEvent) -> None:
+        looted = self.monolith_looted if event.faction == "monolith" else self.stalkers_looted
+        looted.add(event.user_id, event.item, event.message_id)
+        self.loot += 1
+
+    def _count_missing_roles(self, event: RollEvent) -> None:
+        if event.role_names is None:
+            self.rolls_without_roles += 1
+            self.users_without_roles.add(event.user_id)
+
+    def add_roll(self, event: RollEvent) -> None:
+        self._count_missing_roles(event)
+        self.scorer.add_roll(event.roll, event.user_id, resolve_role_names(event.role_names or ()), event.message_id)
+        self.rolls += 1
+
+    def run(self, events: Iterable[Union[RollEvent, LootEvent]]) -> RollScorer:
+        for event in events:
+            if isinstance(event, RollEvent):
+                self.add_roll(event)
+            else:
+                self.add_loot(event)
+        self.scorer.flush()
+        return self.scorer
+
+    def run_export_sharded(
+        self,
+        paths: Sequence[str],
+        author_ids: Set[int],
+        workers: int,
+        after_id: Optional[int] = None,
+        before_id: Optional[int] = None,
+        roles: Optional[Tuple[Optional[str], Optional[int], Optional[str]]] = None,
+        shard_bytes: int = RECOUNT_SHARD_BYTES,
+    ) -> RollScorer:
+        """
+        run() of the rolls of roll channel exports (iter_export_roll_events), in time order, by `workers` processes:
+        the exports are split into byte ranges (split_export) that the workers parse and score themselves,
+        and the shard results are merged in order (merge_roll_shard), with the same totals, pairs and cheaters.
+        roles are the ReplayRoles arguments (role history path, guild ID, members path). All loot has to be added before.
+        """
+        backend = "numpy" if isinstance(self.scorer, ColumnarRollScorer) else "python"
+        loot = (list(self.monolith_looted.records()), list(self.stalkers_looted.records()))
+        pending: List[Future] = []
+        with ProcessPoolExecutor(workers, initializer=_init_shard_worker, initargs=(*loot, backend, roles)) as pool:
+            for path in paths:
+                for start, first_id, stop_id in split_export(path, shard_bytes):
+                    # ranges entirely outside the window (exports are in time order)
+                    if (after_id is not None and stop_id is not None and int(stop_id) <= after_id + 1) or (
+                        before_id is not None and first_id is not None and int(first_id) >= before_id
+                    ):
+                        continue
+                    pending.append(pool.submit(_score_export_shard, path, start, stop_id, author_ids, after_id, before_id))
+                    # merge as shards finish, in order; at most two shards per worker are in flight
+                    while len(pending) > 2 * workers:
+                        self._merge_shard(pending.pop(0).result())
+            for future in pending:
+                self._merge_shard(future.result())
+        self.scorer.flush()
+        return self.scorer
+
+    def _merge_shard(self, shard: RollShard) -> None:
+        self.rolls += merge_roll_shard(self.scorer, shard)
+        self.rolls_without_roles += shard.rolls_without_roles
+        self.users_without_roles.update(shard.users_without_roles)
+
+# --------------------------------------------------------------------------------------------------------------------
+# Sharded recount: shards are scored in worker processes and merged in time order
+# --------------------------------------------------------------------------------------------------------------------
+
+@dataclass
+class RollShard:
+    """
+    What a worker scored in one time shard. Everything but Weird Flower pairing is additive;
+    the shard's Weird Flower rolls are kept in order, so the merge pairs them across shard boundaries.
+    """
+    rolls: int
+    rolls_without_roles: int
+    users_without_roles: List[int]
+    monolith_total: int
+    stalkers_total: int
+    monolith_cnt: int
+    stalker_cnt: int
+    monolith_users: Dict[int, int]
+    stalker_users: Dict[int, int]
+    mon_weird_flower_rolls: int
+    sta_weird_flower_rolls: int
+    mon_weird_flower_carriers: Dict[int, int]
+    sta_weird_flower_carriers: Dict[int, int]
+    cheaters: List[Tuple[int, str]]
+    cheater_fake_equipment: Dict[int, List[str]]
+    weird_flowers: List[Tuple[int, int, str, FrozenSet[str], Optional[int]]]
+    faction_wars_24_checks: List[str]
+
+_shard_loot: Optional[Tuple[LootIndex, LootIndex]] = None
+_shard_backend = "python"
+_shard_roles: Optional[ReplayRoles] = None
+
+def _init_shard_worker(
+    monolith_records: List[LootRecord],
+    stalkers_records: List[LootRecord],
+    backend: str,
+    roles: Optional[Tuple[Optional[str], Optional[int], Optional[str]]],
+) -> None:
+    # loot goes by item name (item bits are assigned per process), with the first loot message IDs
+    global _shard_loot, _shard_backend, _shard_roles
+    _shard_loot = (LootIndex(), LootIndex())
+    for index, records in zip(_shard_loot, (monolith_records, stalkers_records)):
+        for message_id, userid, item in records:
+            index.add(userid, item, message_id)
+    _shard_backend = backend
+    _shard_roles = ReplayRoles(*roles) if roles is not None else None
+
+def _score_export_shard(
+    path: str,
+    start: int,
+    stop_id: Optional[str],
+    author_ids: Set[int],
+    after_id: Optional[int],
+    before_id: Optional[int],
+) -> RollShard:
+    # the messages from byte offset `start` (0: the whole export from the top) up to the message stop_id
+    messages = iter_export_messages(path) if start == 0 else _iter_export_messages_from(path, start)
+    if stop_id is not None:
+        messages = itertools.takewhile(lambda msg: msg.get("id") != stop_id, messages)
+    scorer = make_roll_scorer(*_shard_loot, _shard_backend, defer_weird_flowers=True)
+    rolls = rolls_without_roles = 0
+    users_without_roles: Set[int] = set()
+    with contextlib.redirect_stdout(None):  # the merge prints the checks, in order
+        for event in _roll_events_from_messages(messages, author_ids, after_id, before_id, _shard_roles):
+            if event.role_names is None:
+                rolls_without_roles += 1
+                users_without_roles.add(event.user_id)
+            scorer.add_roll(event.roll, event.user_id, resolve_role_names(event.role_names or ()), event.message_id)
+            rolls += 1
+        scorer.flush()
+    return RollShard(
+        rolls=rolls,
+        rolls_without_roles=rolls_without_roles,
+        users_without_roles=list(users_without_roles),
+        monolith_total=scorer.monolith_total,
+        stalkers_total=scorer.stalkers_total,
+        monolith_cnt=scorer.monolith_cnt,
+        stalker_cnt=scorer.stalker_cnt,
+        monolith_users=dict(scorer.monolith_users),
+        stalker_users=dict(scorer.stalker_users),
+        mon_weird_flower_rolls=scorer.mon_weird_flower_rolls,
+        sta_weird_flower_rolls=scorer.sta_weird_flower_rolls,
+        mon_weird_flower_carriers=dict(scorer.mon_weird_flower_carriers),
+        sta_weird_flower_carriers=dict(scorer.sta_weird_flower_carriers),
+        cheaters=scorer.cheaters,
+        cheater_fake_equipment=dict(scorer.cheater_fake_equipment),
+        weird_flowers=scorer.deferred_weird_flowers,
+        faction_wars_24_checks=scorer.faction_wars_24_checks,
+    )
+
+def merge_roll_shard(scorer: RollScorer, shard: RollShard) -> int:
+    """
+    Adds a shard to the scorer as if its rolls had been added one by one. Shards must be merged in time order:
+    the unpaired Weird Flower carriers of the scorer carry over into the shard's Weird Flower rolls,
+    which are paired here (WEIRD_FLOWER_PAIR_ROLL / WEIRD_BOLT_1_2_ROLL included).
+    Returns the shard's roll count.
+    """
+    scorer.monolith_total += shard.monolith_total
+    scorer.stalkers_total += shard.stalkers_total
+    scorer.monolith_cnt += shard.monolith_cnt
+    scorer.stalker_cnt += shard.stalker_cnt
+    scorer.mon_weird_flower_rolls += shard.mon_weird_flower_rolls
+    scorer.sta_weird_flower_rolls += shard.sta_weird_flower_rolls
+    for counts, shard_counts in (
+        (scorer.monolith_users, shard.monolith_users),
+        (scorer.stalker_users, shard.stalker_users),
+        (scorer.mon_weird_flower_carriers, shard.mon_weird_flower_carriers),
+        (scorer.sta_weird_flower_carriers, shard.sta_weird_flower_carriers),
+    ):
+        for userid, cnt in shard_counts.items():
+            counts[userid] += cnt
+    for userid, faction in shard.cheaters:
+        scorer._add_cheater(userid, faction, shard.cheater_fake_equipment[userid])
+    for check in shard.faction_wars_24_checks:
+        print(f"[DEBUG] {check}")
+        scorer.faction_wars_24_checks.append(check)
+    for roll, userid, faction, equipped, message_id in shard.weird_flowers:
+        scorer._add_weird_flower_roll(roll, userid, faction, equipped, message_id)
+    return shard.rolls
+
+class _ExportReader:
+    """
+    Incremental JSON reader over a text file: decodes one value at a time from a rolling buffer,
+    so only the current chunk and the value being decoded are held in memory.
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.buf = ""
+        self.pos = 0
+        self.decoder = json.JSONDecoder()
+
+    def _more(self) -> bool:
+        chunk = self.f.read(EXPORT_READ_CHUNK)
+        if not chunk:
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self, skip: str = " \t\r\n") -> Optional[str]:
+        """
+        Next character after any of `skip`, or None at the end of the file.
+        """
+        while True:
+            if self.pos < len(self.buf) and self.buf[self.pos] in skip:
+                self.pos = _EXPORT_SKIP_RE[skip].match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._more():
+                return None
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"Malformed export: expected {char!r} at {self.buf[self.pos:self.pos + 40]!r}")
+        self.pos += 1
+
+    def decode(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+                # a value ending right at the end of the buffer (a number) may continue in the next chunk
+                if end < len(self.buf) or not self._more():
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if not self._more():
+                    raise
+
+def iter_export_messages(path: str) -> Iterable[dict]:
+    """
+    Messages of an exported channel, one dict at a time in constant memory.
+    Accepts a DiscordChatExporter JSON export ({..., "messages": [...]}), whose messages array
+    is decoded item by item, or JSONL with one message per line.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        reader = _ExportReader(f)
+        if reader.peek() is None:
+            return
+        reader.expect("{")
+
+        # walk the top-level keys until the messages array; other values are small (guild, channel, ...)
+        first: dict = {}
+        while True:
+            char = reader.peek(" \t\r\n,")
+            if char is None:
+                raise ValueError(f"Malformed export {path}: unexpected end of file")
+            if char == "}":
+                reader.pos += 1
+                break
+            key = reader.decode()
+            reader.expect(":")
+            if key == "messages" and reader.peek() == "[":
+                reader.pos += 1
+                while True:
+                    char = reader.peek(" \t\r\n,")
+                    if char == "]":
+                        return
+                    if char is None:
+                        raise ValueError(f"Malformed export {path}: unexpected end of file")
+                    yield reader.decode()
+            first[key] = reader.decode()
+
+        # no messages array: the first object was a message of a JSONL export
+        yield first
+        while reader.peek() is not None:
+            yield reader.decode()
+
+def _iter_export_messages_from(path: str, offset: int) -> Iterable[dict]:
+    """
+    Messages of an export from the message starting at byte `offset` (split_export) to the end of the file.
+    """
+    with open(path, "rb") as f:
+        f.seek(offset)
+        reader = _ExportReader(TextIOWrapper(f, encoding="utf-8"))
+        while True:
+            char = reader.peek(" \t\r\n,")
+            if char is None or char == "]":
+                return
+            yield reader.decode()
+
+# Start of a message object of a DiscordChatExporter export: {"id": "<snowflake>", "type": ...
+# Every '"' inside a JSON string is escaped, so a match is always a real object, never message text
+_EXPORT_MESSAGE_START_RE = re.compile(rb'\{\s*"id"\s*:\s*"(\d+)"\s*,\s*"type"\s*:')
+# Keys every exported message has, to tell messages from other objects with an "id" and a "type"
+_EXPORT_MESSAGE_KEYS = frozenset(("id", "type", "timestamp", "author"))
+
+def split_export(path: str, shard_bytes: int) -> List[Tuple[int, Optional[str], Optional[str]]]:
+    """
+    Splits an export into ranges of about shard_bytes for parsing in parallel, in file order:
+    (byte offset of the first message, its ID, ID of the first message of the next range).
+    The first range starts at offset 0 (parsed from the top, ID None); an export without recognizable
+    message starts is one range.
+    """
+    ranges: List[Tuple[int, Optional[str], Optional[str]]] = []
+    start, first_id = 0, None
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ranges
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            decoder = json.JSONDecoder()
+            pos = shard_bytes
+            while pos < len(mm):
+                match = _EXPORT_MESSAGE_START_RE.search(mm, pos)
+                if match is None:
+                    break
+                pos = match.end()
+                try:
+                    # messages are far smaller than this; a cut-off one fails to decode and is skipped
+                    message, _ = decoder.raw_decode(mm[match.start():match.start() + (1 << 20)].decode("utf-8", "replace"))
+                except json.JSONDecodeError:
+                    continue
+                if not isinstance(message, dict) or not _EXPORT_MESSAGE_KEYS <= message.keys():
+                    continue
+                message_id = match.group(1).decode()
+                ranges.append((start, first_id, message_id))
+                start, first_id = match.start(), message_id
+                pos = start + shard_bytes
+    ranges.append((start, first_id, None))
+    return ranges
+
+def _export_author_id(msg: dict) -> Optional[int]:
+    author = msg.get("author") or {}
+    return int(author["id"]) if author.get("id") else None
+
+_role_position = operator.itemgetter("position")
+
+def _export_role_names(roles: Sequence) -> Tuple[str, ...]:
+    # exported roles as names, lowest position first: role objects with a position, or names in position order
+    if roles and isinstance(roles[0], dict):
+        try:
+            roles = sorted(roles, key=_role_position)
+        except KeyError:
+            roles = sorted(roles, key=lambda r: r.get("position", 0))
+        return tuple([r["name"] for r in roles])
+    return tuple(roles)
+
+class ReplayRoles:
+    """
+    Where a replay finds the roles of rollers that the roll message does not list: a role history file
+    (RoleHistory, the roles held at each roll) and/or a member export (the roles when it was taken),
+    JSON ([...] or {"members": [...]}) or JSONL of {"id": ..., "roles": [...]} with role objects
+    ({"name", "position"}) or role names, lowest position first.
+    """
+
+    def __init__(
+        self,
+        role_history_path: Optional[str] = None,
+        guild_id: Optional[int] = None,
+        members_path: Optional[str] = None,
+    ):
+        self.role_history: Optional[RoleHistory] = None
+        self.guild_id = guild_id
+        if role_history_path is not None:
+            if not os.path.exists(role_history_path):
+                raise ValueError(f"Role history {role_history_path} not found")
+            self.role_history = RoleHistory(role_history_path)
+            if self.guild_id is None:
+                guild_ids = self.role_history.guild_ids()
+                if len(guild_ids) != 1:
+                    raise ValueError(f"Role history {role_history_path} has {len(guild_ids)} guilds, pick one with --guild")
+                self.guild_id = guild_ids[0]
+        self.members: Dict[int, Tuple[str, ...]] = {}
+        if members_path is not None:
+            self._load_members(members_path)
+
+    def _load_members(self, path: str) -> None:
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        try:
+            members = json.loads(text)
+        except json.JSONDecodeError:
+            members = [json.loads(line) for line in text.splitlines() if line.strip()]
+        if isinstance(members, dict):
+            members = members.get("members") or []
+        interned: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+        for member in members:
+            names = _export_role_names(member.get("roles") or [])
+            self.members[int(member["id"])] = interned.setdefault(names, names)
+
+    def history(self, user_id: int, message_id: int) -> Optional[Tuple[str, ...]]:
+        if self.role_history is None:
+            return None
+        return self.role_history.role_names_at(self.guild_id, user_id, message_id)
+
+    def member(self, user_id: int) -> Optional[Tuple[str, ...]]:
+        return self.members.get(user_id)
+
+def roll_event_from_export(msg: dict, roles: Optional[ReplayRoles] = None) -> Optional[RollEvent]:
+    """
+    RollEvent of an exported roll bot message, or None if it is not a roll embed.
+    The roller's roles come from, in order: the role history of `roles` (held at the roll), the roller's entry
+    in "mentions" (DiscordChatExporter lists roles per mentioned user), the member export of `roles`.
+    role_names is None if none of them knows the roller.
+    """
+    embeds = msg.get("embeds")
+    if not embeds:
+        return None
+    embed = embeds[0]
+    parsed = match_roll_embed(embed.get("title"), embed.get("description"))
+    if parsed is None:
+        return None
+    roll, user_id = parsed
+    message_id = int(msg["id"])
+
+    role_names = roles.history(user_id, message_id) if roles is not None else None
+    if role_names is None:
+        mentions = msg.get("mentions")
+        if mentions:
+            user_id_str = str(user_id)
+            for mention in mentions:
+                if str(mention.get("id")) == user_id_str:
+                    role_names = _export_role_names(mention.get("roles") or [])
+                    break
+    if role_names is None and roles is not None:
+        role_names = roles.member(user_id)
+
+    return RollEvent(message_id, _snowflake_seconds(message_id), roll, user_id, role_names)
+
+def loot_event_from_export(msg: dict, faction: str) -> Optional[LootEvent]:
+    parser = _parse_monolith_loot_message if faction == "monolith" else _parse_stalker_loot_message
+    parsed = parser(msg.get("content") or "")
+    if parsed is None:
+        return None
+    uid, item = parsed
+    return LootEvent(int(msg["id"]), faction, uid, WRONG_LOOTED_EQUIPMENT_NAMES.get(item, item))
+
+def iter_export_roll_events(
+    path: str,
+    author_ids: Set[int],
+    after_id: Optional[int] = None,
+    before_id: Optional[int] = None,
+    roles: Optional[ReplayRoles] = None,
+) -> Iterable[RollEvent]:
+    return _roll_events_from_messages(iter_export_messages(path), author_ids, after_id, before_id, roles)
+
+def _roll_events_from_messages(
+    messages: Iterable[dict],
+    author_ids: Set[int],
+    after_id: Optional[int],
+    before_id: Optional[int],
+    roles: Optional[ReplayRoles],
+) -> Iterable[RollEvent]:
+    for msg in messages:
+        if _export_author_id(msg) not in author_ids:
+            continue
+        message_id = int(msg["id"])
+        if (after_id is not None and message_id <= after_id) or (before_id is not None and message_id >= before_id):
+            continue
+        event = roll_event_from_export(msg, roles)
+        if event is not None:
+            yield event
+
+def iter_export_loot_events(path: str, faction: str, author_ids: Set[int]) -> Iterable[LootEvent]:
+    for msg in iter_export_messages(path):
+        if _export_author_id(msg) not in author_ids:
+            continue
+        event = loot_event_from_export(msg, faction)
+        if event is not None:
+            yield event
+
+def replay_main(argv: Sequence[str]) -> None:
+    """
+    Re-scores a battle from exported history, without a token:
+      replay --rolls ROLLS.json --roll-author ID [--monolith-loot F ...] [--stalkers-loot F ...]
+             [--loot-author ID ...] [--start DT --end DT --tz TZ] [--backend python|numpy] [--workers N]
+             [--role-history FILE [--guild ID]] [--members FILE]
+    """
+    parser = argparse.ArgumentParser(prog="replay", description="Score exported roll channel history offline.")
+    parser.add_argument("--rolls", required=True, nargs="+", help="Roll channel export(s), JSON or JSONL, in time order")
+    parser.add_argument("--roll-author", required=True, nargs="+", type=int, help="Roll bot user ID(s)")
+    parser.add_argument("--monolith-loot", nargs="*", default=[], help="Monolith loot channel export(s)")
+    parser.add_argument("--stalkers-loot", nargs="*", default=[], help="STALKERS loot channel export(s)")
+    parser.add_argument("--loot-author", nargs="*", type=int, help="Loot bot user ID(s), default: the roll authors")
+    parser.add_argument("--start", help=f"Start datetime ({DATETIME_FORMAT_HINT})")
+    parser.add_argument("--end", help=f"End datetime ({DATETIME_FORMAT_HINT})")
+    parser.add_argument("--tz", default=DEFAULT_TZ, help="Timezone name (IANA)")
+    parser.add_argument("--backend", choices=SCORING_BACKENDS, default=SCORING_BACKEND, help="Scoring backend")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes scoring time shards of the rolls (1 = no sharding)")
+    parser.add_argument("--shard-bytes", type=int, default=RECOUNT_SHARD_BYTES, help="Export bytes per shard with --workers")
+    parser.add_argument("--role-history", help=f"Role history of the bot ({ROLE_HISTORY_PATH}): rollers' roles at each roll")
+    parser.add_argument("--guild", type=int, help="Guild ID in the role history (default: its only guild)")
+    parser.add_argument("--members", help="Member export (JSON or JSONL of {id, roles}) for rollers without roles in the export")
+    args = parser.parse_args(argv)
+
+    after_id = before_id = None
+    if args.start:
+        # same exclusive bounds as /count_rolls (_snowflake_bounds)
+        after_id = discord.utils.time_snowflake(parse_datetime(args.start, args.tz), high=True)
+    if args.end:
+        before_id = discord.utils.time_snowflake(parse_datetime(args.end, args.tz), high=False)
+
+    roll_authors = set(args.roll_author)
+    loot_authors = set(args.loot_author or args.roll_author)
+
+    started = time.perf_counter()
+    try:
+        engine = ScoringEngine(args.backend)
+        roles = ReplayRoles(args.role_history, args.guild, args.members) if args.role_history or args.members else None
+    except ValueError as e:
+        parser.error(str(e))
+    for path in args.monolith_loot:
+        engine.run(iter_export_loot_events(path, "monolith", loot_authors))
+    for path in args.stalkers_loot:
+        engine.run(iter_export_loot_events(path, "stalkers", loot_authors))
+    loot_done = time.perf_counter()
+    if args.workers > 1:
+        engine.run_export_sharded(
+            args.rolls,
+            roll_authors,
+            args.workers,
+            after_id,
+            before_id,
+            (args.role_history, args.guild, args.members) if roles is not None else None,
+            args.shard_bytes,
+        )
+    else:
+        for path in args.rolls:
+            engine.run(iter_export_roll_events(path, roll_authors, after_id, before_id, roles))
+    finished = time.perf_counter()
+
+    print("=== REPLAY RESULTS ===")
+    print(f"Loot messages: {engine.loot} ({loot_done - started:.2f}s)")
+    print(f"Rolls: {engine.rolls} ({finished - loot_done:.2f}s)")
+    if engine.rolls_without_roles:
+        users = sorted(engine.users_without_roles)
+        print(
+            f"WARNING: {engine.rolls_without_roles} rolls by {len(users)} users without the roller's roles "
+            f"(not in the export's mentions, --role-history or --members), scored as STALKERS without equipment: "
+            + ", ".join(map(str, users[:20])) + (f" and {len(users) - 20} more" if len(users) > 20 else "")
+        )
+    _print_scorer_summary(engine.scorer)
 
 
 # --------------------------------------------------------------------------------------------------------------------
@@ -1023,7 +4022,9 @@ async def count_rolls_in_channel(
     author="Whose messages to analyze",
     start=f"Start datetime ({DATETIME_FORMAT_HINT})",
     end=f"End datetime ({DATETIME_FORMAT_HINT})",
-    tz="Timezone name (IANA), e.g. Europe/Warsaw"
+    tz="Timezone name (IANA), e.g. Europe/Warsaw",
+    more_windows="More windows scored in the same pass: START, END[, @author ...]; separated by ';'",
+    backend="Scoring backend: python or numpy (for very large windows)",
 )
 async def count_rolls(
     interaction: discord.Interaction,
@@ -1032,6 +4033,8 @@ async def count_rolls(
     start: str,
     end: str,
     tz: Optional[str] = None,
+    more_windows: Optional[str] = None,
+    backend: Optional[str] = None,
 ):
     
     print(f"[DEBUG] Launched /count_rolls")
@@ -1060,6 +4063,20 @@ async def count_rolls(
         await interaction.response.send_message("End must be after Start.", ephemeral=True)
         return
 
+    queries = [RollQuery(start_utc, end_utc, [author], f"{start} → {end}")]
+    if more_windows:
+        try:
+            queries += await parse_roll_queries(more_windows, tz_name, interaction.guild, author)
+        except ValueError as e:
+            await interaction.response.send_message(str(e), ephemeral=True)
+            return
+
+    try:
+        check_scoring_backend(backend)
+    except ValueError as e:
+        await interaction.response.send_message(str(e), ephemeral=True)
+        return
+
     # Permissions check for the target channel
     me = interaction.guild.me or interaction.guild.get_member(bot.user.id)
     if me is None:
@@ -1083,50 +4100,59 @@ async def count_rolls(
     await interaction.response.defer(ephemeral=True, thinking=True)
 
     # Call business logic
-    monolith_total, stalkers_total, cheaters, cheater_fake_map, weird_flower_pairs = await count_rolls_in_channel(
+    throttled_before = history_pacer.throttled_seconds
+    results = await count_rolls_multi(
         guild=interaction.guild,
         channel=channel,
-        author=author,
+        queries=queries,
         interaction=interaction,
-        start_utc=start_utc,
-        end_utc=end_utc,
+        backend=backend,
     )
 
     # Respond in Discord (still ephemeral; you can change if you want it public)
     lines = [
         f"- Channel: {channel.mention}",
-        f"- Author: {author.mention}",
-        f"- Range (local {tz_name}): {start} → {end}",
-        "",
-        f"**Monolith total score:** {monolith_total} x {MONOLITH_MULTIPLIER} = {monolith_total * MONOLITH_MULTIPLIER}",
-        f"**STALKERS total score:** {stalkers_total}",
-        "",
-        f"**Cheaters:** {len(cheaters)}",
-        f"**Weird Flower Pairs:** {len(weird_flower_pairs)}",
+        f"- Range (local {tz_name}): {start} → {end}" if len(results) == 1 else f"- Windows (local {tz_name}): {len(results)}",
     ]
+    for result in results:
+        scorer = result.scorer
+        monolith_total, stalkers_total = scorer.monolith_score, scorer.stalkers_score
+        if len(results) > 1:
+            lines += ["", f"__{result.query.label}__"]
+        lines += [
+            f"- Author: {', '.join(a.mention for a in result.query.authors)}",
+            f"**Monolith total score:** {monolith_total} x {MONOLITH_MULTIPLIER} = {monolith_total * MONOLITH_MULTIPLIER}",
+            f"**STALKERS total score:** {stalkers_total}",
+            f"**Cheaters:** {len(scorer.cheaters)}, **Weird Flower Pairs:** {len(scorer.weird_flower_pairs)}",
+        ]
+    lines.append(f"-# Throttled by rate limits: {history_pacer.throttled_seconds - throttled_before:.1f}s")
+
     file_lines = []
-    if cheaters:
-        # cap output so it doesn't get too long
-        for uid, faction in cheaters[:50]:
-            fake = cheater_fake_map.get(uid, [])
-            fake_str = ", ".join(fake) if fake else "(no items listed)"
-            file_lines.append(f"- `{uid}`({faction}): {fake_str}")
-        if len(cheaters) > 20:
-            file_lines.append(f"...and {len(cheaters) - 20} more.")
-    
-    file_lines.append(f"\n**Weird Flower Pairs:** {len(weird_flower_pairs)}")
-    if weird_flower_pairs:
-        for pair_line in weird_flower_pairs:
-            file_lines.append(pair_line)
-    
-    global global_faction_wars_24_checks
-    global_faction_wars_24_checks.sort()
-    if global_faction_wars_24_checks:
-        file_lines.append("\n **Here is the list of users with possible Faction Wars 24 equipment**, that should be validated manually in case it may change the result of the battle. The equipment bonuses are already added to the score, subtract the bonus if the equipment is confirmed to be from 2024 event (no reaction on armor-role-selection message). If the equipment is present, please check it for cheating as well (you can use /is_cheater author:@Wolf user:<userid>)")
-        for check_line in global_faction_wars_24_checks:
-            file_lines.append(check_line)
-    global_faction_wars_24_checks = []
-    
+    for result in results:
+        cheaters, cheater_fake_map = result.scorer.cheaters, result.scorer.cheater_fake_equipment
+        weird_flower_pairs = result.scorer.weird_flower_pairs
+        if len(results) > 1:
+            file_lines.append(f"\n__{result.query.label}__")
+        if cheaters:
+            # cap output so it doesn't get too long
+            for uid, faction in cheaters[:50]:
+                fake = cheater_fake_map.get(uid, [])
+                fake_str = ", ".join(fake) if fake else "(no items listed)"
+                file_lines.append(f"- `{uid}`({faction}): {fake_str}")
+            if len(cheaters) > 20:
+                file_lines.append(f"...and {len(cheaters) - 20} more.")
+
+        file_lines.append(f"\n**Weird Flower Pairs:** {len(weird_flower_pairs)}")
+        if weird_flower_pairs:
+            for pair_line in weird_flower_pairs:
+                file_lines.append(pair_line)
+
+        faction_wars_24_checks = sorted(result.scorer.faction_wars_24_checks)
+        if faction_wars_24_checks:
+            file_lines.append("\n **Here is the list of users with possible Faction Wars 24 equipment**, that could not be validated from the reactions on the armor-role-selection message and should be validated manually in case it may change the result of the battle. The equipment bonuses are already added to the score, subtract the bonus if the equipment is confirmed to be from 2024 event (no reaction on armor-role-selection message). If the equipment is present, please check it for cheating as well (you can use /is_cheater author:@Wolf user:<userid>)")
+            for check_line in faction_wars_24_checks:
+                file_lines.append(check_line)
+
     # write file_lines to a txt file (overwrite each run)
     safe_channel_name = "".join(c if c.isalnum() or c in ("-", "_") else "_" for c in channel.name)
     out_path = f"info_{safe_channel_name}.txt"
@@ -1169,42 +4195,17 @@ async def is_cheater_cmd(
     await interaction.response.defer(ephemeral=True, thinking=True)
 
     # Build looted dicts (cached on disk by your existing flow)
-    monolith_looted: Dict[int, Set[str]] = await collect_monolith_loot(author)
-    stalkers_looted: Dict[int, Set[str]] = await collect_stalkers_loot(author)
-    merged_looted = _merge_dicts(monolith_looted, stalkers_looted)
-
-    roles = [r.name.strip() for r in user.roles if r != interaction.guild.default_role]
-    faction = get_faction(roles)
-
-    # Same faction logic as in count_rolls_in_channel
-    if faction in MONOLITH_FACTIONS:
-        faction_equipment_list = set(MONOLITH_ALL_EQUIPMENT)
-        faction_looted_dict = monolith_looted
-        if faction in TRANSITIONED_FACTIONS:
-            faction_equipment_list |= STALKERS_ALL_EQUIPMENT
-            faction_looted_dict = merged_looted
-    else:
-        faction_equipment_list = STALKERS_ALL_EQUIPMENT
-        faction_looted_dict = stalkers_looted
+    monolith_looted, stalkers_looted = await collect_all_loot(author)
+    merged_looted = MergedLoot(monolith_looted, stalkers_looted)
 
-    equipped = get_equipped_equipment(roles, faction_equipment_list)
+    loadout = role_index.resolve(r.id for r in user.roles)
+    faction = loadout.faction
 
-    # Preserve global list from being polluted by this command
-    saved_fw24 = list(global_faction_wars_24_checks)
-    try:
-        equipped = filter_redundant_armor(
-            equipped=equipped,
-            roles=roles,
-            userid=user.id,
-            roll=0,  # not applicable here; only used in debug strings
-            faction=faction,
-            equipmentDictionary=faction_looted_dict,
-        )
-    finally:
-        global_faction_wars_24_checks.clear()
-        global_faction_wars_24_checks.extend(saved_fw24)
+    # Same faction logic as in count_rolls_in_channel (the FactionWars24 check is only logged by scans)
+    context = FactionContext(faction, monolith_looted, stalkers_looted, merged_looted)
+    equipped, _ = _filter_redundant_armor(context.equipped(loadout), loadout.faction_wars_24, user.id, faction)
 
-    cheating, fake_list = is_cheating(equipped, user.id, faction_looted_dict)
+    cheating, fake_list = is_cheating(equipped, user.id, context.looted)
 
     equipped_str = ", ".join(sorted(equipped)) if equipped else "(none)"
     if cheating:
@@ -1227,7 +4228,90 @@ async def is_cheater_cmd(
     await interaction.edit_original_response(content=msg)
 
 
-def main():
+@bot.tree.command(
+    name="score",
+    description="Current totals of the live scoreboard, optionally for a time range only."
+)
+@app_commands.describe(
+    start=f"Start datetime ({DATETIME_FORMAT_HINT}), default: start of the battle",
+    end=f"End datetime ({DATETIME_FORMAT_HINT}), default: now",
+    tz="Timezone name (IANA), e.g. Europe/Warsaw"
+)
+async def score_cmd(
+    interaction: discord.Interaction,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    tz: Optional[str] = None,
+):
+    """
+    With start/end, the totals come from the scoreboard's time buckets, no rescan.
+    Weird Flower rolls count in the range of their own message, with their current (paired or pending) points.
+    """
+    print(f"[DEBUG] Executed /score")
+
+    if interaction.guild is None:
+        await interaction.response.send_message("This command only works in a server (not in DMs).", ephemeral=True)
+        return
+
+    if not has_scan_permission(interaction):
+        await interaction.response.send_message(
+            "You don't have permission to run this (need Manage Messages, Admin, or be the bot owner).",
+            ephemeral=True
+        )
+        return
+
+    scorer = live_scoreboard.scorer
+    if scorer is None:
+        await interaction.response.send_message(
+            "Live scoreboard is not running (configure LIVE_ROLL_CHANNEL_ID, LIVE_ROLL_AUTHOR_ID and LIVE_LOOT_AUTHOR_ID).",
+            ephemeral=True
+        )
+        return
+
+    if start is not None or end is not None:
+        tz_name = tz or DEFAULT_TZ
+        try:
+            start_ts = parse_datetime(start, tz_name).timestamp() if start else 0.0
+            end_ts = parse_datetime(end, tz_name).timestamp() if end else time.time() + SCORE_BUCKET_SECONDS
+        except ValueError as e:
+            await interaction.response.send_message(str(e), ephemeral=True)
+            return
+        if end_ts <= start_ts:
+            await interaction.response.send_message("End must be after Start.", ephemeral=True)
+            return
+
+        monolith, stalkers = scorer.buckets.query(start_ts, end_ts)
+        lines = [
+            f"- Channel: <#{LIVE_ROLL_CHANNEL_ID}>",
+            f"- Range: `{start or 'battle start'}` → `{end or 'now'}` ({tz_name})",
+            f"- Rolls: Monolith {monolith.rolls} by {monolith.users} users, STALKERS {stalkers.rolls} by {stalkers.users} users",
+            f"- Weird Flower carriers: Monolith {monolith.weird_flower_carriers}, STALKERS {stalkers.weird_flower_carriers}",
+            "",
+            f"**Monolith score:** {monolith.base} + {monolith.bonus} bonus = {monolith.score} x {MONOLITH_MULTIPLIER} = {monolith.score * MONOLITH_MULTIPLIER}",
+            f"**STALKERS score:** {stalkers.base} + {stalkers.bonus} bonus = {stalkers.score}",
+        ]
+        await interaction.response.send_message("\n".join(lines), ephemeral=True)
+        return
+
+    monolith_total = scorer.monolith_score
+    lines = [
+        f"- Channel: <#{LIVE_ROLL_CHANNEL_ID}>",
+        f"- Rolls: Monolith {scorer.monolith_cnt}, STALKERS {scorer.stalker_cnt}",
+        "",
+        f"**Monolith total score:** {monolith_total} x {MONOLITH_MULTIPLIER} = {monolith_total * MONOLITH_MULTIPLIER}",
+        f"**STALKERS total score:** {scorer.stalkers_score}",
+        "",
+        f"**Cheaters:** {len(scorer.cheaters)}",
+        f"**Weird Flower Pairs:** {len(scorer.weird_flower_pairs)}",
+    ]
+    await interaction.response.send_message("\n".join(lines), ephemeral=True)
+
+def main(argv: Optional[Sequence[str]] = None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "replay":
+        replay_main(argv[1:])
+        return
+
     token = os.getenv("DISCORD_BOT_TOKEN")
     if not token:
         token = DISCORD_BOT_TOKEN
@@ -0,0 +1,86 @@
+"""
+The "numpy" scoring backend (ColumnarRollScorer) must score exactly like the Python backend (RollScorer):
+same totals, counts, Weird Flower pairs, cheaters and checks, across batch boundaries and with loot
+arriving between rolls.
+
+    python -m pytest tests
+"""
+
+import os
+import sys
+import random
+import contextlib
+import io
+
+import pytest
+
+pytest.importorskip("numpy")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import discord
+import benchmark
+import monolith_uprising_counter_bot as bot
+
+ROLLS = 20_000
+SEEDS = [1, 2, 3]
+START_MS = 1_767_225_600_000    # 2026-01-01
+
+def events(seed):
+    workload = benchmark.Workload(ROLLS, seed)
+    rng = random.Random(seed)
+    out = []
+    for i, (roll, member) in enumerate(workload.rolls(ROLLS)):
+        message_id = (START_MS + i * 100 - discord.utils.DISCORD_EPOCH) << 22
+        if rng.random() < 0.02:
+            # loot between rolls: resolutions of the looter are stale from here on
+            looter = rng.choice(workload.members)
+            faction = "monolith" if looter.faction in bot.MONOLITH_FACTIONS else "stalkers"
+            out.append(bot.LootEvent(message_id - 1, faction, looter.user_id, rng.choice(looter.items)))
+        role_names = tuple(member.role_names) if rng.random() < 0.98 else None
+        # rolls of a few values, so Weird Flower carriers pair up
+        if "Weird Flower" in member.items:
+            roll = rng.choice([1, 2, 50, 100])
+        out.append(bot.RollEvent(message_id, (START_MS + i * 100) / 1000, roll, member.user_id, role_names))
+    return workload, out
+
+def results(engine, scorer):
+    return {
+        "rolls": engine.rolls,
+        "rolls_without_roles": engine.rolls_without_roles,
+        "monolith_total": scorer.monolith_total,
+        "stalkers_total": scorer.stalkers_total,
+        "monolith_score": scorer.monolith_score,
+        "stalkers_score": scorer.stalkers_score,
+        "monolith_cnt": scorer.monolith_cnt,
+        "stalker_cnt": scorer.stalker_cnt,
+        "monolith_users": dict(scorer.monolith_users),
+        "stalker_users": dict(scorer.stalker_users),
+        "pairs": (scorer.monolith_pairs, scorer.stalker_pairs, scorer.split_pairs),
+        "weird_flower_pairs": scorer.weird_flower_pairs,
+        "weird_flower_carriers": scorer.weird_flower_carriers,
+        "weird_flower_rolls": (scorer.mon_weird_flower_rolls, scorer.sta_weird_flower_rolls),
+        "mon_weird_flower_carriers": dict(scorer.mon_weird_flower_carriers),
+        "sta_weird_flower_carriers": dict(scorer.sta_weird_flower_carriers),
+        "cheaters": scorer.cheaters,
+        "cheater_fake_equipment": dict(scorer.cheater_fake_equipment),
+        "faction_wars_24_checks": scorer.faction_wars_24_checks,
+    }
+
+def score(workload, stream, backend):
+    engine = bot.ScoringEngine(backend)
+    for looted, other in ((engine.monolith_looted, workload.monolith_looted), (engine.stalkers_looted, workload.stalkers_looted)):
+        for message_id, userid, item in other.records():
+            looted.add(userid, item, message_id)
+    with contextlib.redirect_stdout(io.StringIO()):
+        scorer = engine.run(stream)
+    return results(engine, scorer)
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("batch_rolls", [7, 1000, bot.COLUMNAR_BATCH_ROLLS])
+def test_columnar_matches_python(monkeypatch, seed, batch_rolls):
+    monkeypatch.setattr(bot, "COLUMNAR_BATCH_ROLLS", batch_rolls)
+    workload, stream = events(seed)
+    python = score(workload, stream, "python")
+    assert python["weird_flower_pairs"] and python["cheaters"] and python["faction_wars_24_checks"]
+    assert score(workload, stream, "numpy") == python
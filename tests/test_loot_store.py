@@ -0,0 +1,99 @@
+"""
+LootStore: journal replay with corrupt lines, compaction, and the import of loot caches of earlier versions.
+
+    python -m pytest tests
+"""
+
+import os
+import sys
+import json
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import discord
+import monolith_uprising_counter_bot as bot
+
+GUILD_ID, AUTHOR_ID = 1, 2
+
+@pytest.fixture(autouse=True)
+def in_tmp_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+def test_corrupt_journal_lines_are_skipped():
+    store = bot.LootStore(GUILD_ID, AUTHOR_ID, "stalkers")
+    store.append([(10, 100, "AKM-74U")], {5: 10})
+    with open(store.journal_path, "ab") as f:
+        f.write(b"L\t11\t101\t\xff\xfe\n")      # not UTF-8
+        f.write(b"L\tx\t101\tAKM-74U\n")
+        f.write(b"L\t12\t102\tGP3a\n")
+        f.write(b"C\t5\t12")                    # torn append
+
+    reloaded = bot.LootStore(GUILD_ID, AUTHOR_ID, "stalkers")
+    assert sorted(reloaded.loot.records()) == [(10, 100, "AKM-74U"), (12, 102, "GP3a")]
+    assert reloaded.cursors == {5: 10}
+
+def test_compaction_keeps_the_state():
+    store = bot.LootStore(GUILD_ID, AUTHOR_ID, "monolith")
+    store.append([(10, 100, "Exoskeleton"), (11, 101, "Weird Flower")], {7: 11})
+
+    async def compact():
+        async with store.lock:
+            await asyncio.to_thread(store.compact)
+    asyncio.run(compact())
+
+    assert os.path.getsize(store.journal_path) == 0
+    reloaded = bot.LootStore(GUILD_ID, AUTHOR_ID, "monolith")
+    assert sorted(reloaded.loot.records()) == sorted(store.loot.records())
+    assert reloaded.cursors == store.cursors
+
+def test_legacy_cache_is_imported_once():
+    with open(f"{GUILD_ID}_stalkers_1700000000.json", "w", encoding="utf-8") as f:
+        json.dump({"100": ["AKM-74U", "GP3a"], "101": []}, f)
+    with open(f"{GUILD_ID}_stalkers_1600000000.json", "w", encoding="utf-8") as f:
+        json.dump({"999": ["SVU"]}, f)
+
+    store = bot.LootStore(GUILD_ID, AUTHOR_ID, "stalkers")
+    # no message IDs in the cache: looted before any roll
+    assert sorted(store.loot.records()) == [(0, 100, "AKM-74U"), (0, 100, "GP3a")]
+    cutoff_id = discord.utils.time_snowflake(datetime.fromtimestamp(1700000000 - 60, tz=timezone.utc))
+    assert store.cursors == {channel_id: cutoff_id for channel_id in bot.STALKER_LOOT_CHANNELS}
+    assert os.path.exists(f"{GUILD_ID}_stalkers_1700000000.json.imported")
+
+    # the other faction has no cache; a restart loads the store without importing again
+    assert not bot.LootStore(GUILD_ID, AUTHOR_ID, "monolith").cursors
+    os.replace(f"{GUILD_ID}_stalkers_1700000000.json.imported", f"{GUILD_ID}_stalkers_1700000000.json")
+    reloaded = bot.LootStore(GUILD_ID, AUTHOR_ID, "stalkers")
+    assert sorted(reloaded.loot.records()) == sorted(store.loot.records())
+    assert os.path.exists(f"{GUILD_ID}_stalkers_1700000000.json")
+
+def test_edited_loot_replaces_the_message_record():
+    store = bot.LootStore(GUILD_ID, AUTHOR_ID, "stalkers")
+    store.append([(10, 100, "AKM-74U"), (20, 100, "AKM-74U"), (30, 101, "GP3a")], {5: 30})
+    assert store.loot.owned_at(100, 15)[0] == bot.items_mask({"AKM-74U"})
+
+    # the earliest loot of the item becomes another item: the next loot message of the item takes its place
+    store.replace(10, [(10, 100, "SVU")])
+    assert store.loot.first(100, "AKM-74U") == 20
+    assert store.loot.first(100, "SVU") == 10
+    assert store.loot.owned_at(100, 15)[0] == bot.items_mask({"SVU"})
+    # a failed foray: the only loot of the item is gone
+    store.replace(30, [])
+    assert store.loot.items(101) == set()
+    # unchanged edits and edits of messages that were never loot write nothing
+    records = store.journal_records
+    store.replace(20, [(20, 100, "AKM-74U")])
+    store.replace(40, [])
+    assert store.journal_records == records
+
+    expected = sorted(store.loot.records())
+    assert sorted(bot.LootStore(GUILD_ID, AUTHOR_ID, "stalkers").loot.records()) == expected
+    store.compact()
+    reloaded = bot.LootStore(GUILD_ID, AUTHOR_ID, "stalkers")
+    assert sorted(reloaded.loot.records()) == expected
+    # later loot messages survive the compaction, so an edit after it still finds them
+    reloaded.replace(20, [])
+    assert reloaded.loot.items(100) == {"SVU"}
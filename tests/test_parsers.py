@@ -0,0 +1,82 @@
+"""
+The single-pass parsers of the counter bot must agree with the regex-based reference parsers
+(benchmark.PARSER_PAIRS) on every input: edge cases, generated battle messages, and random
+mutations and embed descriptions.
+
+    python -m pytest tests
+"""
+
+import os
+import sys
+import random
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import benchmark
+
+# Generated messages of each format (half of them mutated) per seed
+GENERATED_MESSAGES = 2_000
+SEEDS = [1, 2, 3]
+# Random roll embeds per seed
+RANDOM_EMBEDS = 5_000
+
+def assert_same(kind, args):
+    fast, reference = benchmark.PARSER_PAIRS[kind]
+    assert fast(*args) == reference(*args), f"{kind}{args!r}"
+
+@pytest.mark.parametrize("kind,args", benchmark.PARSER_EDGE_CASES)
+def test_edge_cases(kind, args):
+    assert_same(kind, args)
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_generated_messages(seed):
+    workload = benchmark.Workload(GENERATED_MESSAGES * 50, seed)
+    checked, mismatches = benchmark.check_parsers(benchmark.generated_parser_corpus(workload, GENERATED_MESSAGES))
+    assert checked == len(benchmark.PARSER_EDGE_CASES) + 3 * GENERATED_MESSAGES
+    assert not mismatches, "\n".join(mismatches[:20])
+
+_TITLE_PARTS = ["", " ", "\t", "\n", "\u00a0", "\u200b", "+", "-", "_", "0", "7", "42", "100", "\u0663", "\u00b2", "x", "."]
+_DESCRIPTION_PARTS = [
+    "", " ", "\n", "rolled", "rolled the dice", "by", "<@", "<@!", "<@&", "<#", ">", "@", "!", "<", "0", "12",
+    "123456789012345", "12345678901234567890123456", "\u0663\u0663\u0663", "`", "*", "||", "🎲",
+]
+
+# Characters of integer literals and their near misses
+_TITLE_CHARS = "0123__+- \t\u00a0\u0663x"
+
+def _random_literal(rng):
+    # [ws][sign]digits[_digits...][ws], sometimes broken by one stray character
+    groups = ["".join(rng.choice("0123456789") for _ in range(rng.randint(0, 3))) for _ in range(rng.randint(1, 4))]
+    literal = rng.choice(["", "+", "-"]) + rng.choice(["_", "__"] if rng.random() < 0.1 else ["_"]).join(groups)
+    if rng.random() < 0.2:
+        i = rng.randrange(len(literal) + 1)
+        literal = literal[:i] + rng.choice(_TITLE_CHARS) + literal[i:]
+    return rng.choice(["", " ", "\t"]) + literal + rng.choice(["", " ", "\n"])
+
+def _random_title(rng):
+    r = rng.random()
+    if r < 0.3:
+        return _random_literal(rng)
+    if r < 0.6:
+        return "".join(rng.choice(_TITLE_CHARS) for _ in range(rng.randint(0, 8)))
+    return "".join(rng.choice(_TITLE_PARTS) for _ in range(rng.randint(0, 5)))
+
+def _random_mention(rng):
+    user_id = str(rng.randrange(10 ** rng.randint(13, 26)))
+    return rng.choice(["<@", "<@!", "<@&", "<@ ", "<@!!"]) + user_id + rng.choice([">", ">>", "", " >"])
+
+def _random_description(rng):
+    parts = []
+    for _ in range(rng.randint(0, 6)):
+        parts.append(_random_mention(rng) if rng.random() < 0.35 else rng.choice(_DESCRIPTION_PARTS))
+    return rng.choice([" ", "", "\n"]).join(parts)
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_random_roll_embeds(seed):
+    rng = random.Random(seed)
+    for _ in range(RANDOM_EMBEDS):
+        title = rng.choice([None, _random_title(rng), str(rng.randint(-5, 105))])
+        description = rng.choice([None, _random_description(rng)])
+        assert_same("roll_embed", (title, description))
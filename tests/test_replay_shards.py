@@ -0,0 +1,131 @@
+"""
+A sharded replay (ScoringEngine.run_export_sharded: split_export, _score_export_shard, merge_roll_shard)
+must score an export exactly like the sequential replay: totals, Weird Flower pairs, cheaters and checks,
+for JSON and JSONL exports, with and without a message window, with shards of a few messages.
+
+    python -m pytest tests
+"""
+
+import os
+import sys
+import json
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import discord
+import monolith_uprising_counter_bot as bot
+
+ROLL_AUTHOR_ID = 111111111111111111
+OTHER_AUTHOR_ID = 333333333333333333
+USERS = range(300000000000000000, 300000000000000040)
+MESSAGES = 600
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+def export_messages(rng):
+    mon_items, sta_items = sorted(bot.MONOLITH_ALL_EQUIPMENT), sorted(bot.STALKERS_ALL_EQUIPMENT)
+    factions = {u: rng.choice(["Monolith", "Noon", "Loner", "Duty", "Freedom"]) for u in USERS}
+    gear = {
+        u: rng.sample(mon_items if factions[u] in bot.MONOLITH_FACTIONS else sta_items, 3)
+        + (["Weird Flower"] if rng.random() < 0.4 else [])
+        for u in USERS
+    }
+    loot = []
+    for u in USERS:
+        # the last item is not looted by some users (cheaters)
+        for item in gear[u][:len(gear[u]) - (rng.random() < 0.3)]:
+            faction = "monolith" if factions[u] in bot.MONOLITH_FACTIONS else "stalkers"
+            loot.append(bot.LootEvent(len(loot) + 1, faction, u, item))
+
+    messages = []
+    for i in range(MESSAGES):
+        ts = START + timedelta(seconds=i)
+        msg = {
+            "id": str(discord.utils.time_snowflake(ts) + i),
+            "type": "Default",
+            "timestamp": ts.isoformat(),
+            "author": {"id": str(ROLL_AUTHOR_ID), "name": "bot"},
+            "content": "",
+            # an object with an "id" and a "type" that is not a message
+            "attachments": [{"id": str(i + 1), "type": "image"}] if i % 7 == 0 else [],
+            "embeds": [],
+            "mentions": [],
+        }
+        if i % 11 == 0:
+            msg["author"] = {"id": str(OTHER_AUTHOR_ID), "name": "someone"}
+            msg["content"] = '{"id": "1", "type": "Default"} is not a roll'
+        else:
+            u = rng.choice(USERS)
+            # few roll values, so Weird Flower rolls pair across shards
+            roll = rng.choice([1, 2, 13, 42, 77, 100]) if "Weird Flower" in gear[u] else rng.randint(1, 100)
+            msg["embeds"] = [{"title": str(roll), "description": f"<@{u}> rolled"}]
+            if i % 13:
+                roles = [factions[u]] + gear[u]
+                msg["mentions"] = [{"id": str(u), "name": "x", "roles": [
+                    {"id": str(j), "name": name, "position": j} for j, name in enumerate(roles)
+                ]}]
+        messages.append(msg)
+    return loot, messages
+
+def write_export(tmp_path, messages, kind):
+    path = tmp_path / f"rolls.{kind}"
+    with open(path, "w") as f:
+        if kind == "jsonl":
+            for msg in messages:
+                f.write(json.dumps(msg) + "\n")
+        else:
+            json.dump({"guild": {"id": "1", "name": "guild"}, "channel": {"id": "2", "name": "rolls"},
+                       "messages": messages, "messageCount": len(messages)}, f, indent=2)
+    return str(path)
+
+def results(engine, scorer):
+    return {
+        "rolls": engine.rolls,
+        "rolls_without_roles": engine.rolls_without_roles,
+        "users_without_roles": engine.users_without_roles,
+        "monolith_score": scorer.monolith_score,
+        "stalkers_score": scorer.stalkers_score,
+        "monolith_cnt": scorer.monolith_cnt,
+        "stalker_cnt": scorer.stalker_cnt,
+        "monolith_users": dict(scorer.monolith_users),
+        "stalker_users": dict(scorer.stalker_users),
+        "pairs": (scorer.monolith_pairs, scorer.stalker_pairs, scorer.split_pairs),
+        "weird_flower_pairs": scorer.weird_flower_pairs,
+        "weird_flower_carriers": scorer.weird_flower_carriers,
+        "weird_flower_rolls": (scorer.mon_weird_flower_rolls, scorer.sta_weird_flower_rolls),
+        "cheaters": scorer.cheaters,
+        "cheater_fake_equipment": dict(scorer.cheater_fake_equipment),
+        "faction_wars_24_checks": scorer.faction_wars_24_checks,
+    }
+
+def replay(loot, path, window, workers=None, shard_bytes=None):
+    engine = bot.ScoringEngine("python")
+    for event in loot:
+        engine.add_loot(event)
+    if workers is None:
+        scorer = engine.run(bot.iter_export_roll_events(path, {ROLL_AUTHOR_ID}, *window))
+    else:
+        scorer = engine.run_export_sharded([path], {ROLL_AUTHOR_ID}, workers, *window, shard_bytes=shard_bytes)
+    return results(engine, scorer)
+
+@pytest.mark.parametrize("kind", ["json", "jsonl"])
+@pytest.mark.parametrize("windowed", [False, True])
+def test_sharded_replay_matches_sequential(tmp_path, capsys, kind, windowed):
+    loot, messages = export_messages(random.Random(1))
+    path = write_export(tmp_path, messages, kind)
+    # a window that starts and ends inside shards
+    window = (int(messages[MESSAGES // 4]["id"]) + 1, int(messages[3 * MESSAGES // 4]["id"]) - 1) if windowed else (None, None)
+
+    sequential = replay(loot, path, window)
+    assert sequential["weird_flower_pairs"] and sequential["cheaters"] and sequential["rolls_without_roles"]
+    for shard_bytes in (1, 3000, 1 << 30):
+        ranges = bot.split_export(path, shard_bytes)
+        # each range ends where the next one starts
+        assert [first_id for _, first_id, _ in ranges[1:]] == [stop_id for _, _, stop_id in ranges[:-1]]
+        if shard_bytes < 1 << 30:
+            assert len(ranges) > 10
+        assert replay(loot, path, window, workers=2, shard_bytes=shard_bytes) == sequential, shard_bytes
+    capsys.readouterr()
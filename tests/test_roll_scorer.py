@@ -0,0 +1,112 @@
+"""
+A RollScorer kept current through added, deleted and edited rolls (as the live scoreboard does) must end up
+with every counter of a fresh RollScorer run on the remaining rolls.
+
+    python -m pytest tests
+"""
+
+import os
+import sys
+import random
+import contextlib
+import io
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import discord
+import monolith_uprising_counter_bot as bot
+
+SEEDS = range(1, 41)
+USERS = range(1, 13)
+STEPS = 150
+# loot and roll messages, one a minute
+MESSAGE_IDS = [(1_700_000_000_000 + i * 60_000 - discord.utils.DISCORD_EPOCH) << 22 for i in range(200)]
+
+ITEMS = sorted(bot.MONOLITH_ALL_EQUIPMENT | bot.STALKERS_ALL_EQUIPMENT)
+
+def random_loadout(rng):
+    items = set(rng.sample(ITEMS, rng.randint(0, 5)))
+    if rng.random() < 0.7:
+        items.add("Weird Flower")
+    if rng.random() < 0.3:
+        items.add("Weird Bolt")
+    if rng.random() < 0.3:
+        items.add(rng.choice(sorted(bot.FACTION_WARS_24_STALKER_ARMOR | bot.FACTION_WARS_24_MONOLITH_ARMOR)))
+    return bot.RoleLoadout(rng.choice(["Monolith", "Noon", "STALKERS"]), frozenset(items), rng.random() < 0.3)
+
+def random_loot(rng, loadouts):
+    # most of each user's equipment is looted, some of it only after some of their rolls
+    looted = bot.LootIndex(), bot.LootIndex()
+    for userid, loadout in loadouts.items():
+        for item in loadout.items:
+            if rng.random() < 0.95:
+                rng.choice(looted).add(userid, item, rng.choice(MESSAGE_IDS[:40]))
+    return looted
+
+def counters(scorer):
+    return {
+        "monolith_score": scorer.monolith_score,
+        "stalkers_score": scorer.stalkers_score,
+        "monolith_total": scorer.monolith_total,
+        "stalkers_total": scorer.stalkers_total,
+        "monolith_cnt": scorer.monolith_cnt,
+        "stalker_cnt": scorer.stalker_cnt,
+        "monolith_users": {u: n for u, n in scorer.monolith_users.items() if n},
+        "stalker_users": {u: n for u, n in scorer.stalker_users.items() if n},
+        "monolith_pairs": scorer.monolith_pairs,
+        "stalker_pairs": scorer.stalker_pairs,
+        "split_pairs": scorer.split_pairs,
+        "weird_flower_pairs": sorted(scorer.weird_flower_pairs),
+        "weird_flower_carriers": scorer.weird_flower_carriers,
+        "mon_weird_flower_rolls": scorer.mon_weird_flower_rolls,
+        "sta_weird_flower_rolls": scorer.sta_weird_flower_rolls,
+        "mon_weird_flower_carriers": {u: n for u, n in scorer.mon_weird_flower_carriers.items() if n},
+        "sta_weird_flower_carriers": {u: n for u, n in scorer.sta_weird_flower_carriers.items() if n},
+        "cheaters": scorer.cheaters,
+        "cheater_fake_equipment": {u: fake for u, fake in scorer.cheater_fake_equipment.items() if fake},
+        "faction_wars_24_checks": sorted(scorer.faction_wars_24_checks),
+        "messages": scorer.messages.keys(),
+        "buckets": scorer.buckets.query(0, 1e12),
+    }
+
+def random_roll(rng):
+    return rng.choice([1, 2, 7, 50, 50, 60, 99, 100]), rng.choice(USERS)
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_live_edits_match_a_rescan(seed):
+    rng = random.Random(seed)
+    loadouts = {userid: random_loadout(rng) for userid in USERS}
+    looted = random_loot(rng, loadouts)
+    live = bot.RollScorer(*looted, track_messages=True, bucket_seconds=3600)
+    rolls = {}      # message ID -> (roll, user ID) of the rolls left
+    unused = list(MESSAGE_IDS)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(STEPS):
+            op = rng.random()
+            if unused and op < 0.6:
+                # new roll (apply_message)
+                message_id = unused.pop(0)
+                rolls[message_id] = random_roll(rng)
+                live.add_roll(rolls[message_id][0], rolls[message_id][1], loadouts[rolls[message_id][1]], message_id)
+            elif rolls and op < 0.8:
+                # deleted roll (apply_delete)
+                message_id = rng.choice(list(rolls))
+                del rolls[message_id]
+                assert live.remove_roll(message_id)
+            elif rolls:
+                # edited roll (apply_edit)
+                message_id = rng.choice(list(rolls))
+                rolls[message_id] = random_roll(rng)
+                live.remove_roll(message_id)
+                live.add_roll(rolls[message_id][0], rolls[message_id][1], loadouts[rolls[message_id][1]], message_id)
+
+        fresh = bot.RollScorer(*looted, track_messages=True, bucket_seconds=3600)
+        for message_id in sorted(rolls):
+            roll, userid = rolls[message_id]
+            fresh.add_roll(roll, userid, loadouts[userid], message_id)
+
+    live_counters, fresh_counters = counters(live), counters(fresh)
+    for name in fresh_counters:
+        assert live_counters[name] == fresh_counters[name], name
@@ -0,0 +1,118 @@
+"""
+RollStore: revalidation after a reconnect and the deletions a sync records.
+
+    python -m pytest tests
+"""
+
+import os
+import sys
+import asyncio
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import discord
+import monolith_uprising_counter_bot as bot
+
+CHANNEL_ID = 1234
+
+def snowflake(minutes_ago: float) -> int:
+    return discord.utils.time_snowflake(discord.utils.utcnow() - timedelta(minutes=minutes_ago))
+
+def message(message_id: int, roll: int = 50) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=message_id,
+        channel=SimpleNamespace(id=CHANNEL_ID),
+        author=SimpleNamespace(id=1),
+        embeds=[SimpleNamespace(title=str(roll), description=f"<@{300_000_000_000_000_000}> rolled", timestamp=None)],
+        created_at=discord.utils.snowflake_time(message_id),
+        edited_at=None,
+    )
+
+class FakeChannel:
+    """channel.history over a list of messages; fails after `fail_after` messages if set."""
+
+    def __init__(self, messages, fail_after=None):
+        self.id = CHANNEL_ID
+        self.name = "rolls"
+        self.messages = messages
+        self.fail_after = fail_after
+
+    async def history(self, limit, oldest_first, after, before):
+        for n, msg in enumerate(sorted(self.messages, key=lambda m: m.id)):
+            if self.fail_after is not None and n >= self.fail_after:
+                raise discord.DiscordServerError(SimpleNamespace(status=503, reason="unavailable"), "")
+            if after.id < msg.id < before.id:
+                yield msg
+
+@pytest.fixture
+def store(tmp_path):
+    return bot.RollStore(str(tmp_path / "rolls.sqlite3"))
+
+def stored_ids(store, first_id, last_id):
+    return [row[0] for batch in store.iter_messages(CHANNEL_ID, first_id, last_id) for row in batch]
+
+def test_revalidate_cuts_from_last_seen_and_is_idempotent(store):
+    old = (snowflake(60 * 24 * 30), snowflake(60 * 24 * 29))
+    recent = (snowflake(600), snowflake(5))
+    store.mark_covered(CHANNEL_ID, *old)
+    store.mark_covered(CHANNEL_ID, *recent)
+    with store.db:
+        store.db.execute("INSERT INTO gateway_seen (id, seen_id) VALUES (0, ?)", (snowflake(60),))
+
+    assert store.revalidate(600) == 1
+    cut = store.covered(CHANNEL_ID)
+    # the settled battle stays covered; the newest range is covered up to 10 minutes before the gateway was last seen
+    assert cut[0] == old
+    assert cut[1][0] == recent[0]
+    assert abs((cut[1][1] >> 22) - (snowflake(70) >> 22)) < 5_000
+    # a second reconnect without new coverage does not shrink it further
+    assert store.revalidate(600) == 0
+    assert store.covered(CHANNEL_ID) == cut
+
+def test_sync_marks_deleted_only_after_the_fetch(store):
+    first_id, last_id = snowflake(30), snowflake(0)
+    messages = [message(snowflake(m)) for m in (25, 20, 15, 10, 1)]
+    asyncio.run(store.sync(FakeChannel(messages), first_id, last_id))
+    assert stored_ids(store, first_id, last_id) == sorted(m.id for m in messages)
+
+    # the unsettled tail is fetched again: a failing fetch leaves the stored messages as they were
+    gone = messages[-1]
+    with pytest.raises(discord.DiscordServerError):
+        asyncio.run(store.sync(FakeChannel(messages[:-1], fail_after=0), first_id, last_id))
+    assert gone.id in stored_ids(store, first_id, last_id)
+
+    # a complete fetch marks the message that is not returned again as deleted
+    asyncio.run(store.sync(FakeChannel(messages[:-1]), first_id, last_id))
+    assert stored_ids(store, first_id, last_id) == sorted(m.id for m in messages[:-1])
+
+def test_history_slices_stream_pages_in_order(monkeypatch):
+    monkeypatch.setattr(bot, "HISTORY_SLICE_PREFETCH_PAGES", 2)
+    first_id, last_id = snowflake(600), snowflake(0)
+    messages = [message(snowflake(600 - m / 10)) for m in range(1, 5000)]
+    channel = FakeChannel(messages)
+    fetched = []
+    history = channel.history
+
+    async def counting_history(**kwargs):
+        async for msg in history(**kwargs):
+            fetched.append(msg.id)
+            yield msg
+    channel.history = counting_history
+
+    async def read():
+        pages = []
+        async for page in bot.iter_channel_history_slices(channel, first_id - 1, last_id + 1, slices=4):
+            if not pages:
+                # the other slices wait once they are HISTORY_SLICE_PREFETCH_PAGES pages ahead
+                await asyncio.sleep(0.05)
+                assert len(fetched) <= (4 * (bot.HISTORY_SLICE_PREFETCH_PAGES + 2)) * bot.HISTORY_PAGE_SIZE
+            assert len(page) <= bot.HISTORY_PAGE_SIZE
+            pages.append(page)
+        return pages
+
+    pages = asyncio.run(read())
+    assert [msg.id for page in pages for msg in page] == sorted(m.id for m in messages)
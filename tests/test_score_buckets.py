@@ -0,0 +1,85 @@
+"""
+ScoreBuckets.query must give the totals of a brute-force filter of the rolls by message time, under random
+set/remove, for ranges with aligned and unaligned bounds, within one bucket, across edge buckets and
+beyond the rolls.
+
+    python -m pytest tests
+"""
+
+import os
+import sys
+import random
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import discord
+import monolith_uprising_counter_bot as bot
+
+SEEDS = range(1, 21)
+BUCKET_SECONDS = 60
+START_MS = 1_767_225_600_000    # 2026-01-01, on a bucket boundary
+SPAN_SECONDS = 20 * BUCKET_SECONDS
+USERS = range(1, 9)
+STEPS = 400
+QUERIES = 50
+
+def brute_force(rolls, start_ts, end_ts):
+    totals = []
+    for monolith in (True, False):
+        selected = [
+            entry for message_id, entry in rolls.items()
+            if entry[0] == monolith and start_ts <= bot._snowflake_seconds(message_id) < end_ts
+        ]
+        totals.append(bot.FactionTotals(
+            rolls=len(selected),
+            base=sum(base for _, base, _, _, _ in selected),
+            bonus=sum(bonus for _, _, bonus, _, _ in selected),
+            users=len({userid for _, _, _, userid, _ in selected}),
+            weird_flower_carriers=len({userid for _, _, _, userid, weird_flower in selected if weird_flower}),
+        ))
+    return tuple(totals)
+
+def random_bound(rng, rolls):
+    start = START_MS / 1000
+    r = rng.random()
+    if r < 0.3:
+        # a bucket boundary, possibly outside the rolls
+        return start + rng.randint(-2, SPAN_SECONDS // BUCKET_SECONDS + 2) * BUCKET_SECONDS
+    if r < 0.5 and rolls:
+        # exactly a roll's time
+        return bot._snowflake_seconds(rng.choice(list(rolls)))
+    return start + rng.uniform(-BUCKET_SECONDS, SPAN_SECONDS + BUCKET_SECONDS)
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_query_matches_brute_force(seed):
+    rng = random.Random(seed)
+    buckets = bot.ScoreBuckets(BUCKET_SECONDS)
+    rolls = {}  # message ID -> (is_monolith, base, bonus, user ID, weird_flower)
+    for step in range(STEPS):
+        if rolls and rng.random() < 0.3:
+            message_id = rng.choice(list(rolls))
+            del rolls[message_id]
+            buckets.remove(message_id)
+        else:
+            # a new roll, or a changed contribution of a stored one (a Weird Flower pair, an edit)
+            if rolls and rng.random() < 0.2:
+                message_id = rng.choice(list(rolls))
+            else:
+                ms = START_MS + rng.randrange(SPAN_SECONDS * 1000)
+                message_id = ((ms - discord.utils.DISCORD_EPOCH) << 22) + rng.randrange(1 << 22)
+            faction = rng.choice(["Monolith", "Noon", "STALKERS"])
+            entry = (faction in bot.MONOLITH_FACTIONS, rng.randint(1, 100), rng.randint(0, 40), rng.choice(USERS), rng.random() < 0.2)
+            rolls[message_id] = entry
+            buckets.set(message_id, faction, entry[1], entry[2], entry[3], entry[4])
+        # removing a roll that is not there changes nothing
+        buckets.remove(rng.randrange(1 << 60))
+
+        if step % 20 == 0:
+            for _ in range(QUERIES):
+                start_ts, end_ts = sorted((random_bound(rng, rolls), random_bound(rng, rolls)))
+                if rng.random() < 0.1:
+                    end_ts = start_ts
+                assert buckets.query(start_ts, end_ts) == brute_force(rolls, start_ts, end_ts), (start_ts, end_ts)
+    assert buckets.query(0, 1e12) == brute_force(rolls, 0, 1e12)